@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code propose un abaque du pendule simple sans frottement lâché sans vitesse initiale :
+theta(t) est obtenu par interpolation dans une table calculée une fois pour toutes,
+au lieu d'une intégration complète à chaque demande.
+- Le temps est mis à l'échelle : tau = t sqrt(g/L), si bien qu'une seule table sert pour tous L et g.
+- Le mouvement est périodique de période T = 4 K(m) (K : intégrale elliptique complète de première
+  espèce, m = sin(theta0/2)^2) : la table ne contient qu'un quart de période, repéré par la phase
+  s = tau / (T/4) dans [0, 1]. Les autres quarts s'en déduisent par symétrie
+  (theta est paire autour de s = 0 et impaire autour de s = 1).
+- La table stocke theta / theta0 sur une grille régulière en (xi, s), avec xi = -ln(cos(theta0/2)) :
+  cette variable resserre la grille près de theta0 = pi, où la période diverge comme xi.
+  Elle est calculée par la solution de référence d'un lot de pendules (un par amplitude,
+  en un seul appel à odeint).
+- Une demande (theta0, t) est une interpolation cubique 4 x 4 points, vectorisée sur toutes les demandes.
+La borne d'erreur est mesurée à la construction au milieu de chaque case de la grille, là où l'erreur
+d'interpolation est la plus grande, par comparaison avec la solution exacte (fonctions elliptiques
+de Jacobi). construire_abaque raffine la grille jusqu'à atteindre l'erreur demandée.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+from scipy.special import ellipj, ellipk
+
+from pendule_plan import Pendule
+from solution_reference import references_lot
+
+"""
+FONCTIONS
+"""
+# Poids de l'interpolation cubique de Lagrange sur les points 0, 1, 2, 3, à l'abscisse f (entre 1 et 2
+# à l'intérieur de la grille, entre 0 et 1 ou 2 et 3 près des bords)
+def poids_cubiques(f):
+    return np.stack((-(f - 1)*(f - 2)*(f - 3)/6, f*(f - 2)*(f - 3)/2,
+                     -f*(f - 1)*(f - 3)/2, f*(f - 1)*(f - 2)/6), axis=-1)
+
+# Variable d'amplitude de la grille et sa réciproque
+def xi_amplitude(theta0):
+    return -np.log(np.cos(theta0 / 2))
+
+def amplitude_xi(xi):
+    return 2 * np.arccos(np.exp(-xi))
+
+# Solution exacte theta / theta0 au quart de période réduit s (theta0 > 0) :
+# sin(theta/2) = k sn(K (1 - s), m), avec k = sin(theta0/2)
+def quart_exact(theta0, s):
+    k = np.sin(theta0 / 2)
+    sn = ellipj(ellipk(k**2) * (1 - s), k**2)[0]
+    return 2 * np.arcsin(k * sn) / theta0
+
+"""
+CLASSES
+"""
+class Abaque:
+    # theta_max : plus grande amplitude servie (strictement inférieure à pi),
+    # n_amplitudes, n_phases : nombre d'intervalles de la grille en theta0 et en s,
+    # dtype : précision de la table stockée (np.float32 pour une table deux fois plus petite)
+    def __init__(self, theta_max=3.0, n_amplitudes=64, n_phases=64, dtype=np.float64):
+        msg = "L'abaque ne couvre que les oscillations (theta_max < pi)"
+        assert 0 < theta_max < np.pi, msg
+        self.theta_max = float(theta_max)
+        # Pas de la grille en xi
+        self.h = xi_amplitude(self.theta_max) / n_amplitudes
+        self.n_amplitudes = n_amplitudes
+        self.n_phases = n_phases
+        self.G = self.calculer_table().astype(dtype)
+        self.borne = self.mesurer_erreur()
+
+    # Table theta / theta0 sur la grille. Les colonnes sont complétées par deux points fantômes
+    # de chaque côté de [0, 1] en s (symétries du mouvement) ; en amplitude, les stencils
+    # sont décentrés près des bords.
+    def calculer_table(self):
+        na, ns = self.n_amplitudes, self.n_phases
+        amplitudes = amplitude_xi(self.h * np.arange(1, na + 1))
+        s = np.linspace(0.0, 1.0, ns + 1)
+        # Chaque pendule est mis à l'échelle pour que le quart de période dure 1 : g/L = K(m)^2
+        K = ellipk(np.sin(amplitudes / 2)**2)
+        pendules = [Pendule(1.0, g=Ki**2, theta0=a) for Ki, a in zip(K, amplitudes)]
+        A = references_lot(pendules, s, rtol=1e-13, atol=1e-14)
+        G = np.empty((na + 1, ns + 5))
+        # Lignes : theta0 = 0, ..., theta_max ; colonnes décalées de 2
+        G[1:, 2:ns + 3] = (A[:, :, 0] / amplitudes).T
+        # Limite des petits angles : cos(pi s / 2)
+        G[0, 2:ns + 3] = np.cos(np.pi / 2 * s)
+        G[:, 1], G[:, 0] = G[:, 3], G[:, 4]
+        G[:, ns + 3], G[:, ns + 4] = -G[:, ns + 1], -G[:, ns]
+        return G
+
+    # Interpolation de theta / theta0 pour des amplitudes a dans [0, theta_max] et des phases s dans [0, 1]
+    def interpoler(self, a, s):
+        x = xi_amplitude(a) / self.h
+        y = s * self.n_phases
+        # Premier point du stencil : décentré aux bords en amplitude, toujours centré en phase
+        # (les colonnes de la table sont décalées de 2 par les points fantômes)
+        i = np.clip(x.astype(np.intp) - 1, 0, self.n_amplitudes - 3)
+        j = np.minimum(y.astype(np.intp), self.n_phases - 1) - 1
+        wa = poids_cubiques(x - i)
+        ws = poids_cubiques(y - j)
+        d = np.arange(4)
+        valeurs = self.G[i[..., None, None] + d[:, None], j[..., None, None] + 2 + d]
+        return np.einsum("...a,...ab,...b->...", wa, valeurs, ws)
+
+    # Angle du pendule d'amplitude theta0 (lâché sans vitesse) aux instants t, pour une longueur L et une gravité g.
+    # theta0 et t peuvent être des tableaux de formes compatibles (broadcast numpy).
+    def theta(self, theta0, t, L=1.0, g=9.81):
+        theta0, t = np.broadcast_arrays(np.asarray(theta0, dtype=float), np.asarray(t, dtype=float))
+        a = np.abs(theta0)
+        msg = "Amplitude hors de l'abaque (|theta0| > " + str(self.theta_max) + ")"
+        assert np.all(a <= self.theta_max), msg
+        # Phase dans la période, en quarts de période
+        quarts = np.sqrt(g / L) * t / ellipk(np.sin(a / 2)**2)
+        quarts = np.mod(quarts, 4.0)
+        q = np.minimum(quarts.astype(np.intp), 3)
+        s = quarts - q
+        # Quarts 1 et 3 parcourus à rebours, quarts 1 et 2 de signe opposé
+        s = np.where(q % 2 == 1, 1 - s, s)
+        signe = np.where((q == 1) | (q == 2), -1.0, 1.0)
+        return theta0 * signe * self.interpoler(a, s)
+
+    # Borne de l'erreur sur theta (en radians) : maximum au milieu des cases de la grille
+    # (et aux milieux des bords), avec une marge d'un facteur 2
+    def mesurer_erreur(self):
+        a = amplitude_xi(self.h * (np.arange(2 * self.n_amplitudes) + 1) / 2)
+        s = np.arange(2 * self.n_phases + 1) / (2 * self.n_phases)
+        a, s = np.meshgrid(a, s, indexing="ij")
+        erreur = np.abs(a * (self.interpoler(a, s) - quart_exact(a, s)))
+        # Erreur due à chaque direction : milieux en amplitude aux phases de la grille, et inversement
+        self.erreurs_directions = (float(np.max(erreur[::2, ::2])), float(np.max(erreur[1::2, 1::2])))
+        return 2 * float(np.max(erreur))
+
+    # Stockage compact : la table (compressée) et les paramètres de la grille
+    def sauver(self, fichier):
+        np.savez_compressed(fichier, G=self.G, theta_max=self.theta_max, borne=self.borne,
+                            n=np.array([self.n_amplitudes, self.n_phases]))
+
+# Relit un abaque écrit par Abaque.sauver, sans refaire les calculs
+def charger_abaque(fichier):
+    with np.load(fichier) as donnees:
+        abaque = Abaque.__new__(Abaque)
+        abaque.theta_max = float(donnees["theta_max"])
+        abaque.n_amplitudes, abaque.n_phases = (int(n) for n in donnees["n"])
+        abaque.h = xi_amplitude(abaque.theta_max) / abaque.n_amplitudes
+        abaque.G = donnees["G"]
+        abaque.borne = float(donnees["borne"])
+    return abaque
+
+# Construit un abaque dont la borne d'erreur est inférieure à tol, en doublant le nombre d'intervalles
+# dans la direction (amplitude ou phase) où l'erreur mesurée est la plus grande
+def construire_abaque(tol=1e-8, theta_max=3.0, dtype=np.float64, n_max=4096):
+    n_amplitudes, n_phases = 32, 32
+    while True:
+        abaque = Abaque(theta_max, n_amplitudes, n_phases, dtype)
+        if abaque.borne <= tol or max(n_amplitudes, n_phases) >= n_max:
+            break
+        erreur_amplitude, erreur_phase = abaque.erreurs_directions
+        if erreur_amplitude >= erreur_phase:
+            n_amplitudes *= 2
+        else:
+            n_phases *= 2
+    msg = "Erreur demandée non atteinte (" + str(abaque.borne) + ") : augmenter n_max ou réduire theta_max"
+    assert abaque.borne <= tol, msg
+    return abaque
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code regroupe les fonctions de tracé des études (angle, erreur et énergie mécanique au cours du temps).
+Les courbes sont sous-échantillonnées avant d'être transmises à matplotlib, de façon à ce que
+le coût du tracé dépende de la largeur de la figure en pixels et non du nombre de points calculés :
+- "minmax" garde, pour chaque paquet de points, le minimum et le maximum (l'enveloppe est exacte) ;
+- "lttb" (Largest Triangle Three Buckets) garde un point par paquet en préservant la forme.
+Les données sont lues par tranches : un tableau np.memmap (ou tout objet découpable par tranches,
+comme un jeu de données HDF5) n'est jamais chargé entièrement en mémoire.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+# import de la bibliothèque matplotlib (graphiques) en lui donnant le surnom plt
+import matplotlib.pyplot as plt
+
+# Nombre de points lus en une fois dans la source de données
+TAILLE_BLOC = 1 << 20
+
+"""
+FONCTIONS DE SOUS-ECHANTILLONNAGE
+"""
+# Nombre de points utiles pour la figure courante : deux par pixel de largeur
+def points_par_figure():
+    fig = plt.gcf()
+    return int(2 * fig.get_size_inches()[0] * fig.dpi)
+
+# Garde le minimum et le maximum de chaque paquet de points, dans l'ordre chronologique.
+# Renvoie au plus 2 * n_paquets points.
+def reduire_minmax(x, y, n_paquets):
+    n = len(y)
+    if n <= 2 * n_paquets:
+        return np.asarray(x[:]), np.asarray(y[:])
+    taille = -(-n // n_paquets)
+    paquets_par_bloc = max(1, TAILLE_BLOC // taille)
+    indices = []
+    for debut in range(0, n, paquets_par_bloc * taille):
+        fin = min(n, debut + paquets_par_bloc * taille)
+        bloc = np.asarray(y[debut:fin])
+        # Le dernier paquet peut être incomplet : on le complète avec sa première valeur
+        nb = -(-bloc.size // taille)
+        complet = np.resize(bloc, nb * taille)
+        complet[bloc.size:] = bloc[(nb - 1) * taille]
+        complet = complet.reshape(nb, taille)
+        base = debut + taille * np.arange(nb)
+        i_min = base + np.argmin(complet, axis=1)
+        i_max = base + np.argmax(complet, axis=1)
+        indices.append(np.sort(np.stack((i_min, i_max), axis=1), axis=1).ravel())
+    # Indices croissants et sans doublon : seuls les points retenus sont lus dans la source
+    indices = np.unique(np.concatenate(indices))
+    return np.asarray(x[indices]), np.asarray(y[indices])
+
+# Algorithme Largest Triangle Three Buckets : garde n_sortie points dont le premier et le dernier.
+# Dans chaque paquet, on garde le point qui forme le plus grand triangle avec le point retenu
+# dans le paquet précédent et la moyenne du paquet suivant.
+def reduire_lttb(x, y, n_sortie):
+    n = len(y)
+    if n <= n_sortie or n_sortie < 3:
+        return np.asarray(x[:]), np.asarray(y[:])
+    bornes = np.linspace(1, n - 1, n_sortie - 1).astype(int)
+    x_out = np.empty(n_sortie)
+    y_out = np.empty(n_sortie)
+    x_out[0], y_out[0] = x[0], y[0]
+    x_out[-1], y_out[-1] = x[n - 1], y[n - 1]
+    xa, ya = x_out[0], y_out[0]
+    # Le paquet suivant est lu une seule fois et réutilisé au tour d'après
+    xs, ys = np.asarray(x[bornes[0]:bornes[1]], dtype=float), np.asarray(y[bornes[0]:bornes[1]], dtype=float)
+    for k in range(n_sortie - 2):
+        if k + 2 < len(bornes):
+            xn = np.asarray(x[bornes[k + 1]:bornes[k + 2]], dtype=float)
+            yn = np.asarray(y[bornes[k + 1]:bornes[k + 2]], dtype=float)
+            xc, yc = xn.mean(), yn.mean()
+        else:
+            xn = yn = None
+            xc, yc = x_out[-1], y_out[-1]
+        aire = np.abs((xa - xc) * (ys - ya) - (xa - xs) * (yc - ya))
+        i = np.argmax(aire)
+        xa, ya = xs[i], ys[i]
+        x_out[k + 1], y_out[k + 1] = xa, ya
+        xs, ys = xn, yn
+    return x_out, y_out
+
+# Sous-échantillonne une courbe pour la figure courante (n_points par défaut : deux par pixel)
+def reduire(x, y, n_points=None, methode="minmax"):
+    if n_points is None:
+        n_points = points_par_figure()
+    if methode == "minmax":
+        return reduire_minmax(x, y, max(1, n_points // 2))
+    elif methode == "lttb":
+        return reduire_lttb(x, y, n_points)
+    raise ValueError("Méthode de sous-échantillonnage inconnue : " + str(methode))
+
+"""
+FONCTIONS DE TRACE
+"""
+def nom_solveur(item):
+    if item["solver_class"] == "Odeint":
+        return "Odeint"
+    return item["solver_class"].__name__
+
+# Trace une courbe sous-échantillonnée (mêmes arguments que plt.plot pour le style)
+def plot_reduit(x, y, *args, n_points=None, methode="minmax", **kwargs):
+    xr, yr = reduire(x, y, n_points, methode)
+    return plt.plot(xr, yr, *args, **kwargs)
+
+def plot_A(solver_list, temps, n_points=None, methode="minmax"):
+    for item in solver_list:
+        plot_reduit(temps, item["A"][:, 0], item["color"], lw=1.0, label=nom_solveur(item),
+                    n_points=n_points, methode=methode)
+    plt.legend(loc='lower right')
+    plt.title("Angle de la balle au cours du temps")
+    plt.xlabel("Temps (s)")
+    plt.ylabel("Angle (rad)")
+    plt.grid(True)
+
+def plot_erreur(solver_list, temps, n_points=None, methode="minmax"):
+    for item in solver_list:
+        plot_reduit(temps, item["erreur"], item["color"], lw=1.0, label=nom_solveur(item),
+                    n_points=n_points, methode=methode)
+    plt.legend(loc='lower right')
+    plt.title("Erreur au cours du temps")
+    plt.xlabel("Temps (s)")
+    plt.ylabel("Erreur angulaire (rad)")
+    plt.grid(True)
+
+def plot_em(solver_list, temps, n_points=None, methode="minmax"):
+    for item in solver_list:
+        plot_reduit(temps, item["em"], item["color"], lw=1.0, label=nom_solveur(item),
+                    n_points=n_points, methode=methode)
+    plt.legend(loc='lower right')
+    plt.title("Energie mécanique au cours du temps")
+    plt.xlabel("Temps (s)")
+    plt.ylabel("Energie mécanique (J/kg)")
+    plt.grid(True)
+
+"""
+ANIMATION EN TEMPS REEL
+"""
+# Anime un pendule simple piloté par un ProducteurTempsReel (module temps_reel) :
+# à gauche le pendule, à droite l'angle sur les fenetre dernières secondes simulées.
+# La lecture du tampon ne bloque jamais le producteur. Renvoie l'animation et le lecteur
+# (lecteur.statistiques() donne la latence mesurée).
+def animer_temps_reel(producteur, L, fenetre=10.0, intervalle_ms=20):
+    from matplotlib.animation import FuncAnimation
+    lecteur = producteur.lecteur()
+    fig, (ax_pendule, ax_angle) = plt.subplots(1, 2, figsize=(10, 4))
+    ax_pendule.set_xlim(-1.2 * L, 1.2 * L)
+    ax_pendule.set_ylim(-1.2 * L, 1.2 * L)
+    ax_pendule.set_aspect("equal")
+    ax_pendule.set_title("Pendule")
+    tige, = ax_pendule.plot([0, 0], [0, -L], "o-", lw=2)
+    courbe, = ax_angle.plot([], [], lw=1.0)
+    ax_angle.set_title("Angle de la balle au cours du temps")
+    ax_angle.set_xlabel("Temps (s)")
+    ax_angle.set_ylabel("Angle (rad)")
+    ax_angle.grid(True)
+    # Historique de taille fixe : au plus un point par pixel de largeur
+    n_max = points_par_figure()
+    historique = {"t": np.zeros(0), "theta": np.zeros(0)}
+
+    def mise_a_jour(_):
+        t, etats, _ = lecteur.lire()
+        if t.size:
+            theta = etats[:, 0]
+            garde = historique["t"] > t[-1] - fenetre
+            historique["t"] = np.concatenate((historique["t"][garde], t))
+            historique["theta"] = np.concatenate((historique["theta"][garde], theta))
+            xr, yr = reduire(historique["t"], historique["theta"], n_max)
+            courbe.set_data(xr, yr)
+            ax_angle.set_xlim(max(0.0, t[-1] - fenetre), max(fenetre, t[-1]))
+            ax_angle.set_ylim(-np.pi, np.pi)
+            tige.set_data([0, L * np.sin(theta[-1])], [0, -L * np.cos(theta[-1])])
+        return tige, courbe
+
+    animation = FuncAnimation(fig, mise_a_jour, interval=intervalle_ms, blit=False, cache_frame_data=False)
+    return animation, lecteur
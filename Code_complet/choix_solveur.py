@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code choisit automatiquement l'intégrateur et le pas de temps les moins coûteux pour une
+erreur visée, à partir d'un modèle de coût calibré sur la machine (au lieu de lire les
+courbes précision-temps à la main).
+Le temps est rendu sans dimension par la pulsation propre w0 = sqrt(g/L) du modèle : tau = w0 t.
+- calibrer : pour chaque intégrateur, quelques calculs sur un pendule de calibration donnent
+  la constante d'erreur C (erreur = C (w0 dt)^p w0 t, l'ordre p étant l'ordre théorique du schéma,
+  C la plus grande valeur observée sur les pas de calibration), ainsi que le temps par pas pour un
+  pendule et pour un lot de pendules (modèle affine : a + b K pour un lot de K pendules intégrés ensemble).
+  Le modèle est écrit dans un fichier JSON avec la description de la machine.
+- choisir : pour une erreur visée, une durée simulée, une taille de lot et une pulsation, calcule pour
+  chaque intégrateur le plus grand pas qui tient l'erreur et le coût correspondant, puis retient le
+  moins coûteux. L'erreur est supposée croître linéairement avec la durée (erreur de phase),
+  et les arrondis ajoutent environ eps par pas : en dessous d'un certain pas, l'erreur remonte.
+  Le pas n'est jamais plus grand que le plus grand pas calibré (domaine où l'ordre est vérifié).
+- resoudre_auto : la constante d'erreur dépend aussi de l'amplitude et du modèle : un calcul pilote
+  court sur le modèle réel corrige la constante de chaque intégrateur candidat, puis le calcul est
+  fait au pas choisi et au demi-pas. L'écart entre les deux donne l'erreur réellement obtenue
+  (extrapolation de Richardson) ; le pas est réduit tant qu'elle dépasse la cible, et la solution
+  au demi-pas (la plus précise) est renvoyée.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+import json
+import platform
+import time
+
+from pendule_plan import Pendule
+from solution_reference import reference_odeint
+from integrateur_complet import ForwardEuler, ExplicitMidpoint, RungeKutta4, VelocityVerlet
+from integrateur_meca import MecaODESolver, Stormer_Verlet
+
+# Intégrateurs candidats : classe, ordre théorique et pas de calibration sans dimension (w0 dt),
+# dans le domaine où l'ordre est atteint
+SOLVEURS = {"ForwardEuler": (ForwardEuler, 1, [4e-3, 1.5e-3, 5e-4]),
+            "ExplicitMidpoint": (ExplicitMidpoint, 2, [9e-2, 4e-2, 2.5e-2, 1e-2]),
+            "RungeKutta4": (RungeKutta4, 4, [0.4, 0.25, 0.1, 0.05]),
+            "VelocityVerlet": (VelocityVerlet, 2, [9e-2, 4e-2, 2.5e-2, 1e-2]),
+            "Stormer_Verlet": (Stormer_Verlet, 2, [9e-2, 4e-2, 2.5e-2, 1e-2])}
+
+# Erreur d'arrondi ajoutée par pas (rad), en double précision
+ARRONDI_PAR_PAS = 1e-16
+
+"""
+CLASSES
+"""
+class LotPendules:
+    # K pendules identiques intégrés ensemble : l'état est [theta_1..theta_K, omega_1..omega_K],
+    # ce qui convient à la fois aux solveurs généraux (derA) et aux solveurs mécaniques (acc)
+    def __init__(self, pendule, K):
+        self.pendule = pendule
+        self.K = K
+
+    def derA(self, t, u):
+        return self.pendule.derA(t, np.reshape(u, (2, self.K))).ravel()
+
+    @property
+    def acc_depend_vitesse(self):
+        return self.pendule.acc_depend_vitesse
+
+    def acc(self, t, pos, vel=None):
+        return self.pendule.acc(t, [pos], None if vel is None else [vel])[0]
+
+    def CI(self):
+        return np.repeat(self.pendule.CI(), self.K)
+
+"""
+FONCTIONS
+"""
+# Pulsation propre (rad/s) la plus grande du modèle, sqrt(g/L), qui fixe l'échelle de temps
+def pulsation(modele_pendule):
+    return float(np.sqrt(np.max(modele_pendule.g / np.asarray(modele_pendule.L, dtype=float))))
+
+# Positions (angles) d'une solution, quel que soit le rangement du solveur
+def positions(solver, u):
+    if isinstance(solver, MecaODESolver):
+        return u[..., 0]
+    return u[:, :u.shape[1] // 2]
+
+# Nombre de pas faits par les solveurs dans chaque intervalle entre sorties (écarts en s) au pas dt :
+# ils ne dépassent jamais une sortie, comme dans leur boucle (nb_steps = max(round(écart / dt), 1))
+def nombre_pas(ecarts, dt):
+    return np.maximum(np.round(np.asarray(ecarts) / dt), 1)
+
+# Temps par pas (s) d'un intégrateur sur un lot de K pendules, mesuré sur n_pas pas (meilleur de 3 essais)
+def temps_par_pas(solver_class, pendule, K, dt=1e-3, n_pas=2000):
+    lot = LotPendules(pendule, K)
+    temps = np.array([0.0, n_pas * dt])
+    meilleur = np.inf
+    for essai in range(3):
+        debut = time.perf_counter()
+        solver_class(lot).solve(lot.CI(), temps, dt)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur / n_pas
+
+# Calibre le modèle de coût de chaque intégrateur sur un pendule lâché à theta0 = pi/2
+# pendant t_cal secondes. K_lot : taille du lot utilisé pour mesurer le coût par pendule.
+# Le modèle est écrit dans fichier (JSON) s'il est donné, et renvoyé.
+def calibrer(solveurs=tuple(SOLVEURS), fichier=None, t_cal=10.0, K_lot=1000, L=0.5):
+    pendule = Pendule(L, theta0=np.pi / 2)
+    w0 = pulsation(pendule)
+    temps = np.linspace(0, t_cal, 101)
+    u_ref = reference_odeint(pendule, temps)
+    modele = {"machine": {"noeud": platform.node(), "processeur": platform.processor() or platform.machine(),
+                          "python": platform.python_version(), "numpy": np.__version__},
+              "date": time.strftime("%Y-%m-%d %H:%M:%S"), "t_cal": t_cal, "L": L, "solveurs": {}}
+    for nom in solveurs:
+        solver_class, p, dt_list = SOLVEURS[nom]
+        erreurs = []
+        for dt in dt_list:
+            u = solver_class(pendule).solve(pendule.CI(), temps, dt / w0)
+            erreurs.append(float(np.max(np.abs(u[:, 0] - u_ref[:, 0]))))
+        # Ordre mesuré (pour information) : pente en échelle log-log
+        p_mesure = np.polyfit(np.log(dt_list), np.log(erreurs), 1)[0]
+        # erreur = C dt^p (w0 t_cal) avec l'ordre théorique : C est pris au pire des pas de calibration
+        C = max(e / dt**p for e, dt in zip(erreurs, dt_list)) / (w0 * t_cal)
+        # Temps par pas : a + b K
+        t1 = temps_par_pas(solver_class, pendule, 1)
+        tK = temps_par_pas(solver_class, pendule, K_lot)
+        b = max((tK - t1) / (K_lot - 1), 0.0)
+        modele["solveurs"][nom] = {"ordre": p, "ordre_mesure": float(p_mesure), "constante": float(C),
+                                   "dt_max": max(dt_list), "dt_calibration": dt_list, "erreurs": erreurs,
+                                   "temps_pas_fixe": t1 - b, "temps_pas_pendule": b}
+        print(nom, ": ordre", p, "(mesuré", round(p_mesure, 2), "), constante", C, ",", t1 * 1e6, "us par pas,",
+              tK * 1e6, "us par pas pour", K_lot, "pendules")
+    if fichier is not None:
+        with open(fichier, "w", encoding="utf-8") as f:
+            json.dump(modele, f, indent=2, ensure_ascii=False)
+    return modele
+
+def charger_modele(fichier):
+    with open(fichier, encoding="utf-8") as f:
+        return json.load(f)
+
+# Erreur prévue d'un intégrateur au pas sans dimension dt sur une durée sans dimension duree :
+# troncature proportionnelle à la durée, plus les arrondis accumulés (un eps par pas).
+# correction : facteur appliqué à la constante (mesuré par un calcul pilote)
+def erreur_prevue(caracteristiques, dt, duree, correction=1.0):
+    troncature = correction * caracteristiques["constante"] * dt**caracteristiques["ordre"] * duree
+    return troncature + ARRONDI_PAR_PAS * duree / dt
+
+# Choisit l'intégrateur et le pas les moins coûteux pour une erreur visée (rad) sur une durée t_max (s),
+# un lot de K pendules et une pulsation propre w0 (rad/s, par défaut celle du pendule de calibration).
+# corrections : facteurs sur les constantes d'erreur par intégrateur (seuls ces intégrateurs sont
+# alors candidats). pas_sortie : écart (s) entre instants de sortie, scalaire ou tableau des écarts ;
+# le pas réel étant au plus l'écart entre sorties (voir nombre_pas), le nombre de pas et l'erreur
+# prévue sont alors calculés avec les pas réellement faits.
+# Renvoie un dictionnaire : solveur, dt (s), coût prévu (s), erreur prévue, détail par intégrateur
+# et explication du choix.
+def choisir(modele, erreur_cible, t_max, K=1, w0=None, corrections=None, pas_sortie=None):
+    if w0 is None:
+        w0 = np.sqrt(9.81 / modele["L"])
+    duree = w0 * t_max
+    if pas_sortie is not None:
+        ecarts = np.atleast_1d(np.asarray(pas_sortie, dtype=float))
+        if ecarts.size == 1:
+            ecarts = np.full(max(int(np.round(t_max / ecarts[0])), 1), ecarts[0])
+    details = {}
+    for nom, caracteristiques in modele["solveurs"].items():
+        if corrections is not None and nom not in corrections:
+            continue
+        correction = 1.0 if corrections is None else corrections[nom]
+        # Plus grand pas qui tient l'erreur, cherché sur une grille géométrique sous dt_max
+        dt_candidats = caracteristiques["dt_max"] * 0.95**np.arange(400)
+        erreurs = erreur_prevue(caracteristiques, dt_candidats, duree, correction)
+        admissibles = np.flatnonzero(erreurs <= erreur_cible)
+        if admissibles.size == 0:
+            details[nom] = {"possible": False, "erreur_min": float(np.min(erreurs)),
+                            "raison": "erreur minimale prévue " + format(np.min(erreurs), ".2e")
+                                      + " (arrondis) au-dessus de la cible"}
+            continue
+        dt = float(dt_candidats[admissibles[0]]) / w0
+        erreur = float(erreurs[admissibles[0]])
+        if pas_sortie is None:
+            n_pas = int(np.ceil(t_max / dt))
+        else:
+            nb_pas = nombre_pas(ecarts, dt)
+            n_pas = int(np.sum(nb_pas))
+            erreur = float(erreur_prevue(caracteristiques, w0 * np.max(ecarts / nb_pas), duree, correction))
+        cout = n_pas * (caracteristiques["temps_pas_fixe"] + caracteristiques["temps_pas_pendule"] * K)
+        details[nom] = {"possible": True, "dt": dt, "n_pas": n_pas, "cout_s": cout, "correction": correction,
+                        "erreur_prevue": erreur}
+    possibles = {nom: d for nom, d in details.items() if d["possible"]}
+    msg = "Aucun intégrateur n'atteint l'erreur " + str(erreur_cible) + " sur " + str(t_max) + " s"
+    assert possibles, msg
+    nom = min(possibles, key=lambda n: possibles[n]["cout_s"])
+    choix = possibles[nom]
+    lignes = ["Erreur visée " + format(erreur_cible, ".1e") + " rad sur " + str(t_max) + " s, lot de "
+              + str(K) + " pendule(s), w0 = " + format(w0, ".3g") + " rad/s :"]
+    for autre, d in sorted(details.items(), key=lambda item: item[1].get("cout_s", np.inf)):
+        if d["possible"]:
+            lignes.append("  " + autre + " : dt = " + format(d["dt"], ".3g") + " s, " + str(d["n_pas"])
+                          + " pas, coût prévu " + format(d["cout_s"], ".3g") + " s"
+                          + ("" if d["correction"] == 1.0 else ", constante corrigée x" + format(d["correction"], ".3g"))
+                          + (" <- retenu" if autre == nom else ""))
+        else:
+            lignes.append("  " + autre + " : impossible, " + d["raison"])
+    if pas_sortie is not None and choix["dt"] > np.min(ecarts):
+        lignes.append("  Pas limité par l'écart entre instants de sortie : " + str(choix["n_pas"]) + " pas au lieu de "
+                      + str(int(np.ceil(t_max / choix["dt"]))))
+    return {"solveur": nom, "dt": choix["dt"], "cout_s": choix["cout_s"], "erreur_prevue": choix["erreur_prevue"],
+            "details": details, "explication": "\n".join(lignes)}
+
+# Calcule la solution aux pas dt et dt / 2, et l'erreur (sur les angles) de la solution au demi-pas
+# estimée par extrapolation de Richardson : |u_dt/2 - u_exacte| ~ |u_dt - u_dt/2| / (2^p - 1)
+def solution_verifiee(solver_class, ordre, modele_pendule, temps, dt):
+    solver = solver_class(modele_pendule)
+    u = solver.solve(modele_pendule.CI(), temps, dt)
+    u_fin = solver_class(modele_pendule).solve(modele_pendule.CI(), temps, dt / 2)
+    ecart = np.max(np.abs(positions(solver, u) - positions(solver, u_fin)))
+    return u_fin, float(ecart / (2**ordre - 1)), float(ecart * 2**ordre / (2**ordre - 1))
+
+# Coût prévu (s) de solution_verifiee (calculs aux pas dt et dt / 2) sur les intervalles ecarts
+def cout_verification(caracteristiques, ecarts, dt, K):
+    n_pas = np.sum(nombre_pas(ecarts, dt)) + np.sum(nombre_pas(ecarts, dt / 2))
+    return float(n_pas * (caracteristiques["temps_pas_fixe"] + caracteristiques["temps_pas_pendule"] * K))
+
+# Choisit l'intégrateur et le pas pour l'erreur visée (rad, sur les angles), puis résout le modèle aux instants temps.
+# K : taille du lot (par défaut le nombre d'angles de l'état), w0 : pulsation propre (par défaut sqrt(g/L)).
+# Un calcul pilote sur n_periodes_pilote périodes corrige la constante d'erreur des intégrateurs dont le coût
+# prévu est à moins de facteur_pilote fois celui du meilleur ; la solution finale est vérifiée au demi-pas.
+# Renvoie la solution et le choix (avec l'erreur estimée "erreur_estimee").
+def resoudre_auto(modele_pendule, temps, erreur_cible, modele=None, K=None, w0=None, afficher=True,
+                  n_periodes_pilote=2, facteur_pilote=20.0, max_essais=4):
+    if modele is None:
+        modele = calibrer()
+    if K is None:
+        K = np.size(modele_pendule.CI()) // 2
+    if w0 is None:
+        w0 = pulsation(modele_pendule)
+    t_max = float(temps[-1] - temps[0])
+    ecarts = np.diff(temps)
+    msg = "Les instants de sortie doivent être croissants"
+    if np.any(ecarts <= 0):
+        raise ValueError(msg)
+
+    # Intégrateurs compatibles avec le modèle (Stormer_Verlet refuse les accélérations qui dépendent de la vitesse)
+    compatibles = {}
+    for nom in modele["solveurs"]:
+        try:
+            SOLVEURS[nom][0](modele_pendule)
+            compatibles[nom] = 1.0
+        except ValueError:
+            pass
+    choix = choisir(modele, erreur_cible, t_max, K, w0, compatibles, ecarts)
+
+    # Calcul pilote : erreur mesurée sur une durée courte, comparée à l'erreur prévue
+    t_pilote = min(t_max, n_periodes_pilote * 2 * np.pi / w0)
+    temps_pilote = np.linspace(temps[0], temps[0] + t_pilote, 51)
+    meilleur = choix["details"][choix["solveur"]]["cout_s"]
+    corrections = {}
+    cout_pilote = 0.0
+    for nom, d in choix["details"].items():
+        if not d["possible"] or d["cout_s"] > facteur_pilote * meilleur:
+            continue
+        solver_class, ordre = SOLVEURS[nom][:2]
+        erreur_mesuree = solution_verifiee(solver_class, ordre, modele_pendule, temps_pilote, d["dt"])[2]
+        ecart = temps_pilote[1] - temps_pilote[0]
+        erreur = erreur_prevue(modele["solveurs"][nom], w0 * ecart / nombre_pas(ecart, d["dt"]), w0 * t_pilote,
+                               d["correction"])
+        cout_pilote += cout_verification(modele["solveurs"][nom], np.diff(temps_pilote), d["dt"], K)
+        corrections[nom] = max(erreur_mesuree / erreur, 1e-3)
+    choix = choisir(modele, erreur_cible, t_max, K, w0, corrections, ecarts)
+    # Le coût du choix est celui d'un seul calcul au pas dt : le pilote et la vérification s'y ajoutent
+    cout_final = cout_verification(modele["solveurs"][choix["solveur"]], ecarts, choix["dt"], K)
+    choix["cout_total_s"] = cout_pilote + cout_final
+    choix["explication"] += ("\nCoût prévu de resoudre_auto : " + format(choix["cout_total_s"], ".3g") + " s, soit "
+                             + format(choix["cout_total_s"] / choix["cout_s"], ".3g") + " fois le calcul retenu"
+                             + " (pilote " + format(cout_pilote, ".3g") + " s, solution aux pas dt et dt / 2 "
+                             + format(cout_final, ".3g") + " s), davantage si le pas doit être réduit")
+    if afficher:
+        print(choix["explication"])
+
+    # Calcul final, vérifié au demi-pas : le pas est réduit tant que l'erreur estimée dépasse la cible
+    nom = choix["solveur"]
+    solver_class, ordre = SOLVEURS[nom][:2]
+    dt = choix["dt"]
+    for essai in range(max_essais):
+        u, erreur, erreur_dt = solution_verifiee(solver_class, ordre, modele_pendule, temps, dt)
+        if erreur <= erreur_cible:
+            break
+        dt = dt / 2 * min((erreur_cible / erreur)**(1 / ordre), 1.0) * 0.9
+    choix["dt_final"] = dt / 2
+    choix["erreur_estimee"] = erreur
+    if afficher:
+        print("Erreur estimée (Richardson) au pas", format(dt / 2, ".3g"), "s :", format(erreur, ".2e"), "rad")
+    msg = ("Erreur visée non atteinte : " + format(erreur, ".2e") + " rad estimés avec " + nom
+           + " (arrondis ou modèle hors du domaine calibré)")
+    assert erreur <= erreur_cible, msg
+    return u, choix
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code intègre de grandes populations de pendules indépendants (10^6 et plus).
+Les paramètres (L, g, gamma, conditions initiales) peuvent différer d'un pendule à l'autre.
+La population est découpée en blocs de taille fixe, choisie pour que l'état et les tableaux
+de travail d'un bloc tiennent dans le cache. Chaque bloc est intégré sur tout l'intervalle
+de temps par un fil d'un ThreadPoolExecutor : les pendules étant indépendants, aucune
+synchronisation n'est nécessaire entre les pas. Les noyaux numpy (np.sin, multiplications
+et additions en place) relâchent le GIL, si bien que les blocs avancent réellement en parallèle,
+sans le coût de lancement des processus ni la sérialisation des données.
+Les tableaux de travail d'un bloc sont alloués une fois et réutilisés à chaque pas (out=...).
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Nombre de pendules par bloc : environ 12 tableaux de travail de 16384 float64, soit 1,5 Mo
+TAILLE_BLOC = 16384
+
+"""
+CLASSES
+"""
+class EnsemblePendules:
+    # Population de K pendules plans indépendants. Chaque paramètre est un scalaire
+    # (commun à tous les pendules) ou un tableau de taille K.
+    def __init__(self, L, g=9.81, theta0=0, omega0=0, gamma=0, small_angle=False, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        L, g, theta0, omega0, gamma = np.broadcast_arrays(*(np.asarray(x, dtype=self.dtype)
+                                                             for x in (L, g, theta0, omega0, gamma)))
+        msg = "Il faut au moins un paramètre de taille K pour définir la population"
+        assert L.ndim == 1, msg
+        self.K = L.size
+        self.L, self.g = L, g
+        self.theta0, self.omega0 = theta0, omega0
+        self.gamma = gamma
+        self.small_angle = small_angle
+        # Pulsation propre au carré, calculée une fois pour toutes
+        self.w02 = g / L
+        self.amorti = bool(np.any(gamma))
+
+    def CI(self):
+        return np.stack((self.theta0, self.omega0), axis=-1)
+
+    # Energie mécanique (J/kg) des pendules, A de forme (..., K, 2)
+    def Em(self, A):
+        L, g = self.L, self.g
+        theta, omega = A[..., 0], A[..., 1]
+        if self.small_angle:
+            return 1/2*(L*omega)**2+1/2*g*L*theta**2
+        return 1/2*(L*omega)**2-g*L*(np.cos(theta)-1)
+
+class BlocPendules:
+    # Pendules d'indices a à b d'un ensemble, avec leurs tableaux de travail
+    def __init__(self, ensemble, a, b):
+        self.a, self.b = a, b
+        n, dtype = b - a, ensemble.dtype
+        self.small_angle = ensemble.small_angle
+        self.w02 = np.array(ensemble.w02[a:b])
+        self.gamma = np.array(ensemble.gamma[a:b]) if ensemble.amorti else None
+        self.theta = np.array(ensemble.theta0[a:b])
+        self.omega = np.array(ensemble.omega0[a:b])
+        # Tableaux de travail réutilisés à chaque pas
+        self.acc_t = np.empty(n, dtype)
+        self.tmp = np.empty(n, dtype)
+        self.k = np.empty((4, 2, n), dtype)
+        self.th_e = np.empty(n, dtype)
+        self.om_e = np.empty(n, dtype)
+        # Accélération au début du pas (méthode de Verlet : réutilisée d'un pas à l'autre)
+        self.acc_valide = False
+
+    # Accélération angulaire due à la pesanteur seule, calculée dans out
+    def acc_pesanteur(self, theta, out):
+        if self.small_angle:
+            np.multiply(theta, self.w02, out=out)
+        else:
+            np.sin(theta, out=out)
+            out *= self.w02
+        np.negative(out, out=out)
+        return out
+
+    # Accélération angulaire calculée dans out, sans tableau temporaire
+    def acc(self, theta, omega, out):
+        self.acc_pesanteur(theta, out)
+        if self.gamma is not None:
+            np.multiply(self.gamma, omega, out=self.tmp)
+            out -= self.tmp
+        return out
+
+    # Pas de Verlet vitesse (même schéma que MecaVelocityVerlet). Avec frottement, le dernier
+    # demi-pas est implicite en omega : le frottement étant linéaire, il se résout exactement,
+    # omega = (omega_demi + dt/2*acc_pesanteur) / (1 + dt/2*gamma), ce qui garde l'ordre 2.
+    def pas_verlet(self, dt):
+        theta, omega, a, tmp = self.theta, self.omega, self.acc_t, self.tmp
+        dt2 = dt / 2.0
+        if not self.acc_valide:
+            self.acc(theta, omega, a)
+        np.multiply(a, dt2, out=tmp)
+        omega += tmp
+        np.multiply(omega, dt, out=tmp)
+        theta += tmp
+        self.acc_pesanteur(theta, a)
+        np.multiply(a, dt2, out=tmp)
+        omega += tmp
+        if self.gamma is not None:
+            np.multiply(self.gamma, dt2, out=tmp)
+            tmp += 1.0
+            omega /= tmp
+            # Accélération complète en fin de pas, réutilisée au pas suivant
+            np.multiply(self.gamma, omega, out=tmp)
+            a -= tmp
+        self.acc_valide = True
+
+    # Pas de Runge-Kutta 4 (même schéma que RungeKutta4)
+    def pas_rk4(self, dt):
+        theta, omega, k, th_e, om_e, tmp = self.theta, self.omega, self.k, self.th_e, self.om_e, self.tmp
+        dt2 = dt / 2.0
+        for i, h in enumerate((None, dt2, dt2, dt)):
+            if h is None:
+                th, om = theta, omega
+            else:
+                np.multiply(k[i - 1, 0], h, out=th_e)
+                th_e += theta
+                np.multiply(k[i - 1, 1], h, out=om_e)
+                om_e += omega
+                th, om = th_e, om_e
+            k[i, 0] = om
+            self.acc(th, om, k[i, 1])
+        for j, u in enumerate((theta, omega)):
+            np.add(k[1, j], k[2, j], out=tmp)
+            tmp *= 2
+            tmp += k[0, j]
+            tmp += k[3, j]
+            tmp *= dt / 6.0
+            u += tmp
+
+"""
+FONCTIONS
+"""
+# Pour chaque intervalle entre deux instants de sortie : (indice, nombre de pas, pas de temps)
+def intervalles(temps, dt):
+    for n in range(1, temps.size):
+        ti, tf = temps[n-1], temps[n]
+        nb_steps = max(int(np.round((tf - ti) / dt)), 1)
+        yield n, nb_steps, float((tf - ti) / nb_steps)
+
+# Intègre les pendules d'indices a à b. Le bloc et ses tableaux de travail sont créés
+# dans le fil qui l'intègre : seuls les blocs en cours de calcul occupent de la mémoire.
+def integrer_bloc(ensemble, a, b, temps, dt, schema, A):
+    bloc = BlocPendules(ensemble, a, b)
+    pas = bloc.pas_rk4 if schema == "rk4" else bloc.pas_verlet
+    for n, nb_steps, tempdt in intervalles(temps, dt):
+        for i in range(nb_steps):
+            pas(tempdt)
+        if A.ndim == 3:
+            A[n, bloc.a:bloc.b, 0] = bloc.theta
+            A[n, bloc.a:bloc.b, 1] = bloc.omega
+    if A.ndim == 2:
+        A[bloc.a:bloc.b, 0] = bloc.theta
+        A[bloc.a:bloc.b, 1] = bloc.omega
+
+# Intègre l'ensemble sur les instants temps avec le schéma "verlet" ou "rk4".
+# Renvoie un tableau (temps.size, K, 2) (rangement de references_lot), ou seulement
+# l'état final (K, 2) si trajectoires=False (utile pour les très grandes populations).
+# n_fils : nombre de fils (par défaut le nombre de coeurs), taille_bloc : pendules par bloc.
+def resoudre_ensemble(ensemble, temps, dt, schema="verlet", n_fils=None, taille_bloc=TAILLE_BLOC,
+                      trajectoires=True):
+    msg = "Schéma inconnu : " + str(schema)
+    assert schema in ("verlet", "rk4"), msg
+    K = ensemble.K
+    if trajectoires:
+        A = np.empty((temps.size, K, 2), dtype=ensemble.dtype)
+        A[0] = ensemble.CI()
+    else:
+        A = np.empty((K, 2), dtype=ensemble.dtype)
+    blocs = [(a, min(a + taille_bloc, K)) for a in range(0, K, taille_bloc)]
+    if n_fils is None:
+        n_fils = os.cpu_count() or 1
+    n_fils = min(n_fils, len(blocs))
+    if n_fils <= 1:
+        for a, b in blocs:
+            integrer_bloc(ensemble, a, b, temps, dt, schema, A)
+        return A
+    with ThreadPoolExecutor(max_workers=n_fils) as pool:
+        taches = [pool.submit(integrer_bloc, ensemble, a, b, temps, dt, schema, A) for a, b in blocs]
+        for tache in taches:
+            # Propage une éventuelle exception levée dans un fil
+            tache.result()
+    return A
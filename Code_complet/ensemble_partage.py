@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code répartit l'intégration d'un ensemble de pendules (module ensemble) sur plusieurs
+processus, sans copie des données :
+- les paramètres des pendules et le tableau des trajectoires sont alloués dans des segments
+  de mémoire partagée (multiprocessing.shared_memory) ;
+- chaque processus de travail intègre sa tranche de pendules et écrit directement dans
+  le tableau partagé : le processus principal voit les résultats sans aucune copie ;
+- les processus de travail sont lancés une seule fois et restent en attente de calculs :
+  les bibliothèques ne sont importées qu'une fois, et les messages échangés ne contiennent
+  que les noms des segments et les bornes des tranches (pas de sérialisation de tableaux).
+Les tableaux renvoyés par resoudre restent valides jusqu'à la fermeture du pool
+(ou jusqu'à l'appel de liberer) : il faut les copier pour les conserver au-delà.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+import multiprocessing as mp
+import os
+import queue
+from multiprocessing import shared_memory, resource_tracker
+
+from ensemble import EnsemblePendules, integrer_bloc, TAILLE_BLOC
+
+# Ordre des paramètres dans le segment partagé des paramètres (forme (5, K))
+PARAMETRES = ("L", "g", "theta0", "omega0", "gamma")
+# Délai (s) entre deux vérifications que les processus de travail sont toujours vivants
+DELAI_SURVEILLANCE = 1.0
+
+"""
+FONCTIONS
+"""
+# Vue numpy sur un segment de mémoire partagée
+def vue(segment, forme, dtype):
+    return np.ndarray(forme, dtype=dtype, buffer=segment.buf)
+
+# Boucle d'un processus de travail : attend des tranches à intégrer jusqu'à recevoir None
+def travailleur(taches, resultats):
+    while True:
+        tache = taches.get()
+        if tache is None:
+            break
+        num, nom_param, nom_sortie, K, forme_sortie, dtype, a, b, temps, dt, schema, small_angle, taille_bloc = tache
+        seg_param = shared_memory.SharedMemory(name=nom_param)
+        seg_sortie = shared_memory.SharedMemory(name=nom_sortie)
+        param = A = sous_ensemble = sortie = None
+        try:
+            param = vue(seg_param, (len(PARAMETRES), K), dtype)
+            A = vue(seg_sortie, forme_sortie, dtype)
+            # Sous-ensemble de la tranche : des vues sur la mémoire partagée, sans copie
+            sous_ensemble = EnsemblePendules(*param[:, a:b], small_angle=small_angle, dtype=dtype)
+            sortie = A[:, a:b] if A.ndim == 3 else A[a:b]
+            for c in range(0, b - a, taille_bloc):
+                integrer_bloc(sous_ensemble, c, min(c + taille_bloc, b - a), temps, dt, schema, sortie)
+            resultats.put((num, None))
+        except Exception as erreur:
+            resultats.put((num, repr(erreur)))
+        finally:
+            # Les vues doivent disparaître avant de détacher les segments
+            del param, A, sous_ensemble, sortie
+            seg_param.close()
+            seg_sortie.close()
+
+"""
+CLASSES
+"""
+class PoolPartage:
+    # n_processus : nombre de processus de travail (par défaut le nombre de coeurs)
+    def __init__(self, n_processus=None):
+        self.n_processus = n_processus or os.cpu_count() or 1
+        contexte = mp.get_context()
+        # Le suivi des segments doit être commun à tous les processus : sinon chaque processus
+        # de travail détruirait à sa sortie les segments qu'il a ouverts, y compris les résultats
+        resource_tracker.ensure_running()
+        self.taches = contexte.Queue()
+        self.resultats = contexte.Queue()
+        self.processus = [contexte.Process(target=travailleur, args=(self.taches, self.resultats), daemon=True)
+                          for _ in range(self.n_processus)]
+        for p in self.processus:
+            p.start()
+        # Segments alloués par ce pool, indexés par l'adresse du tableau de sortie
+        self.segments = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    # Alloue un tableau numpy dans un nouveau segment de mémoire partagée
+    def allouer(self, forme, dtype):
+        taille = max(int(np.prod(forme)) * np.dtype(dtype).itemsize, 1)
+        segment = shared_memory.SharedMemory(create=True, size=taille)
+        return segment, vue(segment, forme, dtype)
+
+    # Intègre l'ensemble sur les instants temps (mêmes arguments et même résultat que
+    # ensemble.resoudre_ensemble). Chaque processus reçoit plusieurs tranches, pour équilibrer la charge.
+    def resoudre(self, ensemble, temps, dt, schema="verlet", taille_bloc=TAILLE_BLOC, trajectoires=True):
+        msg = "Schéma inconnu : " + str(schema)
+        assert schema in ("verlet", "rk4"), msg
+        if not self.processus:
+            raise RuntimeError("Le pool a été arrêté : il faut en créer un nouveau")
+        K, dtype = ensemble.K, ensemble.dtype
+        temps = np.asarray(temps, dtype=float)
+        seg_param, param = self.allouer((len(PARAMETRES), K), dtype)
+        for i, nom in enumerate(PARAMETRES):
+            param[i] = getattr(ensemble, nom)
+        forme_sortie = (temps.size, K, 2) if trajectoires else (K, 2)
+        seg_sortie, A = self.allouer(forme_sortie, dtype)
+        if trajectoires:
+            A[0] = ensemble.CI()
+
+        taille_tranche = max(taille_bloc, -(-K // (4 * self.n_processus)))
+        tranches = [(a, min(a + taille_tranche, K)) for a in range(0, K, taille_tranche)]
+        for num, (a, b) in enumerate(tranches):
+            self.taches.put((num, seg_param.name, seg_sortie.name, K, forme_sortie, dtype.str, a, b,
+                             temps, dt, schema, ensemble.small_angle, taille_bloc))
+        erreurs = []
+        restantes = len(tranches)
+        while restantes:
+            try:
+                num, erreur = self.resultats.get(timeout=DELAI_SURVEILLANCE)
+            except queue.Empty:
+                morts = [p for p in self.processus if not p.is_alive()]
+                if not morts:
+                    continue
+                # Un processus tué (signal, mémoire) ne renverra jamais sa tranche : on arrête
+                # le pool, dont les files ne sont plus dans un état cohérent
+                erreurs.append("Processus de travail arrêté (code de sortie %s)" % morts[0].exitcode)
+                self.arreter()
+                break
+            restantes -= 1
+            if erreur is not None:
+                erreurs.append("Tranche %d : %s" % (num, erreur))
+
+        # Les paramètres ne servent plus : seul le segment des résultats est conservé
+        del param
+        seg_param.close()
+        seg_param.unlink()
+        if erreurs:
+            del A
+            seg_sortie.close()
+            seg_sortie.unlink()
+            raise RuntimeError("Erreur dans un processus de travail :\n" + "\n".join(erreurs))
+        self.segments[A.__array_interface__["data"][0]] = seg_sortie
+        return A
+
+    # Libère le segment d'un tableau renvoyé par resoudre (le tableau ne doit plus être utilisé)
+    def liberer(self, A):
+        segment = self.segments.pop(A.__array_interface__["data"][0])
+        del A
+        segment.unlink()
+        try:
+            segment.close()
+        except BufferError:
+            # Des vues sur le segment existent encore : la mémoire sera rendue à leur disparition
+            pass
+
+    # Arrête immédiatement les processus de travail (après la mort de l'un d'eux)
+    def arreter(self):
+        for p in self.processus:
+            p.terminate()
+        for p in self.processus:
+            p.join()
+        self.processus = []
+
+    def fermer(self):
+        for _ in self.processus:
+            self.taches.put(None)
+        for p in self.processus:
+            p.join()
+        for adresse in list(self.segments):
+            segment = self.segments.pop(adresse)
+            segment.unlink()
+            try:
+                segment.close()
+            except BufferError:
+                # Un tableau de résultats est encore utilisé : la mémoire sera rendue à sa disparition
+                pass
@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Point d'entrée en ligne de commande pour lancer les études sans interface graphique :
+
+    python -m etudes integrateurs --sortie resultats/ --figures
+    python -m etudes pas_de_temps --config ma_config.json --param t_max=40
+
+Chaque étude est décrite par un dictionnaire de configuration (valeurs par défaut dans ETUDES),
+éventuellement complété par un fichier JSON (--config) et des paramètres --param cle=valeur.
+Les résultats sont écrits dans le dossier de sortie : un résumé resultats_<etude>.json et les tableaux
+complets dans un stockage par blocs compressés (voir stockage.py). Les bibliothèques lourdes (numpy, scipy,
+matplotlib) ne sont importées qu'au moment où elles servent : matplotlib seulement si une
+figure est demandée, avec le moteur "Agg" quand rien ne doit être affiché à l'écran.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# Seules des bibliothèques standard légères sont importées au chargement du module
+import argparse
+import json
+import os
+import time
+
+"""
+CONFIGURATIONS PAR DEFAUT
+"""
+ETUDES = {
+    # Trajectoires, erreur et énergie de quelques intégrateurs (équivalent de test_integrateurs.py)
+    "integrateurs": {
+        "R": 0.5,
+        "t_max": 15.0,
+        "N": 1001,
+        "th_0": 1.5707963267948966,
+        "w_0": 0.0,
+        "small_angle": False,
+        "solvers": [{"solver": "ExplicitMidpoint", "color": "-b", "dt": 1e-4},
+                    {"solver": "RungeKutta4", "color": "-g", "dt": 9e-3},
+                    {"solver": "VelocityVerlet", "color": "-r", "dt": 4e-4}],
+    },
+    # Erreur et temps d'exécution en fonction du pas de temps (équivalent de test_pas_de_temps.py)
+    "pas_de_temps": {
+        "R": 0.5,
+        "t_max": 20.0,
+        "N": 101,
+        "th_0": 1.5707963267948966,
+        "w_0": 0.0,
+        "small_angle": True,
+        # Limites de chaque calcul : budget en s et plafond de l'erreur en rad (None : pas de limite).
+        # Les pas plus petits qu'un pas arrêté par le budget sont sautés.
+        "budget": None,
+        "plafond_erreur": None,
+        "solvers": [{"solver": "ForwardEuler", "color": "-k", "dt_list": [2e-3, 1e-3, 3e-4, 1e-4]},
+                    {"solver": "ExplicitMidpoint", "color": "-b", "dt_list": [6e-2, 2e-2, 1e-2, 6e-3, 2e-3, 1e-3]},
+                    {"solver": "MecaVelocityVerlet", "color": "-c", "dt_list": [0.1, 6e-2, 2e-2, 1e-2, 6e-3, 2e-3, 1e-3]},
+                    {"solver": "RungeKutta4", "color": "-g", "dt_list": [0.2, 0.1, 6e-2, 2e-2, 1e-2, 6e-3, 2e-3]}],
+    },
+    # Plancher d'erreur des modes de précision : double, simple (float32) et mixte
+    # (état en float64, force en float32). Chaque mode est [dtype, dtype_force] ou
+    # [dtype, dtype_force, compense] pour utiliser la sommation compensée des mises à jour.
+    "precision": {
+        "R": 0.5,
+        "t_max": 20.0,
+        "N": 101,
+        "th_0": 1.5707963267948966,
+        "w_0": 0.0,
+        "small_angle": True,
+        "solver": "RungeKutta4",
+        "budget": None,
+        "plafond_erreur": None,
+        "dt_list": [0.1, 6e-2, 2e-2, 1e-2, 6e-3, 2e-3, 1e-3, 6e-4, 2e-4, 1e-4],
+        "modes": {"double": ["float64", None],
+                  "simple": ["float32", None],
+                  "mixte": ["float64", "float32"],
+                  "double_compense": ["float64", None, True],
+                  "simple_compense": ["float32", None, True]},
+        "colors": {"double": "-k", "simple": "-r", "mixte": "-b", "double_compense": "--k", "simple_compense": "--r"},
+    },
+    # Coût et précision de la projection sur la surface d'énergie sur un calcul long.
+    # projections : 0 sans projection, k pour une projection tous les k pas.
+    "projection": {
+        "R": 0.5,
+        "t_max": 200.0,
+        "N": 2001,
+        "th_0": 1.5707963267948966,
+        "w_0": 0.0,
+        "small_angle": False,
+        "solvers": [{"solver": "ExplicitMidpoint", "dt_list": [2e-2, 1e-2, 6e-3, 2e-3]},
+                    {"solver": "RungeKutta4", "dt_list": [0.1, 6e-2, 2e-2, 1e-2]}],
+        "projections": [0, 1, 10],
+        "colors": {"0": "-", "1": "--", "10": ":"},
+    },
+    # Mémoire utilisée par un calcul en fonction du nombre d'instants de sortie N,
+    # pour dimensionner un calcul avant de le lancer (voir memoire.py)
+    "memoire": {
+        "R": 0.5,
+        "t_max": 15.0,
+        "th_0": 1.5707963267948966,
+        "w_0": 0.0,
+        "small_angle": False,
+        "N_list": [1001, 10001, 100001],
+        "solvers": [{"solver": "RungeKutta4", "dt": 1e-3, "color": "-b"},
+                    {"solver": "MecaVelocityVerlet", "dt": 1e-3, "color": "-r"},
+                    {"solver": "ButcherRK4", "dt": 1e-3, "color": "-g"}],
+    },
+}
+
+# Modules dans lesquels on cherche les intégrateurs désignés par leur nom
+MODULES_SOLVEURS = ("integrateur_complet", "integrateur_meca", "integrateur_implicite", "integrateur_butcher",
+                    "integrateur_lineaire")
+
+"""
+FONCTIONS
+"""
+# Construit la configuration d'une étude : valeurs par défaut, puis fichier JSON, puis paramètres --param
+def charger_config(nom, fichier=None, params=()):
+    msg = "Etude inconnue : " + nom + " (disponibles : " + ", ".join(ETUDES) + ")"
+    assert nom in ETUDES, msg
+    config = json.loads(json.dumps(ETUDES[nom]))
+    if fichier is not None:
+        with open(fichier, encoding="utf-8") as f:
+            config.update(json.load(f))
+    for param in params:
+        cle, valeur = param.split("=", 1)
+        try:
+            config[cle] = json.loads(valeur)
+        except json.JSONDecodeError:
+            config[cle] = valeur
+    return config
+
+# Renvoie la classe d'intégrateur désignée par son nom (ou "Odeint" pour l'intégrateur de scipy)
+def trouver_solveur(nom):
+    if nom == "Odeint":
+        return nom
+    import importlib
+    for nom_module in MODULES_SOLVEURS:
+        module = importlib.import_module(nom_module)
+        if hasattr(module, nom):
+            return getattr(module, nom)
+    raise ValueError("Intégrateur inconnu : " + nom)
+
+# Crée le pendule et la liste des instants de sortie décrits par la configuration
+def preparer(config):
+    import numpy as np
+    from pendule_plan import Pendule
+    temps = np.linspace(0, config["t_max"], config["N"])
+    pendule = Pendule(L=config["R"], theta0=config["th_0"], omega0=config["w_0"],
+                      small_angle=config["small_angle"], gamma=config.get("gamma", 0))
+    return pendule, temps
+
+# Solution de référence : exacte dans l'approximation des petits angles, odeint sinon
+def calculer_reference(pendule, temps):
+    start = time.perf_counter()
+    if pendule.small_angle and not pendule.gamma:
+        A_ref = pendule.A_math(temps)
+    else:
+        from solution_reference import reference_odeint
+        A_ref = reference_odeint(pendule, temps)
+    elapsed = (time.perf_counter() - start) * 1000
+    from memoire import formater_octets
+    print("Le calcul de la solution de référence a duré", elapsed, "ms, tableau de", formater_octets(A_ref.nbytes))
+    return A_ref
+
+# Résolution avec chaque intégrateur de la liste (même calcul que dans test_integrateurs.py)
+def calculs_pendule(solver_list, pendule, A_ref, temps):
+    import numpy as np
+    for item in solver_list:
+        solver_class = item["solver_class"]
+        dt = item["dt"]
+        start = time.perf_counter()
+        if solver_class == "Odeint":
+            from scipy.integrate import odeint
+            A = odeint(pendule.derA, pendule.CI(), temps, tfirst=True)
+        else:
+            A = solver_class(pendule).solve(pendule.CI(), temps, dt)
+        elapsed = (time.perf_counter() - start) * 1000
+        print("Le calcul via", item["solver"], "a duré", elapsed, "ms")
+        erreur = np.abs(A[:, 0] - A_ref[:, 0])
+        print("L'erreur via", item["solver"], "vaut", np.max(erreur))
+        item["A"] = A
+        item["erreur"] = erreur
+        item["em"] = pendule.Em(A.T)
+        item["elapsed"] = elapsed
+        # Mémoire gardée pour cet intégrateur jusqu'à la fin de l'étude
+        item["octets"] = sum(item[nom].nbytes for nom in ("A", "erreur", "em"))
+        from memoire import formater_octets
+        print("Les tableaux gardés pour", item["solver"], "occupent", formater_octets(item["octets"]))
+
+# Importe pyplot au dernier moment. Sans affichage demandé, on utilise un moteur sans écran.
+def importer_pyplot(afficher):
+    import matplotlib
+    if not afficher:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+# Les courbes sont sous-échantillonnées à la résolution de la figure (voir affichage.py)
+def tracer_courbes(plt, nom, x, series, xlabel, ylabel, log=False):
+    from affichage import plot_reduit
+    plt.figure(nom)
+    for label, y, color in series:
+        plot_reduit(x if not callable(x) else x(label), y, color, lw=1.0, label=label)
+    plt.legend(loc='lower right')
+    plt.title(nom)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    if log:
+        plt.xscale("log")
+        plt.yscale("log")
+    plt.grid(True)
+
+def sauver_figures(plt, sortie, format_figures):
+    for numero in plt.get_fignums():
+        fig = plt.figure(numero)
+        nom = fig.get_label().replace(" ", "_").replace("'", "_")
+        fig.savefig(os.path.join(sortie, nom + "." + format_figures))
+
+def ecrire_json(sortie, resultats):
+    with open(os.path.join(sortie, "resultats_" + resultats["etude"] + ".json"), "w", encoding="utf-8") as f:
+        json.dump(resultats, f, indent=2, ensure_ascii=False)
+
+"""
+ETUDES
+"""
+def etude_integrateurs(config, sortie, figures=False, afficher=False, format_figures="pdf"):
+    import numpy as np
+    pendule, temps = preparer(config)
+    A_ref = calculer_reference(pendule, temps)
+    solver_list = [dict(item, solver_class=trouver_solveur(item["solver"])) for item in config["solvers"]]
+    calculs_pendule(solver_list, pendule, A_ref, temps)
+
+    # Trajectoires, erreurs et énergies dans le stockage par blocs (voir stockage.py)
+    from stockage import Stockage, parametres_modele
+    stockage = Stockage(os.path.join(sortie, "stockage"))
+    params = parametres_modele(pendule)
+    execution = stockage.creer_execution(etude="integrateurs", solver="reference", **params)
+    execution.ecrire("temps", temps)
+    execution.ecrire("A", A_ref)
+    execution.ecrire("em", pendule.Em(A_ref.T))
+    for item in solver_list:
+        execution = stockage.creer_execution(etude="integrateurs", solver=item["solver"], dt=item["dt"],
+                                             temps_ms=item["elapsed"], erreur_max=np.max(item["erreur"]), **params)
+        execution.ecrire("temps", temps)
+        for nom in ("A", "erreur", "em"):
+            execution.ecrire(nom, item[nom])
+    ecrire_json(sortie, {"etude": "integrateurs", "config": config,
+                         "resultats": [{"solver": item["solver"], "dt": item["dt"],
+                                        "temps_ms": item["elapsed"], "octets": item["octets"],
+                                        "erreur_max": float(np.max(item["erreur"]))} for item in solver_list]})
+
+    if figures or afficher:
+        plt = importer_pyplot(afficher)
+        tracer_courbes(plt, "Angle au cours du temps", temps,
+                       [("référence", A_ref[:, 0], "-k")] + [(i["solver"], i["A"][:, 0], i["color"]) for i in solver_list],
+                       "Temps (s)", "Angle (rad)")
+        tracer_courbes(plt, "Erreur au cours du temps", temps,
+                       [(i["solver"], i["erreur"], i["color"]) for i in solver_list],
+                       "Temps (s)", "Erreur angulaire (rad)")
+        tracer_courbes(plt, "Energie mécanique au cours du temps", temps,
+                       [("référence", pendule.Em(A_ref.T), "-k")] + [(i["solver"], i["em"], i["color"]) for i in solver_list],
+                       "Temps (s)", "Energie mécanique (J/kg)")
+        if figures:
+            sauver_figures(plt, sortie, format_figures)
+        if afficher:
+            plt.show()
+
+def etude_pas_de_temps(config, sortie, figures=False, afficher=False, format_figures="pdf"):
+    pendule, temps = preparer(config)
+    A_ref = calculer_reference(pendule, temps)
+    solver_list = config["solvers"]
+    for item in solver_list:
+        solver = trouver_solveur(item["solver"])(pendule)
+        time_list, error_list = solver.return_error(temps, item["dt_list"], A_ref, config.get("budget"),
+                                                    config.get("plafond_erreur"))
+        item["time_list"] = list(time_list)
+        item["error_list"] = [float(e) for e in error_list]
+        item["statuts"] = getattr(solver, "statuts", ["ok"] * len(error_list))
+    from stockage import Stockage, parametres_modele
+    stockage = Stockage(os.path.join(sortie, "stockage"))
+    for item in solver_list:
+        execution = stockage.creer_execution(etude="pas_de_temps", solver=item["solver"], **parametres_modele(pendule))
+        execution.ecrire("dt", item["dt_list"])
+        execution.ecrire("temps_ms", item["time_list"])
+        execution.ecrire("erreur", item["error_list"])
+    ecrire_json(sortie, {"etude": "pas_de_temps", "config": config})
+
+    if figures or afficher:
+        plt = importer_pyplot(afficher)
+        dt_de = {item["solver"]: item["dt_list"] for item in solver_list}
+        err_de = {item["solver"]: item["error_list"] for item in solver_list}
+        tracer_courbes(plt, "Erreur en fonction du pas de temps", dt_de.get,
+                       [(i["solver"], i["error_list"], i["color"]) for i in solver_list],
+                       "Pas de temps (s)", "Erreur (rad)", log=True)
+        tracer_courbes(plt, "Temps d'exécution en fonction du pas de temps", dt_de.get,
+                       [(i["solver"], i["time_list"], i["color"]) for i in solver_list],
+                       "Pas de temps (s)", "Temps d'exécution (ms)", log=True)
+        tracer_courbes(plt, "Temps d'exécution en fonction de l'erreur", err_de.get,
+                       [(i["solver"], i["time_list"], i["color"]) for i in solver_list],
+                       "Erreur (rad)", "Temps d'exécution (ms)", log=True)
+        if figures:
+            sauver_figures(plt, sortie, format_figures)
+        if afficher:
+            plt.show()
+
+def etude_precision(config, sortie, figures=False, afficher=False, format_figures="pdf"):
+    import numpy as np
+    pendule, temps = preparer(config)
+    A_ref = calculer_reference(pendule, temps)
+    solver_class = trouver_solveur(config["solver"])
+    from stockage import Stockage, parametres_modele
+    stockage = Stockage(os.path.join(sortie, "stockage"))
+    resultats = []
+    for mode, options in config["modes"].items():
+        dtype, dtype_force = options[:2]
+        compense = bool(options[2]) if len(options) > 2 else False
+        # Le modèle travaille dans la précision de la force
+        pendule.dtype = np.dtype(dtype_force or dtype)
+        solver = solver_class(pendule, dtype=dtype, dtype_force=dtype_force, compense=compense)
+        time_list, error_list = solver.return_error(temps, config["dt_list"], A_ref, config.get("budget"),
+                                                    config.get("plafond_erreur"))
+        statuts = getattr(solver, "statuts", ["ok"] * len(error_list))
+        # Le plancher n'est cherché que parmi les calculs menés jusqu'au bout
+        plancher = min((e for e, statut in zip(error_list, statuts) if statut == "ok"), default=float("nan"))
+        resultats.append({"mode": mode, "dtype": dtype, "dtype_force": dtype_force, "compense": compense,
+                          "time_list": list(time_list), "error_list": [float(e) for e in error_list],
+                          "statuts": statuts, "plancher": float(plancher)})
+        print("Mode", mode, ": plancher d'erreur", plancher)
+        execution = stockage.creer_execution(etude="precision", solver=config["solver"], mode=mode, dtype=dtype,
+                                             dtype_force=dtype_force, compense=compense,
+                                             **parametres_modele(pendule))
+        execution.ecrire("dt", config["dt_list"])
+        execution.ecrire("temps_ms", time_list)
+        execution.ecrire("erreur", error_list)
+    ecrire_json(sortie, {"etude": "precision", "config": config, "resultats": resultats})
+
+    if figures or afficher:
+        plt = importer_pyplot(afficher)
+        tracer_courbes(plt, "Erreur en fonction du pas de temps selon la précision", config["dt_list"],
+                       [(r["mode"], r["error_list"], config["colors"].get(r["mode"], "-")) for r in resultats],
+                       "Pas de temps (s)", "Erreur (rad)", log=True)
+        if figures:
+            sauver_figures(plt, sortie, format_figures)
+        if afficher:
+            plt.show()
+
+def etude_projection(config, sortie, figures=False, afficher=False, format_figures="pdf"):
+    import numpy as np
+    pendule, temps = preparer(config)
+    A_ref = calculer_reference(pendule, temps)
+    E0 = pendule.Em(pendule.CI())
+    from stockage import Stockage, parametres_modele
+    stockage = Stockage(os.path.join(sortie, "stockage"))
+    resultats = []
+    for item in config["solvers"]:
+        solver_class = trouver_solveur(item["solver"])
+        for projection in config["projections"]:
+            time_list, error_list, derive_list = [], [], []
+            for dt in item["dt_list"]:
+                start = time.perf_counter()
+                A = solver_class(pendule, projection=projection).solve(pendule.CI(), temps, dt)
+                time_list.append((time.perf_counter() - start) * 1000)
+                error_list.append(float(np.max(np.abs(A[:, 0] - A_ref[:, 0]))))
+                # Dérive relative maximale de l'énergie mécanique
+                derive_list.append(float(np.max(np.abs(pendule.Em(A.T) - E0)) / abs(E0)))
+                print(item["solver"], "projection", projection, "dt", dt, ":", time_list[-1], "ms, erreur",
+                      error_list[-1], ", dérive de l'énergie", derive_list[-1])
+            resultats.append({"solver": item["solver"], "projection": projection, "dt_list": item["dt_list"],
+                              "time_list": time_list, "error_list": error_list, "derive_list": derive_list})
+            execution = stockage.creer_execution(etude="projection", solver=item["solver"], projection=projection,
+                                                 **parametres_modele(pendule))
+            execution.ecrire("dt", item["dt_list"])
+            execution.ecrire("temps_ms", time_list)
+            execution.ecrire("erreur", error_list)
+            execution.ecrire("derive_energie", derive_list)
+    ecrire_json(sortie, {"etude": "projection", "config": config, "resultats": resultats})
+
+    if figures or afficher:
+        plt = importer_pyplot(afficher)
+        nom = lambda r: r["solver"] + " projection " + str(r["projection"])
+        style = lambda r: config["colors"].get(str(r["projection"]), "-")
+        erreur_de = {nom(r): r["error_list"] for r in resultats}
+        tracer_courbes(plt, "Temps d'exécution en fonction de l'erreur avec projection", erreur_de.get,
+                       [(nom(r), r["time_list"], style(r)) for r in resultats],
+                       "Erreur (rad)", "Temps d'exécution (ms)", log=True)
+        dt_de = {nom(r): r["dt_list"] for r in resultats}
+        tracer_courbes(plt, "Dérive de l'énergie en fonction du pas de temps", dt_de.get,
+                       [(nom(r), r["derive_list"], style(r)) for r in resultats],
+                       "Pas de temps (s)", "Dérive relative de l'énergie", log=True)
+        if figures:
+            sauver_figures(plt, sortie, format_figures)
+        if afficher:
+            plt.show()
+
+def etude_memoire(config, sortie, figures=False, afficher=False, format_figures="pdf"):
+    from memoire import rapport_memoire, formater_octets
+    from stockage import Stockage, parametres_modele
+    stockage = Stockage(os.path.join(sortie, "stockage"))
+    resultats = []
+    for item in config["solvers"]:
+        solver_class = trouver_solveur(item["solver"])
+        rapports = []
+        for N in config["N_list"]:
+            pendule, temps = preparer(dict(config, N=N))
+            rapport = rapport_memoire(solver_class(pendule), pendule.CI(), temps, item["dt"])
+            rapport["N"] = N
+            rapports.append(rapport)
+            print(item["solver"], "N =", N, ":", rapport["temps_ms"], "ms, pic", formater_octets(rapport["pic_octets"]),
+                  ", tableaux du solveur", formater_octets(rapport["tampons"]["total"]))
+            for nom, octets in rapport["tampons"].items():
+                if nom != "total":
+                    print("   ", nom, ":", formater_octets(octets))
+            if "par_pas" in rapport:
+                print("    par pas :", formater_octets(rapport["par_pas"]["temporaires_octets"]), "temporaires")
+        # Les tableaux de sortie grandissent comme N : le coût par instant permet d'estimer un calcul plus long
+        octets_par_instant = (rapports[-1]["pic_octets"] - rapports[0]["pic_octets"]) / \
+            max(config["N_list"][-1] - config["N_list"][0], 1)
+        print(item["solver"], ": environ", formater_octets(octets_par_instant), "par instant de sortie")
+        resultats.append({"solver": item["solver"], "dt": item["dt"], "color": item.get("color", "-"),
+                          "rapports": rapports, "octets_par_instant": octets_par_instant})
+        execution = stockage.creer_execution(etude="memoire", solver=item["solver"], dt=item["dt"],
+                                             octets_par_instant=octets_par_instant, **parametres_modele(pendule))
+        execution.ecrire("N", config["N_list"])
+        execution.ecrire("temps_ms", [r["temps_ms"] for r in rapports])
+        execution.ecrire("pic_octets", [r["pic_octets"] for r in rapports])
+        execution.ecrire("tampons_octets", [r["tampons"]["total"] for r in rapports])
+    ecrire_json(sortie, {"etude": "memoire", "config": config, "resultats": resultats})
+
+    if figures or afficher:
+        plt = importer_pyplot(afficher)
+        tracer_courbes(plt, "Pic mémoire en fonction du nombre d'instants", config["N_list"],
+                       [(r["solver"], [x["pic_octets"] for x in r["rapports"]], r["color"]) for r in resultats],
+                       "Nombre d'instants de sortie", "Pic des allocations (octets)", log=True)
+        if figures:
+            sauver_figures(plt, sortie, format_figures)
+        if afficher:
+            plt.show()
+
+FONCTIONS_ETUDES = {"integrateurs": etude_integrateurs,
+                    "pas_de_temps": etude_pas_de_temps,
+                    "precision": etude_precision,
+                    "projection": etude_projection,
+                    "memoire": etude_memoire}
+
+"""
+CODE PRINCIPAL
+"""
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m etudes", description="Lance une étude du pendule plan.")
+    parser.add_argument("etude", choices=sorted(ETUDES), help="nom de l'étude à lancer")
+    parser.add_argument("--config", help="fichier JSON complétant la configuration par défaut")
+    parser.add_argument("--param", action="append", default=[], metavar="CLE=VALEUR",
+                        help="modifie un paramètre de la configuration (valeur au format JSON)")
+    parser.add_argument("--sortie", default=".", help="dossier où écrire les résultats")
+    parser.add_argument("--figures", action="store_true", help="enregistre les figures dans le dossier de sortie")
+    parser.add_argument("--format", default="pdf", help="format des figures enregistrées (pdf, png, ...)")
+    parser.add_argument("--afficher", action="store_true", help="affiche les figures à l'écran")
+    args = parser.parse_args(argv)
+
+    config = charger_config(args.etude, args.config, args.param)
+    os.makedirs(args.sortie, exist_ok=True)
+    FONCTIONS_ETUDES[args.etude](config, args.sortie, figures=args.figures, afficher=args.afficher,
+                                 format_figures=args.format)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code estime les paramètres d'un pendule (L, g, gamma, theta0, omega0) à partir
+d'un enregistrement de l'angle (t, theta) par la méthode de Levenberg-Marquardt.
+- Le résidu et sa jacobienne sont obtenus en une seule intégration du modèle augmenté
+  des équations de sensibilité (module sensibilites) : pas de différences finies.
+- Le point de départ est donné par la solution analytique aux petits angles avec frottement :
+  pseudo-pulsation par transformée de Fourier (corrigée de l'effet de l'amplitude),
+  amortissement par décrément logarithmique des maxima, conditions initiales par un
+  polynôme ajusté sur les premiers points.
+Seul le rapport g/L intervient dans le mouvement : L et g ne peuvent pas être estimés
+ensemble, g est donc fixé par défaut (9.81) et L est estimé.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+from scipy.integrate import odeint
+
+from pendule_plan import Pendule
+from sensibilites import ModeleSensibilites, separer
+
+"""
+FONCTIONS
+"""
+# Estimation initiale à partir de la solution aux petits angles theta = exp(-gamma t / 2) A cos(wd t + phi)
+def depart_petits_angles(t, theta, g=9.81):
+    t = np.asarray(t, dtype=float)
+    theta = np.asarray(theta, dtype=float)
+    tau = t - t[0]
+    # Pseudo-pulsation : pic du spectre, affiné par interpolation parabolique
+    n = 4 * theta.size
+    h = (tau[-1] - tau[0]) / (theta.size - 1)
+    spectre = np.abs(np.fft.rfft(theta - theta.mean(), n))
+    k = max(1, int(np.argmax(spectre[1:])) + 1)
+    if 0 < k < spectre.size - 1:
+        a, b, c = spectre[k - 1], spectre[k], spectre[k + 1]
+        k = k + 0.5 * (a - c) / (a - 2 * b + c)
+    wd = 2 * np.pi * k / (n * h)
+    # Amortissement : pente du logarithme des maxima de |theta|
+    absolu = np.abs(theta)
+    maxima = np.flatnonzero((absolu[1:-1] > absolu[:-2]) & (absolu[1:-1] >= absolu[2:])) + 1
+    gamma = 0.0
+    if maxima.size >= 3:
+        pente = np.polyfit(tau[maxima], np.log(absolu[maxima]), 1)[0]
+        gamma = max(0.0, -2 * pente)
+    # Correction de la période aux grandes amplitudes : w = w0 (1 - amplitude^2 / 16),
+    # avec l'amplitude médiane des oscillations enregistrées
+    amplitude = min(np.median(absolu[maxima]) if maxima.size else np.max(absolu), 2.5)
+    w0 = wd / (1 - amplitude**2 / 16)
+    # Conditions initiales : polynôme de degré 2 ajusté sur les premiers points
+    n_debut = min(7, theta.size)
+    poly = np.polyfit(tau[:n_debut], theta[:n_debut], min(2, n_debut - 1))
+    return {"L": g / (w0**2 + gamma**2 / 4), "g": g, "gamma": gamma,
+            "theta0": np.polyval(poly, 0.0), "omega0": np.polyval(np.polyder(poly), 0.0)}
+
+# Angle simulé et ses dérivées par rapport aux paramètres, aux instants t.
+# Sans solveur, l'intégration est faite par odeint (pas adaptatif) ; sinon par le solveur donné au pas dt.
+def simuler(valeurs, parametres, t, solveur=None, dt=None):
+    pendule = Pendule(valeurs["L"], g=valeurs["g"], theta0=valeurs["theta0"], omega0=valeurs["omega0"],
+                      gamma=valeurs["gamma"])
+    augmente = ModeleSensibilites(pendule, parametres)
+    if solveur is None:
+        u = odeint(augmente.derA, augmente.CI(), t, tfirst=True, rtol=1e-9, atol=1e-11)
+    else:
+        u = solveur(augmente).solve(augmente.CI(), t, dt)
+    A, S = separer(u, augmente.p)
+    return A[:, 0], S[:, 0, :]
+
+# Ajuste le modèle du pendule à l'enregistrement (t, theta) par Levenberg-Marquardt.
+# parametres : paramètres estimés (les autres gardent la valeur de depart, ou la valeur
+# de l'estimation aux petits angles), depart : dictionnaire de valeurs initiales.
+# Renvoie un dictionnaire : valeurs estimées, écarts-types, résidu quadratique moyen, itérations.
+def ajuster(t, theta, parametres=("L", "gamma", "theta0", "omega0"), depart=None, g=9.81,
+            solveur=None, dt=None, max_iter=50, tol=1e-8):
+    msg = "L et g ne sont pas identifiables séparément (seul g/L intervient)"
+    assert not ("L" in parametres and "g" in parametres), msg
+    t = np.asarray(t, dtype=float)
+    theta = np.asarray(theta, dtype=float)
+    valeurs = depart_petits_angles(t, theta, g)
+    valeurs.update(depart or {})
+    if solveur is not None and dt is None:
+        dt = np.min(np.diff(t))
+    # Le modèle démarre au premier instant de mesure
+    tau = t - t[0]
+
+    def evaluer(valeurs):
+        theta_sim, J = simuler(valeurs, parametres, tau, solveur, dt)
+        r = theta_sim - theta
+        return r, J, r @ r
+
+    p = np.array([valeurs[nom] for nom in parametres], dtype=float)
+    r, J, cout = evaluer(valeurs)
+    lam = 1e-3
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        JTJ = J.T @ J
+        gradient = J.T @ r
+        # Pas de Levenberg-Marquardt, avec la mise à l'échelle de Marquardt (diagonale de JTJ)
+        D = np.diag(np.diag(JTJ) + 1e-30)
+        delta = np.linalg.solve(JTJ + lam * D, -gradient)
+        essai = dict(valeurs)
+        for nom, v in zip(parametres, p + delta):
+            essai[nom] = v
+        # Un pas qui rend la longueur ou le frottement non physiques est refusé
+        if essai["L"] > 0 and essai["gamma"] >= 0:
+            r_essai, J_essai, cout_essai = evaluer(essai)
+        else:
+            cout_essai = np.inf
+        if cout_essai < cout:
+            fini = abs(cout - cout_essai) <= tol * cout or np.max(np.abs(delta)) <= tol * (1 + np.max(np.abs(p)))
+            valeurs, p, r, J, cout = essai, p + delta, r_essai, J_essai, cout_essai
+            lam = max(lam / 3, 1e-12)
+            if fini:
+                break
+        else:
+            lam *= 4
+            if lam > 1e12:
+                break
+
+    # Ecarts-types des paramètres estimés (bruit de mesure supposé blanc)
+    ddl = max(theta.size - len(parametres), 1)
+    covariance = cout / ddl * np.linalg.pinv(J.T @ J)
+    resultat = {nom: float(valeurs[nom]) for nom in ("L", "g", "gamma", "theta0", "omega0")}
+    resultat["ecarts_types"] = {nom: float(np.sqrt(covariance[j, j])) for j, nom in enumerate(parametres)}
+    resultat["residu"] = float(np.sqrt(cout / theta.size))
+    resultat["iterations"] = iterations
+    return resultat
+
+# Ajuste une série d'enregistrements [(t, theta), ...] avec les mêmes options
+def ajuster_lot(enregistrements, **options):
+    return [ajuster(t, theta, **options) for t, theta in enregistrements]
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code propose un moteur générique de méthodes de Runge-Kutta explicites, défini par
+un tableau de Butcher (A, b, c). Les étages sont rangés dans un tableau (s, neq) alloué
+une fois par calcul, et les combinaisons d'étages sont des produits matriciels
+(seuls les coefficients non nuls sont utilisés).
+Ajouter un schéma revient à donner son tableau, sans écrire de boucle de calcul.
+Bibliothèque de tableaux fournie : règle 3/8, SSPRK3, Ralston, Cash-Karp, Verner,
+ainsi qu'Euler, point milieu et RK4 (pour comparaison avec les versions écrites à la main).
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+
+from integrateur_complet import ODESolver
+
+"""
+CLASSES
+"""
+class ExplicitRungeKutta(ODESolver):
+    # Tableau de Butcher (A triangulaire inférieure stricte, b, c), défini dans les classes filles
+    A = None
+    b = None
+    c = None
+
+    def __init__(self, f, **precision):
+        super().__init__(f, **precision)
+        A = np.asarray(self.A, dtype=float)
+        b = np.asarray(self.b, dtype=float)
+        self.s = b.size
+        msg = "Le tableau de Butcher d'une méthode explicite doit être triangulaire inférieur strict"
+        assert A.shape == (self.s, self.s) and not np.any(np.triu(A)), msg
+        self.c = np.asarray(self.c, dtype=float)
+        # Pour chaque étage : indices des étages précédents utilisés et coefficients correspondants.
+        # Les coefficients sont dans la précision de l'état (en simple précision, un coefficient
+        # float64 ferait passer tout le calcul en double précision).
+        # Une tranche est utilisée à la place d'une liste d'indices quand les étages sont consécutifs
+        self.lignes = [self.selection(A[i, :i]) for i in range(self.s)]
+        self.poids = self.selection(b)
+        self.A = A
+        self.b = b
+        # Tableau des étages et pas des coefficients, remis à zéro à chaque calcul
+        # (créés ici aussi pour qu'une reprise, qui ne passe pas par solve, puisse les allouer)
+        self._K = None
+        self._dt_coef = None
+
+    def selection(self, ligne):
+        j = np.flatnonzero(ligne)
+        if j.size and j[-1] - j[0] == j.size - 1:
+            return slice(j[0], j[-1] + 1), ligne[j].astype(self.dtype)
+        return j, ligne[j].astype(self.dtype)
+
+    def solve(self, u0, temps, dt, **options):
+        # Tableau des étages, alloué au premier pas, et coefficients multipliés par le pas de temps
+        self._K = None
+        self._dt_coef = None
+        return super().solve(u0, temps, dt, **options)
+
+    def advance(self, dt):
+        u, f, t = self.ut, self.f, self.t
+        K = self._K
+        if K is None or K.shape[1:] != np.shape(u):
+            K = self._K = np.empty((self.s,) + np.shape(u), dtype=self.dtype)
+        # Le pas ne change qu'entre deux instants de sortie : les coefficients dt * a_ij sont
+        # recalculés seulement dans ce cas
+        if dt != self._dt_coef:
+            self._lignes_dt = [(j, a * self.dtype.type(dt), self.c[i] * dt) for i, (j, a) in enumerate(self.lignes)]
+            j, b = self.poids
+            self._poids_dt = (j, b * self.dtype.type(dt))
+            self._dt_coef = dt
+        for i, (j, a, cdt) in enumerate(self._lignes_dt):
+            if a.size:
+                K[i] = f(t + cdt, u + a @ K[j])
+            else:
+                K[i] = f(t + cdt, u)
+        j, b = self._poids_dt
+        self.accumuler(u, b @ K[j])
+
+"""
+BIBLIOTHEQUE DE TABLEAUX
+"""
+class ButcherEuler(ExplicitRungeKutta):
+    A = [[0.0]]
+    b = [1.0]
+    c = [0.0]
+
+class ButcherMidpoint(ExplicitRungeKutta):
+    A = [[0.0, 0.0],
+         [1/2, 0.0]]
+    b = [0.0, 1.0]
+    c = [0.0, 1/2]
+
+class ButcherRK4(ExplicitRungeKutta):
+    A = [[0.0, 0.0, 0.0, 0.0],
+         [1/2, 0.0, 0.0, 0.0],
+         [0.0, 1/2, 0.0, 0.0],
+         [0.0, 0.0, 1.0, 0.0]]
+    b = [1/6, 1/3, 1/3, 1/6]
+    c = [0.0, 1/2, 1/2, 1.0]
+
+# Méthode de Ralston d'ordre 2 (erreur de troncature minimale parmi les méthodes à 2 étages)
+class Ralston(ExplicitRungeKutta):
+    A = [[0.0, 0.0],
+         [2/3, 0.0]]
+    b = [1/4, 3/4]
+    c = [0.0, 2/3]
+
+# Méthode de Shu-Osher d'ordre 3, qui préserve la décroissance des normes (SSP)
+class SSPRK3(ExplicitRungeKutta):
+    A = [[0.0, 0.0, 0.0],
+         [1.0, 0.0, 0.0],
+         [1/4, 1/4, 0.0]]
+    b = [1/6, 1/6, 2/3]
+    c = [0.0, 1.0, 1/2]
+
+# Règle 3/8 de Kutta, d'ordre 4
+class RungeKutta38(ExplicitRungeKutta):
+    A = [[0.0, 0.0, 0.0, 0.0],
+         [1/3, 0.0, 0.0, 0.0],
+         [-1/3, 1.0, 0.0, 0.0],
+         [1.0, -1.0, 1.0, 0.0]]
+    b = [1/8, 3/8, 3/8, 1/8]
+    c = [0.0, 1/3, 2/3, 1.0]
+
+# Méthode de Cash-Karp : solution d'ordre 5 de la paire emboîtée 5(4)
+class CashKarp(ExplicitRungeKutta):
+    A = [[0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+         [1/5, 0.0, 0.0, 0.0, 0.0, 0.0],
+         [3/40, 9/40, 0.0, 0.0, 0.0, 0.0],
+         [3/10, -9/10, 6/5, 0.0, 0.0, 0.0],
+         [-11/54, 5/2, -70/27, 35/27, 0.0, 0.0],
+         [1631/55296, 175/512, 575/13824, 44275/110592, 253/4096, 0.0]]
+    b = [37/378, 0.0, 250/621, 125/594, 0.0, 512/1771]
+    c = [0.0, 1/5, 3/10, 3/5, 1.0, 7/8]
+
+# Méthode de Verner (DVERK) : solution d'ordre 6 de la paire emboîtée 6(5)
+class Verner65(ExplicitRungeKutta):
+    A = [[0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+         [1/6, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+         [4/75, 16/75, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+         [5/6, -8/3, 5/2, 0.0, 0.0, 0.0, 0.0, 0.0],
+         [-165/64, 55/6, -425/64, 85/96, 0.0, 0.0, 0.0, 0.0],
+         [12/5, -8.0, 4015/612, -11/36, 88/255, 0.0, 0.0, 0.0],
+         [-8263/15000, 124/75, -643/680, -81/250, 2484/10625, 0.0, 0.0, 0.0],
+         [3501/1720, -300/43, 297275/52632, -319/2322, 24068/84065, 0.0, 3850/26703, 0.0]]
+    b = [3/40, 0.0, 875/2244, 23/72, 264/1955, 0.0, 125/11592, 43/616]
+    c = [0.0, 1/6, 4/15, 2/3, 5/6, 1.0, 1/15, 1.0]
@@ -13,89 +13,312 @@ BIBLIOTHEQUES
 # import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
 import numpy as np
 import time
+import os
 from functools import lru_cache
 
+# Renvoie une version de la fonction f qui calcule le second membre (ou la force) en précision dtype_force.
+# Les arguments tableaux sont convertis avant l'appel ; l'état reste stocké dans sa propre précision.
+def force_en_precision(f, dtype_force):
+    if dtype_force is None:
+        return f
+    def f_precision(t, *args):
+        return f(t, *[None if a is None else np.asarray(a).astype(dtype_force, copy=False) for a in args])
+    return f_precision
+
+# Sommation compensée de Kahan, en place : u <- u + du.
+# c garde les bits de poids faible perdus lors des additions précédentes et les réinjecte.
+def somme_compensee(u, du, c):
+    y = np.asarray(du, dtype=u.dtype) - c
+    s = u + y
+    c[...] = (s - u) - y
+    u[...] = s
+
+# Ecrit un point de reprise : l'état complet de l'intégrateur (méthode etat) et les tableaux
+# de sortie remplis jusqu'à l'indice n. Le fichier est d'abord écrit à côté puis renommé,
+# pour qu'une interruption pendant l'écriture ne détruise pas le point de reprise précédent.
+def ecrire_sauvegarde(solver, n, temps):
+    donnees = {"etat_" + nom: np.asarray(valeur) for nom, valeur in solver.etat().items()}
+    for nom in solver.sorties:
+        donnees["sortie_" + nom] = getattr(solver, nom)[:n + 1]
+    provisoire = solver.sauvegarde + ".tmp.npz"
+    np.savez(provisoire, solver=type(solver).__name__, n=n, temps=temps, dt=solver.dt, **donnees)
+    os.replace(provisoire, solver.sauvegarde)
+
+# Relit un point de reprise et restaure le solveur. Renvoie l'indice du dernier instant calculé
+# et la liste des instants de sortie.
+def lire_sauvegarde(solver, fichier, temps=None):
+    with np.load(fichier) as f:
+        msg = "Ce point de reprise a été écrit par " + str(f["solver"])
+        assert str(f["solver"]) == type(solver).__name__, msg
+        if temps is None:
+            temps = f["temps"]
+        n = int(f["n"])
+        solver.dt = f["dt"].item()
+        for nom in solver.sorties:
+            partiel = f["sortie_" + nom]
+            tableau = np.zeros((temps.size,) + partiel.shape[1:], dtype=partiel.dtype)
+            tableau[:n + 1] = partiel
+            setattr(solver, nom, tableau)
+        solver.restaurer_etat({cle[5:]: f[cle] for cle in f.files if cle.startswith("etat_")})
+    solver.dtype = getattr(solver, solver.sorties[0]).dtype
+    return n, temps
+
+# Limites d'un calcul : budget de temps de calcul (en s) et plafond de l'erreur sur la première
+# composante par rapport à u_ref, vérifiés à chaque instant de sortie (et tous les 1024 pas pour le budget).
+# Un calcul qui dépasse une limite s'arrête : solver.interruption vaut alors "budget" ou "erreur"
+# (None sinon) et seuls les instants de sortie calculés sont renvoyés.
+def fixer_limites(solver, budget=None, plafond=None, u_ref=None):
+    msg = "Le plafond d'erreur nécessite une solution de référence u_ref"
+    assert plafond is None or u_ref is not None, msg
+    solver.interruption = None
+    solver.limite_temps = None if budget is None else time.perf_counter() + budget
+    solver.plafond = plafond
+    solver.u_ref = u_ref
+
+# Limite dépassée à l'instant de sortie n, où la première composante vaut valeur (None si aucune).
+# Une solution qui diverge (inf ou nan) dépasse tout plafond.
+def depassement(solver, n, valeur):
+    if solver.limite_temps is not None and time.perf_counter() > solver.limite_temps:
+        return "budget"
+    if solver.plafond is not None and not abs(valeur - solver.u_ref[n, 0]) <= solver.plafond:
+        return "erreur"
+    return None
+
+# Balayage de return_error sur une liste de pas de temps, avec les mêmes limites pour chaque calcul.
+# Le coût d'un calcul étant proportionnel à 1/dt, un pas est sauté (temps et erreur nan) s'il est
+# plus petit qu'un pas déjà arrêté par le budget, ou si le coût extrapolé d'un calcul terminé dépasse le budget.
+# solver.statuts donne pour chaque pas "ok", "budget", "erreur" ou "saute".
+def balayer_pas(solver, temps, dt_list, u_ref, budget=None, plafond=None):
+    elapsed_list = []
+    error_list = []
+    solver_statuts = []
+    dt_arrete = None
+    cout = None
+    for dtp in dt_list:
+        raison = None
+        if dt_arrete is not None and dtp <= dt_arrete:
+            raison = "le pas " + str(dt_arrete) + " a dépassé le budget"
+        elif budget is not None and cout is not None and cout / dtp > budget * 1000:
+            raison = "durée estimée " + str(round(cout / dtp)) + " ms"
+        if raison is not None:
+            print(type(solver).__name__, ": pas", dtp, "sauté (" + raison + ", budget de", budget, "s)")
+            elapsed_list.append(np.nan)
+            error_list.append(np.nan)
+            solver_statuts.append("saute")
+            continue
+        elapsed, error = solver.return_error(temps, dtp, u_ref, budget, plafond)
+        interruption = getattr(solver, "interruption", None)
+        if interruption == "budget":
+            dt_arrete = dtp if dt_arrete is None else max(dt_arrete, dtp)
+        elif interruption is None:
+            cout = elapsed * dtp if cout is None else max(cout, elapsed * dtp)
+        elapsed_list.append(elapsed)
+        error_list.append(error)
+        solver_statuts.append(interruption or "ok")
+    solver.statuts = solver_statuts
+    return elapsed_list, error_list
+
 class ODESolver:
-    def __init__(self, f):
+    # Tableaux de sortie remplis au cours du calcul (sauvegardés dans les points de reprise)
+    sorties = ("u",)
+
+    # dtype : précision de l'état et des étages (np.float64 par défaut, np.float32 en simple précision)
+    # dtype_force : précision du calcul du second membre si elle diffère de celle de l'état.
+    # Le mode mixte correspond à dtype=np.float64 et dtype_force=np.float32.
+    # compense : si True, les mises à jour de l'état utilisent la sommation compensée de Kahan,
+    # ce qui repousse le plancher d'erreur dû aux arrondis aux très petits pas de temps.
+    # projection : si non nul, l'état est ramené sur la surface d'énergie initiale tous les
+    # projection pas (modèles conservatifs fournissant Em et grad_Em).
+    def __init__(self, f, dtype=np.float64, dtype_force=None, compense=False, projection=0):
         self.model = f
-        self.f = f.derA
+        self.dtype = np.dtype(dtype)
+        self.dtype_force = dtype_force
+        self.compense = compense
+        self.f = force_en_precision(f.derA, dtype_force)
+        if projection and np.any(getattr(f, "gamma", 0)):
+            msg = "La projection sur l'énergie n'a de sens que pour un modèle conservatif (gamma = 0)"
+            raise ValueError(msg)
+        if projection and not (hasattr(f, "Em") and hasattr(f, "grad_Em")):
+            msg = "La projection sur l'énergie demande un modèle qui fournit Em et grad_Em (" + type(f).__name__ + ")"
+            raise ValueError(msg)
+        self.projection = projection
+
+    # Ajoute l'incrément du à la variable u (en place). Chaque variable mise à jour
+    # séparément (nom) a son propre terme de compensation.
+    def accumuler(self, u, du, nom="u"):
+        if not self.compense:
+            u += du
+            return
+        c = self._comp.get(nom)
+        if c is None:
+            c = self._comp[nom] = np.zeros_like(u)
+        somme_compensee(u, du, c)
+
+    # Projette l'état sur la surface Em = E0 par la méthode de Newton le long du gradient de l'énergie :
+    # u <- u - (Em(u) - E0) / |grad Em|^2 grad Em. Deux itérations suffisent en général.
+    def projeter(self):
+        u = self.ut
+        for k in range(3):
+            ecart = self.model.Em(u) - self.E0
+            if abs(ecart) <= 4 * np.finfo(self.dtype).eps * abs(self.E0):
+                break
+            grad = self.model.grad_Em(u)
+            norme2 = grad @ grad
+            if norme2 == 0:
+                break
+            u -= (self.dtype.type(ecart / norme2) * grad).astype(self.dtype)
         
-    def solve(self, u0, temps, dt):
+    # sauvegarde : fichier (.npz) où écrire un point de reprise toutes les periode_sauvegarde secondes.
+    # Un calcul interrompu peut être poursuivi avec reprendre.
+    # budget, plafond, u_ref : limites du calcul (voir fixer_limites)
+    def solve(self, u0, temps, dt, sauvegarde=None, periode_sauvegarde=60.0, budget=None, plafond=None,
+              u_ref=None):
+        fixer_limites(self, budget, plafond, u_ref)
         self.dt = dt
+        self.sauvegarde = sauvegarde
+        self.periode_sauvegarde = periode_sauvegarde
         # Initialisation de la CI
         if np.isscalar(u0): # ODE scalaire
-            u0 = float(u0)
+            u0 = self.dtype.type(u0)
             self.neq = 1
         else: # ODE vectorielle
-            u0 = np.asarray(u0)
+            u0 = np.asarray(u0, dtype=self.dtype)
             self.neq = u0.size
         self.u0 = u0
 
         # self.u est le tableau qui contiendra la solution calculée à tous les instants de temps
         N = temps.size
         if self.neq == 1:
-            self.u = np.zeros(N)
+            self.u = np.zeros(N, dtype=self.dtype)
         else:
-            self.u = np.zeros((N, self.neq))
+            self.u = np.zeros((N, self.neq), dtype=self.dtype)
         self.u[0] = self.u0
 
-        # self.t stocke l'instant t de la résolution
+        # Termes de compensation de la sommation de Kahan (remis à zéro à chaque calcul)
+        self._comp = {}
+
+        # self.t stocke l'instant t de la résolution. Il est recalculé à chaque pas comme
+        # ti + (i+1)*dt à partir de l'instant de sortie précédent, sans somme cumulée d'arrondis.
         self.t = temps[0]
         # self.ut stocke la solution u à l'instant t
         self.ut = self.u0
+        # Energie de référence et compteur de pas pour la projection
+        if self.projection:
+            self.E0 = self.model.Em(self.u0)
+            self.nb_pas = 0
+
+        return self.boucle(temps, 1)
+
+    # Poursuit un calcul à partir d'un point de reprise écrit par solve.
+    # Le résultat est identique bit à bit à celui d'un calcul sans interruption.
+    def reprendre(self, sauvegarde, temps=None, periode_sauvegarde=60.0):
+        n, temps = lire_sauvegarde(self, sauvegarde, temps)
+        fixer_limites(self)
+        self.neq = self.ut.size
+        self.sauvegarde = sauvegarde
+        self.periode_sauvegarde = periode_sauvegarde
+        return self.boucle(temps, n + 1)
+
+    # Etat complet de l'intégrateur entre deux instants de sortie
+    def etat(self):
+        etat = {"ut": self.ut, "t": self.t}
+        for nom, c in self._comp.items():
+            etat["comp_" + nom] = c
+        if self.projection:
+            etat["E0"], etat["nb_pas"] = self.E0, self.nb_pas
+        return etat
+
+    def restaurer_etat(self, etat):
+        self.ut = np.array(etat["ut"])
+        self.t = etat["t"][()]
+        if self.projection:
+            self.E0, self.nb_pas = etat["E0"][()], int(etat["nb_pas"])
+        self._comp = {nom[5:]: np.array(c) for nom, c in etat.items() if nom.startswith("comp_")}
 
-        # Boucle de calcul qui se charge de remplir le tableau u
-        for n in range(1, N):
+    # Boucle de calcul qui se charge de remplir le tableau u à partir de l'indice debut
+    def boucle(self, temps, debut):
+        N = temps.size
+        dt = self.dt
+        derniere_sauvegarde = time.perf_counter()
+        for n in range(debut, N):
             # Il faut calculer combien de pas de temps sont nécessaire pour arriver à la prochaine case
             ti = temps[n-1]
             tf = temps[n]
             a = (tf - ti) / dt
             nb_steps = max(int(np.round(a)),1)
-            tempdt = (tf - ti)/nb_steps
+            # Le pas est un float Python : il ne force pas les calculs en float64 en simple précision
+            tempdt = float((tf - ti)/nb_steps)
             for i in range(nb_steps):
                 self.advance(tempdt)
                 self.t = ti + (i+1)*tempdt
                 #print("Calcul à t =", self.t)
+                if self.projection:
+                    self.nb_pas += 1
+                    if self.nb_pas % self.projection == 0:
+                        self.projeter()
+                if self.limite_temps is not None and i % 1024 == 1023 and time.perf_counter() > self.limite_temps:
+                    self.interruption = "budget"
+                    break
+            if self.interruption:
+                # Seuls les instants jusqu'à n - 1 sont calculés
+                self.u = self.u[:n]
+                break
 
             t_rest = tf - self.t
             assert t_rest > -dt, "Error in time calculation t_rest should be positive"
             assert t_rest < dt, "Error in time calculation t_rest should be smaller than dt"   
             self.u[n] = self.ut
+            if self.limite_temps is not None or self.plafond is not None:
+                self.interruption = depassement(self, n, self.u[n] if self.neq == 1 else self.u[n, 0])
+                if self.interruption:
+                    self.u = self.u[:n + 1]
+                    break
+
+            if self.sauvegarde is not None and time.perf_counter() - derniere_sauvegarde >= self.periode_sauvegarde:
+                ecrire_sauvegarde(self, n, temps)
+                derniere_sauvegarde = time.perf_counter()
 
         return self.u
 
+    # Prépare un calcul pas à pas, sans tableau de sortie (mode temps réel) :
+    # il suffit ensuite d'appeler advance et de mettre à jour self.t
+    def demarrer(self, u0, t0, dt):
+        self.solve(u0, np.array([t0]), dt)
+
+    # Etat courant sous la forme d'un vecteur (même rangement que u0)
+    def etat_courant(self):
+        return self.ut
+
     def advance(self, dt):
         raise NotImplementedError("Advance method is not implemented in the base class")
     
-    def return_error(self, temps, dt, u_ref):
+    # budget (s) et plafond d'erreur : un calcul qui les dépasse s'arrête, l'erreur est alors celle
+    # des instants calculés et self.interruption indique la limite atteinte (voir balayer_pas pour une liste de dt)
+    def return_error(self, temps, dt, u_ref, budget=None, plafond=None):
         model = self.model
         if np.isscalar(dt):
             print(type(self).__name__, ": Calcul de l'erreur pour", dt)
             start = time.perf_counter()
-            u = self.solve(model.CI(), temps, dt)
+            u = self.solve(model.CI(), temps, dt, budget=budget, plafond=plafond, u_ref=u_ref)
             end = time.perf_counter()
             elapsed = (end - start) * 1000
             print("Temps d'éxécution :", elapsed)
-            error_t = np.abs(u[:,0]-u_ref[:,0])
+            error_t = np.abs(u[:,0]-u_ref[:len(u),0])
             # L'erreur maximale est le maximum de ce tableau
             error = np.max(error_t)
             print("erreur :", error)
+            if getattr(self, "interruption", None):
+                print("Calcul arrêté (" + self.interruption + ") à t =", temps[len(u) - 1])
             return elapsed, error
         
         else:
-            elapsed_list=[]
-            error_list=[]
-            for dtp in dt:
-                elapsed, error = self.return_error(temps, dtp, u_ref)
-                elapsed_list.append(elapsed)
-                error_list.append(error)
-            return elapsed_list, error_list
+            return balayer_pas(self, temps, dt, u_ref, budget, plafond)
     
 class ForwardEuler(ODESolver):
     def advance(self, dt):
         """Advance the solution one time step."""
         u, f, t = self.ut, self.f, self.t
-        u += f(t,u) * dt
+        self.accumuler(u, f(t,u) * dt)
     
 class ExplicitMidpoint(ODESolver):
     def advance(self, dt):
@@ -103,7 +326,7 @@ class ExplicitMidpoint(ODESolver):
         dt2 = dt / 2.0
         k1 = f(t, u)
         k2 = f(t + dt2, u + dt2 * k1)
-        self.ut += dt * k2
+        self.accumuler(self.ut, dt * k2)
     
 class RungeKutta4(ODESolver):
     def advance(self, dt):
@@ -113,13 +336,13 @@ class RungeKutta4(ODESolver):
         k2 = f(t + dt2, u + dt2 * k1, )
         k3 = f(t + dt2, u + dt2 * k2, )
         k4 = f(t + dt, u + dt * k3, )
-        self.ut += (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+        self.accumuler(self.ut, (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4))
 
 class VelocityVerlet(ODESolver):
     def advance(self, dt):
         u, f, t = self.ut, self.f, self.t
         dt2 = dt / 2.0
         pos, vel = np.split(u,2)
-        vel += np.split(f(t,u), 2)[1] * dt2
-        pos += vel * dt
-        vel += np.split(f(t + dt, self.ut), 2)[1] * dt2
\ No newline at end of file
+        self.accumuler(vel, np.split(f(t,u), 2)[1] * dt2, "vel")
+        self.accumuler(pos, vel * dt, "pos")
+        self.accumuler(vel, np.split(f(t + dt, self.ut), 2)[1] * dt2, "vel")
\ No newline at end of file
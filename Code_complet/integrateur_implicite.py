@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code propose des solveurs implicites de type Runge-Kutta (Euler implicite,
+point milieu implicite, Gauss-Legendre à 2 étages).
+Les équations des étages sont résolues par une méthode de Newton simplifiée :
+la jacobienne analytique du modèle (méthode jac) et la factorisation LU de la matrice
+de Newton sont conservées d'un pas à l'autre, et ne sont recalculées que si le pas
+de temps change ou si la convergence devient trop lente.
+La première estimation des étages est celle du pas précédent.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from integrateur_complet import ODESolver
+
+"""
+FONCTIONS
+"""
+# Jacobienne par différences finies, utilisée si le modèle ne fournit pas de méthode jac
+def jacobien_numerique(f, t, u):
+    f0 = f(t, u)
+    J = np.empty((f0.size, u.size))
+    for j in range(u.size):
+        h = 1e-8 * max(1.0, abs(u[j]))
+        up = np.array(u, dtype=float)
+        up[j] += h
+        J[:, j] = (f(t, up) - f0) / h
+    return J
+
+"""
+CLASSES
+"""
+class ImplicitRungeKutta(ODESolver):
+    # Tableau de Butcher (A, b, c) de la méthode, défini dans les classes filles
+    A = None
+    b = None
+    c = None
+
+    def __init__(self, f, tol=None, max_iter=10, **precision):
+        super().__init__(f, **precision)
+        if hasattr(f, "jac"):
+            self.jac = f.jac
+        else:
+            self.jac = lambda t, u: jacobien_numerique(self.f, t, u)
+        # Tolérance relative (par défaut 1e-12, ou quelques eps si la précision des états est moindre)
+        # et nombre maximal d'itérations de Newton
+        self.tol = tol if tol is not None else max(1e-12, 4 * float(np.finfo(self.dtype).eps))
+        self.max_iter = max_iter
+        self.A = np.asarray(self.A, dtype=float)
+        self.b = np.asarray(self.b, dtype=float)
+        self.c = np.asarray(self.c, dtype=float)
+        self.s = self.b.size
+        # Coefficients d tels que u(n+1) = u(n) + somme(d_i Z_i) : évite d'évaluer f une fois de plus
+        self.d = np.linalg.solve(self.A.T, self.b)
+
+    def solve(self, u0, temps, dt, **options):
+        # La factorisation et les étages mémorisés ne sont valables que pour un calcul
+        self._lu = None
+        self._Z = None
+        # Nombre de factorisations et d'itérations de Newton effectuées (pour le suivi des coûts)
+        self.nb_lu = 0
+        self.nb_newton = 0
+        return super().solve(u0, temps, dt, **options)
+
+    # L'état comprend les étages du dernier pas (prédicteur) et le point où la matrice
+    # de Newton a été factorisée, pour que la reprise refasse exactement les mêmes itérations
+    def etat(self):
+        etat = super().etat()
+        if self._Z is not None:
+            etat["Z"] = self._Z
+        if self._lu is not None:
+            etat["lu_t"], etat["lu_u"], etat["lu_dt"] = self._lu_point
+        return etat
+
+    def restaurer_etat(self, etat):
+        super().restaurer_etat(etat)
+        self.nb_lu = 0
+        self.nb_newton = 0
+        self._lu = None
+        self._Z = np.array(etat["Z"]) if "Z" in etat else None
+        if "lu_u" in etat:
+            self.factorise(etat["lu_t"][()], np.array(etat["lu_u"]), etat["lu_dt"][()])
+
+    # Calcule la jacobienne au point u et factorise la matrice de Newton I - dt (A x J)
+    def factorise(self, t, u, dt):
+        J = self.jac(t, u)
+        n = u.size
+        if sp.issparse(J):
+            M = sp.identity(self.s * n, format="csc") - dt * sp.kron(self.A, J, format="csc")
+            lu = splu(M)
+            self._solve_lu = lu.solve
+        else:
+            M = np.eye(self.s * n) - dt * np.kron(self.A, J)
+            lu = lu_factor(M, check_finite=False)
+            self._solve_lu = lambda r: lu_solve(lu, r, check_finite=False)
+        self._lu = lu
+        self._dt_lu = dt
+        self._lu_point = (t, u.copy(), dt)
+        self.nb_lu += 1
+
+    # Itérations de Newton simplifiées sur les incréments des étages Z (forme (s, n))
+    def newton(self, t, u, dt, Z):
+        f, A, c = self.f, self.A, self.c
+        F = np.empty_like(Z)
+        norme_u = 1.0 + np.max(np.abs(u))
+        ancien = None
+        for k in range(self.max_iter):
+            for i in range(self.s):
+                F[i] = f(t + c[i] * dt, u + Z[i])
+            G = Z - dt * (A @ F)
+            dZ = self._solve_lu(-G.ravel()).reshape(Z.shape)
+            Z += dZ
+            self.nb_newton += 1
+            norme = np.max(np.abs(dZ))
+            if norme <= self.tol * norme_u:
+                return True
+            # Convergence trop lente : la jacobienne mémorisée n'est plus assez bonne
+            if ancien is not None and norme > 0.5 * ancien:
+                return False
+            ancien = norme
+        return False
+
+    def advance(self, dt):
+        u, t = self.ut, self.t
+        # La matrice de Newton dépend du pas de temps (les petites variations dues
+        # aux arrondis sur les instants de sortie n'imposent pas de la refactoriser)
+        if self._lu is None or abs(dt - self._dt_lu) > 1e-6 * dt:
+            self.factorise(t, u, dt)
+        # Prédicteur : les incréments du pas précédent
+        if self._Z is None or self._Z.shape[1] != u.size:
+            Z0 = np.zeros((self.s, u.size), dtype=self.dtype)
+        else:
+            Z0 = self._Z
+        Z = Z0.copy()
+        if not self.newton(t, u, dt, Z):
+            # On réactualise la jacobienne au point courant et on recommence
+            self.factorise(t, u, dt)
+            Z = Z0.copy()
+            if not self.newton(t, u, dt, Z):
+                Z = np.zeros((self.s, u.size), dtype=self.dtype)
+                ok = self.newton(t, u, dt, Z)
+                if not ok:
+                    msg = "La méthode de Newton ne converge pas, il faut réduire le pas de temps"
+                    raise RuntimeError(msg)
+        self._Z = Z
+        self.accumuler(u, self.d @ Z)
+
+class BackwardEuler(ImplicitRungeKutta):
+    A = [[1.0]]
+    b = [1.0]
+    c = [1.0]
+
+class ImplicitMidpoint(ImplicitRungeKutta):
+    A = [[0.5]]
+    b = [1.0]
+    c = [0.5]
+
+class GaussLegendre2(ImplicitRungeKutta):
+    A = [[1/4, 1/4 - np.sqrt(3)/6],
+         [1/4 + np.sqrt(3)/6, 1/4]]
+    b = [1/2, 1/2]
+    c = [1/2 - np.sqrt(3)/6, 1/2 + np.sqrt(3)/6]
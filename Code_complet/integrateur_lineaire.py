@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code propose un solveur exact pour les modèles linéaires dA/dt = M A
+(pendule dans l'approximation des petits angles, avec ou sans frottement visqueux,
+réseau de pendules couplés aux petits angles). Le modèle fournit la matrice M
+(méthode matrice_lineaire).
+La solution sur un intervalle h est A(t + h) = exp(M h) A(t) : la matrice de propagation
+exp(M h) est calculée une seule fois (scipy.linalg.expm), puis :
+- "sequentiel" : chaque intervalle de sortie coûte un produit matrice-vecteur ;
+- "puissances" (instants régulièrement espacés) : les instants sont calculés par blocs
+  doublants, A[m:2m] = A[0:m] exp(M h)^m, soit log2(N) produits vectorisés.
+Il n'y a pas de pas de temps : le résultat est exact aux arrondis près, pour un coût en O(N).
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+from scipy.linalg import expm
+
+from integrateur_complet import ODESolver
+
+"""
+CLASSES
+"""
+class LinearPropagator(ODESolver):
+    # methode : "sequentiel", "puissances" ou None (puissances si les instants sont régulièrement espacés)
+    def __init__(self, f, methode=None, **precision):
+        super().__init__(f, **precision)
+        msg = "Le propagateur exact nécessite un modèle linéaire (méthode matrice_lineaire)"
+        assert hasattr(f, "matrice_lineaire"), msg
+        self.M = np.asarray(f.matrice_lineaire(), dtype=float)
+        self.methode = methode
+        # Matrices de propagation déjà calculées, par longueur d'intervalle
+        self._propagateurs = {}
+
+    # Matrice de propagation exp(M h), dans la précision de l'état
+    def propagateur(self, h):
+        P = self._propagateurs.get(h)
+        if P is None:
+            P = self._propagateurs[h] = expm(self.M * h).astype(self.dtype)
+        return P
+
+    # dt n'est pas utilisé (il est accepté pour garder la signature des autres solveurs)
+    def solve(self, u0, temps, dt=None, **options):
+        self.dt = dt
+        u0 = np.atleast_1d(np.asarray(u0, dtype=self.dtype))
+        self.neq = u0.size
+        N = temps.size
+        self.u = np.empty((N, self.neq), dtype=self.dtype)
+        self.u[0] = u0
+        intervalles = np.diff(temps)
+        # Les instants sont connus aux arrondis près : deux intervalles qui ne diffèrent que
+        # de quelques ulp des instants sont considérés égaux
+        tolerance = 64 * np.finfo(float).eps * np.max(np.abs(temps))
+        h = float((temps[-1] - temps[0]) / (N - 1)) if N > 1 else 0.0
+        regulier = N > 1 and np.all(np.abs(temps - temps[0] - h * np.arange(N)) <= tolerance)
+        methode = self.methode or ("puissances" if regulier else "sequentiel")
+        msg = "La méthode par puissances nécessite des instants régulièrement espacés"
+        assert methode == "sequentiel" or regulier, msg
+
+        if methode == "puissances":
+            # u[m + i] = P^m u[i] : chaque doublement est un seul produit vectorisé
+            Pm = self.propagateur(h)
+            m = 1
+            while m < N:
+                k = min(m, N - m)
+                self.u[m:m + k] = self.u[:k] @ Pm.T
+                Pm = Pm @ Pm
+                m *= 2
+        else:
+            P, h_P = None, None
+            for n in range(1, N):
+                h = float(intervalles[n - 1])
+                if P is None or abs(h - h_P) > tolerance:
+                    P, h_P = self.propagateur(h), h
+                self.u[n] = P @ self.u[n - 1]
+
+        self.t = temps[-1]
+        self.ut = self.u[-1].copy()
+        self._comp = {}
+        if self.neq == 1:
+            self.u = self.u[:, 0]
+        return self.u
+
+    # Un pas de longueur dt (mode pas à pas, temps réel)
+    def advance(self, dt):
+        self.ut[...] = self.propagateur(dt) @ self.ut
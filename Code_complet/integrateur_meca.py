@@ -14,88 +14,176 @@ BIBLIOTHEQUES
 import numpy as np
 import time
 
+from integrateur_complet import force_en_precision, somme_compensee, ecrire_sauvegarde, lire_sauvegarde, \
+    fixer_limites, depassement, balayer_pas
+
+# Indique si l'accélération du modèle dépend de la vitesse (attribut acc_depend_vitesse du modèle,
+# supposé vrai s'il n'est pas donné)
+def acc_depend_vitesse(model):
+    return bool(getattr(model, "acc_depend_vitesse", True))
+
 class MecaODESolver:
-    def __init__(self, f):
+    # Tableaux de sortie remplis au cours du calcul (sauvegardés dans les points de reprise)
+    sorties = ("pos", "vel")
+
+    # dtype, dtype_force et compense ont le même sens que pour ODESolver
+    def __init__(self, f, dtype=np.float64, dtype_force=None, compense=False):
         self.model = f
-        self.f = f.acc
+        self.dtype = np.dtype(dtype)
+        self.dtype_force = dtype_force
+        self.compense = compense
+        self.f = force_en_precision(f.acc, dtype_force)
+
+    # Ajoute l'incrément du à la variable u (en place), avec compensation si demandé
+    def accumuler(self, u, du, nom):
+        if not self.compense:
+            u += du
+            return
+        c = self._comp.get(nom)
+        if c is None:
+            c = self._comp[nom] = np.zeros_like(u)
+        somme_compensee(u, du, c)
         
-    def solve(self, u0, temps, dt):
+    # sauvegarde et periode_sauvegarde : points de reprise, budget, plafond et u_ref : limites du calcul,
+    # comme pour ODESolver.solve
+    def solve(self, u0, temps, dt, sauvegarde=None, periode_sauvegarde=60.0, budget=None, plafond=None,
+              u_ref=None):
+        self.initialiser(u0, temps, dt, sauvegarde, periode_sauvegarde, budget, plafond, u_ref)
+        self.boucle(temps, 1)
+        return self.finir(temps)
+
+    def initialiser(self, u0, temps, dt, sauvegarde, periode_sauvegarde, budget=None, plafond=None, u_ref=None):
+        fixer_limites(self, budget, plafond, u_ref)
         self.dt = dt
+        self.sauvegarde = sauvegarde
+        self.periode_sauvegarde = periode_sauvegarde
         # Initialisation de la CI
         if np.isscalar(u0): # ODE scalaire
             u0 = float(u0)
             self.neq = 1
         else: # ODE vectorielle
-            u0 = np.asarray(u0)
+            u0 = np.asarray(u0, dtype=self.dtype)
             self.neq = int(u0.size/2)
         self.pos0, self.vel0 = np.split(u0,2)
 
         # self.u est le tableau qui contiendra la solution calculée à tous les instants de temps
         N = temps.size
-        if self.neq == 1:
-            self.pos = np.zeros(N)
-            self.vel = np.zeros(N)
-        else:
-            self.pos = np.zeros((N, self.neq))
-            self.vel = np.zeros((N, self.neq))
+        # Les positions et vitesses sont des tableaux de taille neq même si neq = 1
+        # (numpy refuse de copier un tableau de taille 1 dans une case scalaire)
+        self.pos = np.zeros((N, self.neq), dtype=self.dtype)
+        self.vel = np.zeros((N, self.neq), dtype=self.dtype)
         self.pos[0] = self.pos0
         self.vel[0] = self.vel0
 
+        # Termes de compensation de la sommation de Kahan (remis à zéro à chaque calcul)
+        self._comp = {}
+
         # self.t stocke l'instant t de la résolution
         self.t = temps[0]
         # self.ut stocke la solution u à l'instant t
         self.post = self.pos0
         self.velt = self.vel0
 
-        # Boucle de calcul qui se charge de remplir le tableau u
-        for n in range(1, N):
+    # Poursuit un calcul à partir d'un point de reprise écrit par solve
+    def reprendre(self, sauvegarde, temps=None, periode_sauvegarde=60.0):
+        n, temps = lire_sauvegarde(self, sauvegarde, temps)
+        fixer_limites(self)
+        self.neq = self.post.size
+        self.sauvegarde = sauvegarde
+        self.periode_sauvegarde = periode_sauvegarde
+        self.boucle(temps, n + 1)
+        return self.finir(temps)
+
+    # Etat complet de l'intégrateur entre deux instants de sortie
+    def etat(self):
+        etat = {"post": self.post, "velt": self.velt, "t": self.t}
+        for nom, c in self._comp.items():
+            etat["comp_" + nom] = c
+        return etat
+
+    def restaurer_etat(self, etat):
+        self.post = np.array(etat["post"])
+        self.velt = np.array(etat["velt"])
+        self.t = etat["t"][()]
+        self._comp = {nom[5:]: np.array(c) for nom, c in etat.items() if nom.startswith("comp_")}
+
+    # Boucle de calcul qui se charge de remplir les tableaux pos et vel à partir de l'indice debut
+    def boucle(self, temps, debut):
+        N = temps.size
+        dt = self.dt
+        derniere_sauvegarde = time.perf_counter()
+        for n in range(debut, N):
             # Il faut calculer combien de pas de temps sont nécessaire pour arriver à la prochaine case
             ti = temps[n-1]
             tf = temps[n]
             a = (tf - ti) / dt
             nb_steps = max(int(np.round(a)),1)
-            tempdt = (tf - ti)/nb_steps
+            tempdt = float((tf - ti)/nb_steps)
             for i in range(nb_steps):
                 self.advance(tempdt)
                 self.t = ti + (i+1)*tempdt
                 #print("Calcul à t =", self.t)
+                if self.limite_temps is not None and i % 1024 == 1023 and time.perf_counter() > self.limite_temps:
+                    self.interruption = "budget"
+                    break
+            if self.interruption:
+                # Seuls les instants jusqu'à n - 1 sont calculés
+                self.pos, self.vel = self.pos[:n], self.vel[:n]
+                break
 
             t_rest = tf - self.t
             assert t_rest > -dt, "Error in time calculation t_rest should be positive"
             assert t_rest < dt, "Error in time calculation t_rest should be smaller than dt"
             self.pos[n] = self.post
             self.vel[n] = self.velt
-                
-        self.u = np.stack((self.pos, self.vel), axis = -1)
+            if self.limite_temps is not None or self.plafond is not None:
+                self.interruption = depassement(self, n, self.post[0])
+                if self.interruption:
+                    self.pos, self.vel = self.pos[:n + 1], self.vel[:n + 1]
+                    break
 
+            if self.sauvegarde is not None and time.perf_counter() - derniere_sauvegarde >= self.periode_sauvegarde:
+                ecrire_sauvegarde(self, n, temps)
+                derniere_sauvegarde = time.perf_counter()
+
+    # Mise en forme du résultat : u[:, 0] les positions, u[:, 1] les vitesses
+    def finir(self, temps):
+        if self.neq == 1:
+            self.pos, self.vel = self.pos[:, 0], self.vel[:, 0]
+        self.u = np.stack((self.pos, self.vel), axis = -1)
         return self.u
 
+    # Prépare un calcul pas à pas, sans tableau de sortie (mode temps réel)
+    def demarrer(self, u0, t0, dt):
+        self.initialiser(u0, np.array([t0]), dt, None, None)
+
+    # Etat courant sous la forme d'un vecteur [positions, vitesses]
+    def etat_courant(self):
+        return np.concatenate((np.atleast_1d(self.post), np.atleast_1d(self.velt)))
+
     def advance(self, dt):
         raise NotImplementedError("Advance method is not implemented in the base class")
     
-    def return_error(self, temps, dt, u_ref):
+    # budget et plafond : limites du calcul, comme pour ODESolver.return_error
+    def return_error(self, temps, dt, u_ref, budget=None, plafond=None):
         model = self.model
         if np.isscalar(dt):
             print(type(self).__name__, ": Calcul de l'erreur pour", dt)
             start = time.perf_counter()
-            u = self.solve(model.CI(), temps, dt)
+            u = self.solve(model.CI(), temps, dt, budget=budget, plafond=plafond, u_ref=u_ref)
             end = time.perf_counter()
             elapsed = (end - start) * 1000
             print("Temps d'éxécution :", elapsed)
-            error_t = np.abs(u[:,0]-u_ref[:,0])
+            error_t = np.abs(u[:,0]-u_ref[:len(u),0])
             # L'erreur maximale est le maximum de ce tableau
             error = np.max(error_t)
             print("erreur :", error)
+            if self.interruption:
+                print("Calcul arrêté (" + self.interruption + ") à t =", temps[len(u) - 1])
             return elapsed, error
         
         else:
-            elapsed_list=[]
-            error_list=[]
-            for dtp in dt:
-                elapsed, error = self.return_error(temps, dtp, u_ref)
-                elapsed_list.append(elapsed)
-                error_list.append(error)
-            return elapsed_list, error_list
+            return balayer_pas(self, temps, dt, u_ref, budget, plafond)
     
 # La version entièrement vectorisée dans ODESOlver est plus rapide
 # Cette version n'a donc aucun intérêt.    
@@ -103,53 +191,145 @@ class MecaForwardEuler(MecaODESolver):
     def advance(self, dt):
         """Advance the solution one time step."""
         f, t, pos, vel = self.f, self.t, self.post, self.velt
-        k = f(t, pos)
-        pos += vel * dt
-        vel += k * dt
+        k = f(t, pos, vel)
+        self.accumuler(pos, vel * dt, "pos")
+        self.accumuler(vel, k * dt, "vel")
         
 
+# Si l'accélération dépend de la vitesse (frottement, pendule à plusieurs maillons), le dernier
+# demi-pas est implicite : v = v_demi + dt/2 f(t + dt, x, v), résolu par point fixe jusqu'à tol près
+# (par défaut quelques eps), ce qui garde l'ordre 2. Chaque itération coûte un appel au modèle.
+# Le modèle indique par son attribut acc_depend_vitesse si l'accélération dépend de la vitesse
+# (supposé vrai s'il ne le précise pas). L'accélération de la fin d'un pas sert au début du suivant.
 class MecaVelocityVerlet(MecaODESolver):
+    def __init__(self, f, tol=None, max_iter=50, **precision):
+        super().__init__(f, **precision)
+        self.tol = tol if tol is not None else 4 * np.finfo(self.dtype).eps
+        self.max_iter = max_iter
+        self.implicite = acc_depend_vitesse(f)
+
+    def initialiser(self, u0, temps, dt, sauvegarde, periode_sauvegarde, budget=None, plafond=None, u_ref=None):
+        super().initialiser(u0, temps, dt, sauvegarde, periode_sauvegarde, budget, plafond, u_ref)
+        self._acc = None
+
+    def restaurer_etat(self, etat):
+        super().restaurer_etat(etat)
+        self._acc = None
+
     def advance(self, dt):
         
         f, t, pos, vel = self.f, self.t, self.post, self.velt
         dt2 = dt / 2.0
+        if self._acc is None:
+            self._acc = f(t, pos, vel)
         
-        vel += f(t,pos) * dt2
-        pos += vel * dt
-        vel += f(t + dt, pos) * dt2
+        self.accumuler(vel, self._acc * dt2, "vel")
+        self.accumuler(pos, vel * dt, "pos")
+        a = f(t + dt, pos, vel)
+        if self.implicite:
+            for k in range(self.max_iter):
+                a_new = f(t + dt, pos, vel + a * dt2)
+                ecart = np.max(np.abs(a_new - a)) * dt2
+                a = a_new
+                if ecart <= self.tol * (1 + np.max(np.abs(vel))):
+                    break
+            else:
+                msg = "Le dernier demi-pas de Verlet n'a pas convergé en " + str(self.max_iter) + " itérations"
+                raise RuntimeError(msg)
+        self._acc = a
+        self.accumuler(vel, a * dt2, "vel")
 
-# C'est la méthode de Verlet mais dans le cas où on n'a pas besoin de la vitesse avec une grande précision
-# Avantage : plus rapide       
-class Stormer_Verlet(MecaODESolver):
-    def solve(self, u0, temps, dt):
-        print("We use the specific solve")
-        self.dt = dt
-        # Initialisation de la CI
-        if np.isscalar(u0): # ODE scalaire
-            u0 = float(u0)
-            self.neq = 1
-        else: # ODE vectorielle
-            u0 = np.asarray(u0)
-            self.neq = int(u0.size/2)
-        self.pos0, self.vel0 = np.split(u0,2)
+# Méthode de Verlet avec contraintes holonomes (SHAKE pour les positions, RATTLE pour les vitesses).
+# Le modèle fournit contraintes(pos) de forme (K,) et grad_contraintes(pos, out=None) de forme (K, d) :
+# une contrainte par corps, ne portant que sur ses d coordonnées (pendules cartésiens).
+# Les multiplicateurs de tous les corps sont itérés ensemble (opérations vectorisées sur K),
+# jusqu'à ce que toutes les contraintes soient vérifiées à tol près (par défaut quelques eps).
+# L'accélération ne dépendant pas de la vitesse, celle de la fin d'un pas sert au début du suivant :
+# un seul appel au modèle par pas, comme la méthode de Verlet. Le gradient des contraintes de la fin
+# du pas (projection des vitesses) sert de même au SHAKE du pas suivant.
+class MecaRattle(MecaODESolver):
+    def __init__(self, f, tol=None, max_iter=50, **precision):
+        super().__init__(f, **precision)
+        self.tol = tol if tol is not None else 4 * np.finfo(self.dtype).eps
+        self.max_iter = max_iter
 
-        # self.u est le tableau qui contiendra la solution calculée à tous les instants de temps
-        N = temps.size
-        if self.neq == 1:
-            self.pos = np.zeros(N)
-            self.vel = np.zeros(N)
+    def initialiser(self, u0, temps, dt, sauvegarde, periode_sauvegarde, budget=None, plafond=None, u_ref=None):
+        super().initialiser(u0, temps, dt, sauvegarde, periode_sauvegarde, budget, plafond, u_ref)
+        self._acc = self._G = self._GG = self._tmp = None
+
+    def restaurer_etat(self, etat):
+        super().restaurer_etat(etat)
+        self._acc = self._G = self._GG = self._tmp = None
+
+    def advance(self, dt):
+        model, t, pos, vel = self.model, self.t, self.post, self.velt
+        dt2 = dt / 2.0
+        if self._acc is None:
+            self._acc = self.f(t, pos, vel)
+        # Gradient des contraintes au début du pas et sa norme au carré : ceux de la fin du pas précédent
+        if self._G is None:
+            self._G = model.grad_contraintes(pos)
+            self._GG = np.einsum("ki,ki->k", self._G, self._G)
+        G0 = self._G
+        d = model.d
+
+        # Pas de Verlet sans contrainte
+        self.accumuler(vel, self._acc * dt2, "vel")
+        self.accumuler(pos, vel * dt, "pos")
+
+        # SHAKE : x <- x - dl G0 pour chaque corps, dl donné par la méthode de Newton sur c(x).
+        # La vitesse reçoit la correction totale divisée par dt, une fois les itérations terminées.
+        # Si le modèle sait résoudre l'équation sur dl exactement (contrainte quadratique),
+        # les itérations ne servent plus qu'à vérifier la contrainte.
+        x, v = pos.reshape(-1, d), vel.reshape(-1, d)
+        # Tableau de travail (K, d) réutilisé d'un pas à l'autre pour les corrections
+        if self._tmp is None or self._tmp.shape != x.shape:
+            self._tmp = np.empty_like(x)
+        tmp = self._tmp
+        if hasattr(model, "multiplicateurs_shake"):
+            dl_total = model.multiplicateurs_shake(pos, G0, self._GG)
+            x -= np.multiply(dl_total[:, None], G0, out=tmp)
         else:
-            self.pos = np.zeros((N, self.neq))
-            self.vel = np.zeros((N, self.neq))
-        self.pos[0] = self.pos0
-        self.vel[0] = self.vel0
+            dl_total = np.zeros(x.shape[0], dtype=x.dtype)
+        for k in range(self.max_iter):
+            c = model.contraintes(pos)
+            if np.max(np.abs(c)) <= self.tol:
+                break
+            dl = c / np.einsum("ki,ki->k", model.grad_contraintes(pos), G0)
+            x -= dl[:, None] * G0
+            dl_total += dl
+        else:
+            msg = "Les contraintes n'ont pas convergé en " + str(self.max_iter) + " itérations"
+            raise RuntimeError(msg)
+        dl_total *= 1 / dt
+        v -= np.multiply(dl_total[:, None], G0, out=tmp)
 
-        # self.t stocke l'instant t de la résolution
-        self.t = temps[0]
-        # self.ut stocke la solution u à l'instant t
-        self.post = self.pos0
+        # RATTLE : second demi-pas, puis projection de la vitesse sur le plan tangent à la contrainte.
+        # Le gradient et sa norme servent encore au SHAKE du pas suivant.
+        self._acc = self.f(t + dt, pos, vel)
+        self.accumuler(vel, self._acc * dt2, "vel")
+        G = self._G = model.grad_contraintes(pos, out=G0)
+        GG = self._GG = np.einsum("ki,ki->k", G, G)
+        mu = np.einsum("ki,ki->k", G, v)
+        mu /= GG
+        v -= np.multiply(mu[:, None], G, out=tmp)
+
+# C'est la méthode de Verlet mais dans le cas où on n'a pas besoin de la vitesse avec une grande précision
+# Avantage : plus rapide
+# Le schéma ne suit pas la vitesse : il est réservé aux modèles dont l'accélération n'en dépend pas
+# (une vitesse estimée par différence le ferait tomber à l'ordre 1).
+class Stormer_Verlet(MecaODESolver):
+    def __init__(self, f, **precision):
+        if acc_depend_vitesse(f):
+            msg = "Stormer_Verlet ne traite pas les accélérations qui dépendent de la vitesse : utiliser MecaVelocityVerlet"
+            raise ValueError(msg)
+        super().__init__(f, **precision)
+
+    def solve(self, u0, temps, dt, sauvegarde=None, periode_sauvegarde=60.0, budget=None, plafond=None,
+              u_ref=None):
+        print("We use the specific solve")
+        self.initialiser(u0, temps, dt, sauvegarde, periode_sauvegarde, budget, plafond, u_ref)
         self.oldpost = np.copy(self.pos0)
-        self.velt = self.vel0
 
         # Boucle de calcul qui se charge de remplir le tableau des positions
         # La première fois est spéciale
@@ -157,7 +337,7 @@ class Stormer_Verlet(MecaODESolver):
         tf = temps[1]
         a = (tf - ti) / dt
         nb_steps = max(int(np.round(a)),1)
-        tempdt = (tf - ti)/nb_steps
+        tempdt = float((tf - ti)/nb_steps)
         self.post += self.velt * dt + 1/2*self.f(self.t, self.post) * dt**2
         for i in range(1, nb_steps):
             self.advance(tempdt)
@@ -165,35 +345,42 @@ class Stormer_Verlet(MecaODESolver):
             #print("Calcul à t =", self.t)
         self.pos[1] = self.post
 
-        for n in range(2, N):
-            # Il faut calculer combien de pas de temps sont nécessaire pour arriver à la prochaine case
-            ti = temps[n-1]
-            tf = temps[n]
-            a = (tf - ti) / dt
-            nb_steps = max(int(np.round(a)),1)
-            tempdt = (tf - ti)/nb_steps
-            for i in range(nb_steps):
-                self.advance(tempdt)
-                self.t = ti + (i+1)*tempdt
-                #print("Calcul à t =", self.t)
+        self.boucle(temps, 2)
+        return self.finir(temps)
 
-            t_rest = tf - self.t
-            assert t_rest > -dt, "Error in time calculation t_rest should be positive"
-            assert t_rest < dt, "Error in time calculation t_rest should be smaller than dt"
-            self.pos[n] = self.post
+    def etat(self):
+        etat = super().etat()
+        etat["oldpost"] = self.oldpost
+        return etat
+
+    def restaurer_etat(self, etat):
+        super().restaurer_etat(etat)
+        self.oldpost = np.array(etat["oldpost"])
 
+    # La position précédente est obtenue par un développement de Taylor à l'ordre 2
+    def demarrer(self, u0, t0, dt):
+        super().demarrer(u0, t0, dt)
+        self.oldpost = self.post - self.velt * dt + 1/2*self.f(self.t, self.post) * dt**2
+
+    # La vitesse est estimée par différence arrière
+    def etat_courant(self):
+        return np.concatenate((np.atleast_1d(self.post), np.atleast_1d((self.post - self.oldpost) / self.dt)))
+
+    def finir(self, temps):
         # Il faut rajouter la vitesse qui n'est pas calculée de base
+        # (sur les instants calculés seulement si le calcul a été arrêté)
+        N = self.pos.shape[0]
         for n in range(1, N-1):
             self.vel[n] = (self.pos[n+1] - self.pos[n-1]) / (temps[n+1] - temps[n-1])
-        self.vel[N-1] =  (self.pos[n] - self.pos[n-1]) / (temps[n] - temps[n-1])              
-        self.u = np.stack((self.pos, self.vel), axis = -1)
+        if N > 1:
+            self.vel[N-1] =  (self.pos[N-1] - self.pos[N-2]) / (temps[N-1] - temps[N-2])
+        return super().finir(temps)
 
-        return self.u
     def advance(self, dt):
         
         f, t, pos = self.f, self.t, self.post
 
         k = f(t, pos)
         temp = np.copy(pos)
-        pos += pos - self.oldpost + k * dt**2
+        self.accumuler(pos, (pos - self.oldpost) + k * dt**2, "pos")
         self.oldpost = temp
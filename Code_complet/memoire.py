@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code mesure la mémoire utilisée par les calculs, pour dimensionner un calcul avant de le lancer :
+- octets_tampons : octets occupés par chaque tableau d'un solveur (sorties u, pos, vel, état courant,
+  étages, termes de compensation, ...), les vues sur un même tableau n'étant comptées qu'une fois
+  dans le total ;
+- mesurer : durée et pic des allocations tracées (tracemalloc, qui suit aussi les données des
+  tableaux numpy) pendant l'exécution d'une fonction ;
+- allocations_par_pas : mémoire temporaire allouée par un pas de la boucle de calcul (advance) ;
+- rapport_memoire : les trois mesures pour un calcul (solveur, instants, pas de temps).
+tracemalloc ralentit les allocations : la durée donnée par rapport_memoire vient d'un calcul
+séparé, sans traçage, et n'est donc pas faussée par la mesure de la mémoire.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+import time
+import tracemalloc
+
+"""
+FONCTIONS
+"""
+# Ecriture lisible d'un nombre d'octets
+def formater_octets(octets):
+    for unite in ("o", "ko", "Mo", "Go"):
+        if abs(octets) < 1024 or unite == "Go":
+            return "{:.1f} {}".format(octets, unite)
+        octets /= 1024
+
+# Tableau qui possède réellement les données d'une vue
+def _racine(tableau):
+    while isinstance(tableau.base, np.ndarray):
+        tableau = tableau.base
+    return tableau
+
+# Octets occupés par chaque tableau numpy porté par l'objet (attributs, et tableaux rangés
+# dans des dictionnaires comme les termes de compensation _comp).
+# Renvoie un dictionnaire nom -> octets, et l'entrée "total" où les vues ne sont comptées qu'une fois.
+def octets_tampons(objet):
+    tampons = {}
+    racines = {}
+    for nom, valeur in vars(objet).items():
+        elements = valeur.items() if isinstance(valeur, dict) else [(None, valeur)]
+        for cle, tableau in elements:
+            if isinstance(tableau, np.ndarray) and tableau.nbytes:
+                tampons[nom if cle is None else nom + "." + str(cle)] = tableau.nbytes
+                racine = _racine(tableau)
+                racines[id(racine)] = racine.nbytes
+    tampons["total"] = sum(racines.values())
+    return tampons
+
+# Exécute fonction(*args, **kwargs) en traçant les allocations.
+# Renvoie le résultat et un dictionnaire : durée (ms, allongée par le traçage), pic des allocations
+# pendant l'appel et octets encore alloués à la fin (par rapport au début de l'appel).
+def mesurer(fonction, *args, **kwargs):
+    deja_actif = tracemalloc.is_tracing()
+    if not deja_actif:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    avant = tracemalloc.get_traced_memory()[0]
+    debut = time.perf_counter()
+    try:
+        resultat = fonction(*args, **kwargs)
+        duree = (time.perf_counter() - debut) * 1000
+        actuel, pic = tracemalloc.get_traced_memory()
+    finally:
+        if not deja_actif:
+            tracemalloc.stop()
+    return resultat, {"temps_ms": duree, "pic_octets": pic - avant, "octets_conserves": actuel - avant}
+
+# Mémoire allouée par les pas de la boucle de calcul. Le solveur est démarré en mode pas à pas (demarrer),
+# un premier pas alloue les tableaux de travail réutilisés ensuite, puis n_pas pas sont mesurés un à un.
+# temporaires_octets : pic des allocations temporaires d'un pas (tableaux intermédiaires, libérés à la fin du pas) ;
+# tableaux_temporaires : ce pic rapporté à la taille de l'état, soit le nombre équivalent de tableaux
+# de la taille de l'état vivants en même temps (numpy ne compte pas les allocations déjà libérées) ;
+# conserves_octets : mémoire gardée d'un pas à l'autre (nulle si la boucle n'accumule rien).
+def allocations_par_pas(solver, u0, dt, n_pas=100, t0=0.0):
+    solver.demarrer(np.array(u0), t0, dt)
+    solver.advance(dt)
+    solver.t = t0 + dt
+    octets_etat = max(np.asarray(solver.etat_courant()).nbytes, 1)
+    deja_actif = tracemalloc.is_tracing()
+    if not deja_actif:
+        tracemalloc.start()
+    try:
+        # Tableau des pics alloué avant la mesure, pour ne pas compter sa croissance
+        pics = np.zeros(max(n_pas, 1), dtype=np.int64)
+        debut = tracemalloc.get_traced_memory()[0]
+        for n in range(n_pas):
+            avant = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            solver.advance(dt)
+            solver.t = t0 + (n + 2) * dt
+            pics[n] = tracemalloc.get_traced_memory()[1] - avant
+        conserves = tracemalloc.get_traced_memory()[0] - debut
+    finally:
+        if not deja_actif:
+            tracemalloc.stop()
+    pic = int(pics.max())
+    return {"temporaires_octets": pic, "tableaux_temporaires": pic / octets_etat,
+            "conserves_octets": conserves / max(n_pas, 1)}
+
+# Rapport complet pour le calcul solver.solve(u0, temps, dt) : durée (calcul sans traçage),
+# pic des allocations tracées, octets de chaque tableau du solveur après le calcul et allocations par pas.
+def rapport_memoire(solver, u0, temps, dt, n_pas=100):
+    debut = time.perf_counter()
+    solver.solve(np.array(u0), temps, dt)
+    duree = (time.perf_counter() - debut) * 1000
+    _, mesure = mesurer(solver.solve, np.array(u0), temps, dt)
+    rapport = {"temps_ms": duree, "pic_octets": mesure["pic_octets"], "tampons": octets_tampons(solver)}
+    if hasattr(solver, "demarrer"):
+        rapport["par_pas"] = allocations_par_pas(solver, u0, dt, n_pas, float(temps[0]))
+    return rapport
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code propose l'algorithme Parareal, qui parallélise une intégration en temps.
+L'intervalle [t0, T] est découpé en tranches. A chaque itération :
+- le propagateur fin F (un solveur précis, par exemple RungeKutta4 à petit pas) est appliqué
+  à toutes les tranches en parallèle, dans des processus séparés, à partir des états
+  de début de tranche de l'itération précédente ;
+- le propagateur grossier G (peu coûteux, par exemple RungeKutta4 à grand pas) corrige
+  séquentiellement les états de début de tranche : U(p+1) = G(U(p)) + F(U_prec(p)) - G(U_prec(p)).
+On s'arrête quand les états de début de tranche ne changent presque plus.
+Après k itérations, les k premières tranches sont exactes (identiques au calcul fin séquentiel).
+L'accélération est mesurée par rapport à la durée de l'intégration fine séquentielle,
+estimée par la somme des durées des tranches fines de la première itération
+(ou mesurée directement avec mesurer_serie=True).
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from integrateur_complet import ODESolver, RungeKutta4
+
+"""
+FONCTIONS
+"""
+# Propagateur fin sur une tranche, exécuté dans un processus de travail.
+# Renvoie la trajectoire aux instants de la tranche, l'état final et la durée du calcul.
+def propager_fin(solveur, modele, u, temps, dt, options):
+    debut = time.perf_counter()
+    solver = solveur(modele, **options)
+    # Les solveurs font évoluer l'état initial en place : on leur en donne une copie
+    trajectoire = solver.solve(np.array(u), temps, dt)
+    etat = np.array(solver.etat_courant())
+    return trajectoire, etat, time.perf_counter() - debut
+
+"""
+CLASSES
+"""
+class Parareal(ODESolver):
+    # solveur_fin, solveur_grossier : classes de solveurs, options_fin : arguments de construction
+    # du solveur fin (dtype, compense, ...), dt_grossier : pas du propagateur grossier,
+    # n_tranches : nombre de tranches (par défaut le nombre de processus),
+    # tol : écart relatif entre deux itérations en dessous duquel on s'arrête.
+    def __init__(self, f, solveur_fin=RungeKutta4, solveur_grossier=RungeKutta4, dt_grossier=0.1,
+                 n_tranches=None, n_processus=None, tol=1e-10, max_iter=None, options_fin=None,
+                 mesurer_serie=False):
+        super().__init__(f)
+        self.solveur_fin = solveur_fin
+        self.solveur_grossier = solveur_grossier
+        self.dt_grossier = dt_grossier
+        self.n_processus = n_processus or os.cpu_count() or 1
+        self.n_tranches = n_tranches or self.n_processus
+        self.tol = tol
+        self.max_iter = max_iter
+        self.options_fin = options_fin or {}
+        self.mesurer_serie = mesurer_serie
+
+    # Propagateur grossier de ta à tb
+    def grossier(self, u, ta, tb):
+        solver = self.solveur_grossier(self.model)
+        solver.solve(np.array(u), np.array([ta, tb]), self.dt_grossier)
+        return np.array(solver.etat_courant())
+
+    # Propagateur fin sur les tranches demandées, en parallèle si un pool est fourni
+    def fins(self, pool, U, tranches, numeros, dt):
+        arguments = [(self.solveur_fin, self.model, U[p], self.temps[tranches[p][0]:tranches[p][1] + 1], dt,
+                      self.options_fin) for p in numeros]
+        if pool is None:
+            return [propager_fin(*args) for args in arguments]
+        return [tache.result() for tache in [pool.submit(propager_fin, *args) for args in arguments]]
+
+    def solve(self, u0, temps, dt, **options):
+        debut = time.perf_counter()
+        self.dt = dt
+        self.temps = temps
+        N = temps.size
+        P = min(self.n_tranches, N - 1)
+        max_iter = self.max_iter or P
+        # Les bornes des tranches sont des instants de sortie
+        bornes = np.linspace(0, N - 1, P + 1).round().astype(int)
+        tranches = list(zip(bornes[:-1], bornes[1:]))
+
+        # Première estimation des états de début de tranche par le propagateur grossier
+        U = [np.array(u0, dtype=float)]
+        for a, b in tranches:
+            U.append(self.grossier(U[-1], temps[a], temps[b]))
+        G_prec = U[1:]
+        trajectoires = [None] * P
+        self.ecarts = []
+        self.duree_fin_serie = None
+
+        pool = ProcessPoolExecutor(max_workers=self.n_processus) if self.n_processus > 1 else None
+        try:
+            for k in range(1, max_iter + 1):
+                # Les k - 1 premières tranches sont exactes depuis l'itération précédente
+                numeros = range(k - 1, P)
+                resultats = self.fins(pool, U, tranches, numeros, dt)
+                if k == 1:
+                    self.duree_fin_serie = sum(r[2] for r in resultats)
+                F = {}
+                for p, (trajectoire, etat, _) in zip(numeros, resultats):
+                    trajectoires[p] = trajectoire
+                    F[p] = etat
+                nouveau = list(U)
+                for p in numeros:
+                    a, b = tranches[p]
+                    g = self.grossier(nouveau[p], temps[a], temps[b])
+                    nouveau[p + 1] = g + F[p] - G_prec[p]
+                    G_prec[p] = g
+                ecart = max(np.max(np.abs(nouveau[p] - U[p])) for p in range(P + 1))
+                echelle = 1.0 + max(np.max(np.abs(v)) for v in nouveau)
+                U = nouveau
+                self.ecarts.append(ecart)
+                if ecart <= self.tol * echelle:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.iterations = k
+        self.U = U
+
+        # Trajectoire complète : les tranches fines bout à bout
+        self.u = np.concatenate([trajectoires[0]] + [tr[1:] for tr in trajectoires[1:]])
+        self.t = temps[-1]
+        self.ut = U[-1]
+        self.duree = time.perf_counter() - debut
+        if self.mesurer_serie:
+            debut = time.perf_counter()
+            self.u_serie = self.solveur_fin(self.model, **self.options_fin).solve(np.array(u0), temps, dt)
+            self.duree_fin_serie = time.perf_counter() - debut
+            self.erreur_serie = np.max(np.abs(self.u - self.u_serie))
+        self.acceleration = self.duree_fin_serie / self.duree
+        return self.u
+
+    # Résumé du dernier calcul
+    def rapport(self):
+        rapport = {"tranches": len(self.U) - 1, "iterations": self.iterations, "ecarts": self.ecarts,
+                   "duree": self.duree, "duree_fin_serie": self.duree_fin_serie,
+                   "acceleration": self.acceleration}
+        if self.mesurer_serie:
+            rapport["erreur_serie"] = self.erreur_serie
+        return rapport
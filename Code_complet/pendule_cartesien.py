@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code stocke les pendules décrits en coordonnées cartésiennes : la masse est repérée par
+sa position x (relative au point d'attache) et la longueur du fil est une contrainte holonome
+    c(x) = (|x|^2 / L^2 - 1) / 2 = 0
+au lieu d'être éliminée par le choix de l'angle comme coordonnée.
+- PenduleCartesien : pendule plan, x = (x, y) ;
+- PenduleSpherique : pendule sphérique, x = (x, y, z).
+La verticale est toujours la dernière coordonnée (orientée vers le haut).
+Chaque classe décrit un lot de K pendules indépendants (paramètres scalaires ou de taille K) :
+les positions sont rangées dans un vecteur de taille K * d (pendule par pendule), comme
+pour les autres modèles mécaniques. Les méthodes contraintes et grad_contraintes sont utilisées
+par le solveur MecaRattle (integrateur_meca), qui maintient la contrainte aux arrondis près.
+Le modèle fournit aussi derA (tension du fil calculée à partir de la contrainte dérivée deux fois)
+pour les solveurs généraux, qui ne conservent la longueur qu'à la précision du schéma.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+
+"""
+CLASSES
+"""
+class PenduleContraint:
+    # Nombre de coordonnées d'espace, défini dans les classes filles
+    d = None
+
+    def __init__(self, L, g=9.81, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.L = np.atleast_1d(np.asarray(L, dtype=self.dtype))
+        self.g = g
+        # Gravité (par unité de masse), la verticale étant la dernière coordonnée
+        self.gravite = np.zeros(self.d, dtype=self.dtype)
+        self.gravite[-1] = -g
+
+    # Constantes calculées une fois les longueurs connues
+    def preparer(self):
+        self.K = self.L.size
+        self.L2 = self.L**2
+        self.inv_L2 = 1 / self.L2
+        self._acc = np.broadcast_to(self.gravite, (self.K, self.d)).ravel()
+
+    # Positions ou vitesses de taille K * d vues comme un tableau (K, d)
+    def coordonnees(self, x):
+        return np.reshape(x, (-1, self.d))
+
+    # L'accélération ne dépend pas de la vitesse (utilisé par les intégrateurs mécaniques)
+    acc_depend_vitesse = False
+
+    # Le fil n'exerce pas de force ici : c'est le solveur qui impose la contrainte.
+    # La vitesse est acceptée pour avoir la même signature que les autres modèles.
+    def acc(self, t, pos, vel=None):
+        return self._acc.astype(np.asarray(pos).dtype)
+
+    # Ecart à la contrainte de chaque pendule (sans dimension), forme (K,)
+    def contraintes(self, pos):
+        x = self.coordonnees(pos)
+        return (np.einsum("ki,ki->k", x, x) * self.inv_L2 - 1) / 2
+
+    # Gradient de chaque contrainte par rapport à la position du pendule, forme (K, d),
+    # éventuellement calculé dans le tableau out
+    def grad_contraintes(self, pos, out=None):
+        return np.multiply(self.coordonnees(pos), self.inv_L2[:, None], out=out)
+
+    # Solution exacte de c(x - dl G0) = 0 pour chaque pendule (équation du second degré en dl :
+    # a dl^2 - 2 b dl + |x|^2 - L^2 = 0), utilisée par MecaRattle à la place des itérations de Newton.
+    # a = |G0|^2 peut être fourni s'il est déjà connu.
+    def multiplicateurs_shake(self, pos, G0, a=None):
+        x = self.coordonnees(pos)
+        if a is None:
+            a = np.einsum("ki,ki->k", G0, G0)
+        b = np.einsum("ki,ki->k", x, G0)
+        c = np.einsum("ki,ki->k", x, x)
+        c -= self.L2
+        # Racine la plus petite, sous une forme qui évite la soustraction de deux nombres proches
+        return c / (b + np.sqrt(b**2 - a*c))
+
+    # Dérivée de l'état [positions, vitesses] pour les solveurs généraux : la tension du fil
+    # (par unité de masse) est lambda = (|v|^2 + gravite . x) / |x|^2
+    def derA(self, t, A):
+        A = np.asarray(A)
+        n = A.size // 2
+        x, v = self.coordonnees(A[:n]), self.coordonnees(A[n:])
+        tension = (np.einsum("ki,ki->k", v, v) + x @ self.gravite) / np.einsum("ki,ki->k", x, x)
+        a = self.gravite - tension[:, None] * x
+        return np.concatenate((v.ravel(), a.ravel()))
+
+    # Positions et vitesses de forme (K, d, ...) à partir d'un état ou d'une trajectoire, rangés
+    # comme pour Pendule.Em(A.T) : l'état est sur le premier axe, les instants sur les suivants.
+    # A est soit le vecteur [positions, vitesses] de taille 2 K d (CI, A.T pour les solveurs généraux),
+    # soit de forme (2, K d, ...) (A.T pour les solveurs mécaniques, ou [pos, vel]).
+    def positions_vitesses(self, A):
+        A = np.asarray(A)
+        n = self.K * self.d
+        if A.shape[0] == 2 * n:
+            pos, vel = A[:n], A[n:]
+        else:
+            pos, vel = A[0], A[1]
+        forme = (self.K, self.d) + pos.shape[1:]
+        return np.reshape(pos, forme), np.reshape(vel, forme)
+
+    # Energie mécanique (J/kg) de chaque pendule, de forme (K, ...) (sans l'axe K pour un seul pendule,
+    # comme Pendule.Em). A est un état ou une trajectoire (voir positions_vitesses).
+    def Em(self, A):
+        x, v = self.positions_vitesses(A)
+        E = 1/2*np.sum(v*v, axis=1) - np.tensordot(self.gravite, x, axes=(0, 1))
+        return E[0] if self.K == 1 else E
+
+    def CI(self):
+        return np.concatenate((self.pos0.ravel(), self.vel0.ravel())).astype(self.dtype)
+
+class PenduleCartesien(PenduleContraint):
+    d = 2
+
+    # theta0, omega0 : angle par rapport à la verticale et vitesse angulaire initiales,
+    # comme pour Pendule (scalaires ou tableaux de taille K)
+    def __init__(self, L, g=9.81, theta0=0, omega0=0, dtype=np.float64):
+        super().__init__(L, g, dtype)
+        L, theta0, omega0 = np.broadcast_arrays(self.L, np.asarray(theta0, dtype=float),
+                                                np.asarray(omega0, dtype=float))
+        self.L = np.array(L, dtype=self.dtype)
+        self.preparer()
+        self.pos0 = np.stack((L*np.sin(theta0), -L*np.cos(theta0)), axis=-1)
+        self.vel0 = np.stack((L*omega0*np.cos(theta0), L*omega0*np.sin(theta0)), axis=-1)
+
+    # Angle par rapport à la verticale à partir des positions (forme (..., K * d) -> (..., K))
+    def angles(self, pos):
+        x = np.reshape(pos, np.shape(pos)[:-1] + (-1, self.d))
+        return np.arctan2(x[..., 0], -x[..., 1])
+
+class PenduleSpherique(PenduleContraint):
+    d = 3
+
+    # theta0 : angle par rapport à la verticale descendante, phi0 : azimut,
+    # dtheta0 et dphi0 : leurs dérivées initiales (scalaires ou tableaux de taille K)
+    def __init__(self, L, g=9.81, theta0=0, phi0=0, dtheta0=0, dphi0=0, dtype=np.float64):
+        super().__init__(L, g, dtype)
+        L, th, ph, dth, dph = np.broadcast_arrays(self.L, *(np.asarray(x, dtype=float)
+                                                            for x in (theta0, phi0, dtheta0, dphi0)))
+        self.L = np.array(L, dtype=self.dtype)
+        self.preparer()
+        self.pos0 = np.stack((L*np.sin(th)*np.cos(ph), L*np.sin(th)*np.sin(ph), -L*np.cos(th)), axis=-1)
+        self.vel0 = np.stack((L*(dth*np.cos(th)*np.cos(ph) - dph*np.sin(th)*np.sin(ph)),
+                              L*(dth*np.cos(th)*np.sin(ph) + dph*np.sin(th)*np.cos(ph)),
+                              L*dth*np.sin(th)), axis=-1)
+
+    # Moment cinétique vertical (par unité de masse) de chaque pendule, conservé par le mouvement
+    # (même forme d'entrée et de sortie que Em)
+    def Lz(self, A):
+        x, v = self.positions_vitesses(A)
+        L = x[:, 0]*v[:, 1] - x[:, 1]*v[:, 0]
+        return L[0] if self.K == 1 else L
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code stocke la classe PenduleChaine : un pendule plan à N maillons (double, triple, ...).
+Chaque maillon est une tige rigide sans masse de longueur L[i] terminée par une masse ponctuelle m[i].
+Les positions sont les angles absolus theta[i] de chaque tige par rapport à la verticale.
+
+Les accélérations sont calculées en O(N) : les tensions des tiges vérifient un système
+tridiagonal symétrique défini positif, résolu par élimination récursive (algorithme de Thomas,
+équivalent à la récursion des inerties articulées). On évite ainsi d'assembler et d'inverser
+la matrice de masse pleine, qui coûte O(N^3).
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+# résolution d'un système à bande en O(N)
+from scipy.linalg import solveh_banded
+
+"""
+CLASSE PENDULE CHAINE
+"""
+
+class PenduleChaine:
+    # Le constructeur de la chaîne. L, m, theta0 et omega0 peuvent être des scalaires
+    # (mêmes valeurs pour tous les maillons) ou des tableaux de taille N.
+    # Si N n'est pas donné, il est déduit de la taille de L.
+    # dtype : précision des paramètres et des états (np.float32 pour la simple précision)
+    def __init__(self, L, m=1.0, g=9.81, theta0=0, omega0=0, N=None, dtype=np.float64):
+        if N is None:
+            N = np.size(L)
+        self.N = N
+        self.dtype = np.dtype(dtype)
+        # Les longueurs des tiges et les masses des maillons
+        self.L = np.broadcast_to(np.asarray(L, dtype=dtype), (N,)).copy()
+        self.m = np.broadcast_to(np.asarray(m, dtype=dtype), (N,)).copy()
+        # La constante de gravitation
+        self.g = g
+        # Les angles et vitesses angulaires initiales de chaque maillon
+        self.theta0 = np.broadcast_to(np.asarray(theta0, dtype=dtype), (N,)).copy()
+        self.omega0 = np.broadcast_to(np.asarray(omega0, dtype=dtype), (N,)).copy()
+
+        # Termes constants du système tridiagonal des tensions :
+        # la diagonale vaut 1/m[i] + 1/m[i-1] (la liaison fixe a une masse infinie)
+        inv_m = 1.0 / self.m
+        self._diag = inv_m.copy()
+        self._diag[1:] += inv_m[:-1]
+        self._inv_m = inv_m
+
+    # L'accélération dépend toujours de la vitesse (utilisé par les intégrateurs mécaniques)
+    acc_depend_vitesse = True
+
+    # Cette fonction renvoie les accélérations angulaires de chaque maillon.
+    # Contrairement au pendule simple, elles dépendent aussi des vitesses (termes centrifuges).
+    def acc(self, t, pos, vel=None):
+        theta = np.asarray(pos)
+        if vel is None:
+            omega = np.zeros_like(theta)
+        else:
+            omega = np.asarray(vel)
+        L, g, inv_m = self.L, self.g, self._inv_m
+
+        # Cosinus et sinus des angles relatifs entre deux tiges consécutives
+        dtheta = theta[1:] - theta[:-1]
+        c = np.cos(dtheta)
+        s = np.sin(dtheta)
+
+        # Système tridiagonal sur les tensions T[i] : la contrainte de longueur
+        # de la tige i dérivée deux fois donne
+        # (1/m[i] + 1/m[i-1]) T[i] - cos(theta[i+1]-theta[i])/m[i] T[i+1]
+        #   - cos(theta[i]-theta[i-1])/m[i-1] T[i-1] = L[i] omega[i]^2 (+ g cos(theta[0]) pour i=0)
+        rhs = L * omega**2
+        rhs[0] += g * np.cos(theta[0])
+        if self.N == 1:
+            T = rhs / self._diag
+        else:
+            ab = np.empty((2, self.N), dtype=rhs.dtype)
+            ab[0, 0] = 0.0
+            ab[0, 1:] = -c * inv_m[:-1]
+            ab[1] = self._diag
+            T = solveh_banded(ab, rhs, check_finite=False)
+
+        # Projection de la seconde loi de Newton sur la normale à chaque tige
+        dd = np.zeros(self.N, dtype=T.dtype)
+        dd[:-1] += T[1:] * inv_m[:-1] * s
+        dd[1:] -= T[:-1] * inv_m[:-1] * s
+        dd[0] -= g * np.sin(theta[0])
+        return dd / L
+
+    # Cette fonction correspond au G du polycopié. Le vecteur A contient d'abord
+    # les N angles puis les N vitesses angulaires.
+    def derA(self, t, A):
+        theta, omega = np.split(np.asarray(A), 2)
+        return np.concatenate((omega, self.acc(t, theta, omega)))
+
+    def CI(self):
+        return np.concatenate((self.theta0, self.omega0))
+
+    # Positions cartésiennes (x, y) des masses, la liaison fixe étant à l'origine.
+    # theta peut être de forme (N,) ou (N, K) pour K instants.
+    def positions(self, theta):
+        L = self.L.reshape((-1,) + (1,) * (np.ndim(theta) - 1))
+        x = np.cumsum(L * np.sin(theta), axis=0)
+        y = -np.cumsum(L * np.cos(theta), axis=0)
+        return x, y
+
+    # Energie mécanique totale (J). A est de forme (2N,) ou (2N, K) comme pour Pendule.Em(A.T).
+    # L'énergie potentielle est nulle lorsque la chaîne pend verticalement au repos.
+    def Em(self, A):
+        A = np.asarray(A)
+        theta, omega = A[:self.N], A[self.N:]
+        shape = (-1,) + (1,) * (np.ndim(theta) - 1)
+        L, m = self.L.reshape(shape), self.m.reshape(shape)
+        vx = np.cumsum(L * omega * np.cos(theta), axis=0)
+        vy = np.cumsum(L * omega * np.sin(theta), axis=0)
+        x, y = self.positions(theta)
+        y_repos = -np.cumsum(L, axis=0)
+        Ec = 0.5 * np.sum(m * (vx**2 + vy**2), axis=0)
+        Ep = self.g * np.sum(m * (y - y_repos), axis=0)
+        return Ec + Ep
@@ -20,7 +20,7 @@ CLASSE PENDULE
 class Pendule:
     # Le constructeur du pendule. Notez que les paramètres (sauf L) ont une valeur par défaut.
     # Cela permet de ne pas tout spécifier à chaque fois.
-    def __init__(self, L, g=9.81, theta0 = 0, omega0 = 0, small_angle = False):
+    def __init__(self, L, g=9.81, theta0 = 0, omega0 = 0, small_angle = False, gamma = 0, dtype = np.float64):
         # La longueur du fil du pendule
         self.L = L
         # La constante de gravitation
@@ -31,8 +31,13 @@ class Pendule:
         self.omega0 = omega0
         # Un booléen pour savoir si ce pendule est étudié dans l'approximation des petits angles
         self.small_angle = small_angle
+        # Le coefficient de frottement visqueux (en s^-1), nul par défaut
+        self.gamma = gamma
+        # La précision des états renvoyés par CI (np.float32 pour la simple précision)
+        self.dtype = np.dtype(dtype)
 
     # Cette fonction correspond au G du polycopié. Elle renvoie la dérivée du vecteur A.
+    # A peut aussi être un bloc d'états de forme (2, K) : la dérivée est alors de forme (2, K).
     def derA(self, t, A):
         theta = A[0]
         omega = A[1]
@@ -42,23 +47,85 @@ class Pendule:
             domega = -self.g / self.L * np.sin(theta)
         else:
             domega = -self.g / self.L * theta
+        if self.gamma:
+            domega = domega - self.gamma * omega
         return np.array([dtheta, domega])
     
-    def acc(self, t, pos):
+    # L'accélération ne dépend de la vitesse qu'avec frottement (utilisé par les intégrateurs mécaniques)
+    @property
+    def acc_depend_vitesse(self):
+        return bool(self.gamma)
+
+    # Accélération angulaire seule, utilisée par les intégrateurs mécaniques.
+    # La vitesse est acceptée pour avoir la même signature que les modèles où l'accélération en dépend.
+    def acc(self, t, pos, vel=None):
         theta = pos[0]
         if not self.small_angle:
             domega = -self.g / self.L * np.sin(theta)
         else:
             domega = -self.g / self.L * theta
+        if self.gamma and vel is not None:
+            domega = domega - self.gamma * vel[0]
         return np.array([domega])
+
+    # Matrice jacobienne de derA par rapport à A, utilisée par les intégrateurs implicites.
+    # Pour un bloc d'états (2, K), la jacobienne est de forme (2, 2, K).
+    def jac(self, t, A):
+        theta = np.asarray(A[0])
+        if not self.small_angle:
+            dacc = -self.g / self.L * np.cos(theta)
+        else:
+            dacc = -self.g / self.L
+        J = np.zeros((2, 2) + theta.shape)
+        J[0, 1] = 1.0
+        J[1, 0] = dacc
+        J[1, 1] = -self.gamma
+        return J
+
+    # Dérivées partielles de derA par rapport aux paramètres nommés ("L", "g", "gamma", "theta0", "omega0"),
+    # utilisées par le calcul des sensibilités. Forme (2, p) ou (2, p, K) pour un bloc d'états.
+    def derA_parametres(self, t, A, parametres):
+        theta = np.asarray(A[0])
+        s = theta if self.small_angle else np.sin(theta)
+        D = np.zeros((2, len(parametres)) + theta.shape)
+        for j, nom in enumerate(parametres):
+            if nom == "L":
+                D[1, j] = self.g / self.L**2 * s
+            elif nom == "g":
+                D[1, j] = -s / self.L
+            elif nom == "gamma":
+                D[1, j] = -np.asarray(A[1])
+            else:
+                msg = "Paramètre inconnu : " + str(nom)
+                assert nom in ("theta0", "omega0"), msg
+        return D
+
+    # Dérivées partielles de la condition initiale par rapport aux paramètres nommés (forme (2, p))
+    def CI_parametres(self, parametres):
+        D = np.zeros((2, len(parametres)))
+        for j, nom in enumerate(parametres):
+            if nom == "theta0":
+                D[0, j] = 1.0
+            elif nom == "omega0":
+                D[1, j] = 1.0
+        return D
     
+    # Matrice M du système linéaire dA/dt = M A (approximation des petits angles, avec ou sans frottement),
+    # utilisée par le propagateur exact (integrateur_lineaire)
+    def matrice_lineaire(self):
+        msg = "Le pendule n'est linéaire que dans l'approximation des petits angles"
+        assert self.small_angle, msg
+        return np.array([[0.0, 1.0], [-self.g / self.L, -self.gamma]])
+
     def CI(self):
-        return np.array([self.theta0 , self.omega0])
+        return np.array([self.theta0 , self.omega0], dtype=self.dtype)
     
     def A_math(self, t):
 
         msg = "Le pendule ne peut donner de solution exacte sans l'approximation des petits angles"
         assert self.small_angle == True, msg
+        msg = "La solution exacte n'est implémentée que pour le pendule sans frottement"
+        assert not self.gamma, msg
 
         g, L = self.g, self.L
         theta0, omega0 = self.theta0, self.omega0
@@ -78,4 +145,14 @@ class Pendule:
             Em = 1/2*(L*omega)**2+1/2*g*L*theta**2  
         else:
             Em = 1/2*(L*omega)**2-g*L*(np.cos(theta)-1)
-        return Em
\ No newline at end of file
+        return Em
+
+    # Gradient de Em par rapport à A, utilisé par la projection sur la surface d'énergie
+    def grad_Em(self, A):
+        L, g = self.L, self.g
+        theta, omega = A[0], A[1]
+        if self.small_angle:
+            dtheta = g*L*theta
+        else:
+            dtheta = g*L*np.sin(theta)
+        return np.array([dtheta, L**2*omega])
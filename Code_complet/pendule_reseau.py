@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code stocke la classe ReseauPendules : un grand nombre de pendules identiques
+couplés à leurs voisins par des ressorts de torsion (modèle de Frenkel-Kontorova,
+ou sine-Gordon discret).
+Le couplage est stocké sous forme d'une matrice creuse (laplacien du graphe des voisins),
+si bien que la mémoire et le coût d'un appel à acc sont linéaires en le nombre de pendules.
+Les topologies disponibles sont la chaîne, l'anneau, la grille 2D et le tore 2D.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+# matrices creuses pour l'opérateur de couplage
+import scipy.sparse as sp
+
+"""
+FONCTIONS
+"""
+# Laplacien 1D (matrice creuse de taille n) d'une chaîne aux bords libres ou d'un anneau
+def laplacien_1d(n, periodique=False):
+    diag = np.full(n, 2.0)
+    if not periodique and n > 1:
+        diag[0] = diag[-1] = 1.0
+    # Construction directe en triplets (ligne, colonne, valeur) : coût linéaire en n
+    i = np.arange(n - 1)
+    lignes = [np.arange(n), i, i + 1]
+    colonnes = [np.arange(n), i + 1, i]
+    valeurs = [diag, -np.ones(n - 1), -np.ones(n - 1)]
+    if periodique and n > 2:
+        # Liaison entre le premier et le dernier pendule
+        lignes.append(np.array([0, n - 1]))
+        colonnes.append(np.array([n - 1, 0]))
+        valeurs.append(np.array([-1.0, -1.0]))
+    return sp.coo_matrix((np.concatenate(valeurs), (np.concatenate(lignes), np.concatenate(colonnes))),
+                         shape=(n, n)).tocsr()
+
+# Laplacien d'une grille nx * ny (numérotation ligne par ligne)
+def laplacien_2d(nx, ny, periodique=False):
+    lx = laplacien_1d(nx, periodique)
+    ly = laplacien_1d(ny, periodique)
+    return (sp.kron(sp.identity(ny), lx) + sp.kron(ly, sp.identity(nx))).tocsr()
+
+"""
+CLASSE RESEAU DE PENDULES
+"""
+
+class ReseauPendules:
+    # Le constructeur du réseau.
+    # forme : nombre de pendules (int) pour "chaine" et "anneau", ou couple (nx, ny) pour "grille" et "tore"
+    # k : raideur de couplage entre voisins, rapportée à m L^2 (en s^-2)
+    # theta0 et omega0 peuvent être des scalaires ou des tableaux de la taille du réseau
+    # dtype : précision des états et de l'opérateur de couplage (np.float32 pour la simple précision)
+    def __init__(self, forme, L, g=9.81, k=1.0, topologie="chaine", theta0=0, omega0=0, small_angle=False,
+                 dtype=np.float64):
+        if topologie in ("chaine", "anneau"):
+            self.N = int(forme)
+            lap = laplacien_1d(self.N, periodique=(topologie == "anneau"))
+        elif topologie in ("grille", "tore"):
+            nx, ny = forme
+            self.N = nx * ny
+            lap = laplacien_2d(nx, ny, periodique=(topologie == "tore"))
+        else:
+            raise ValueError("Topologie inconnue : " + str(topologie))
+        self.forme = forme
+        self.topologie = topologie
+        # La longueur du fil des pendules
+        self.L = L
+        # La constante de gravitation
+        self.g = g
+        # La raideur de couplage
+        self.k = k
+        # Un booléen pour savoir si le réseau est étudié dans l'approximation des petits angles
+        self.small_angle = small_angle
+        self.dtype = np.dtype(dtype)
+        self.theta0 = np.broadcast_to(np.asarray(theta0, dtype=dtype), (self.N,)).copy()
+        self.omega0 = np.broadcast_to(np.asarray(omega0, dtype=dtype), (self.N,)).copy()
+
+        # Pulsation propre au carré d'un pendule isolé et opérateur de couplage creux
+        self.w02 = g / L
+        self.K = (k * lap).astype(dtype).tocsr()
+
+    # L'accélération ne dépend pas de la vitesse (utilisé par les intégrateurs mécaniques)
+    acc_depend_vitesse = False
+
+    # Accélération angulaire de chaque pendule : rappel de la pesanteur
+    # plus couplage élastique aux voisins (produit matrice creuse - vecteur).
+    # pos peut être de forme (N,) ou (N, K) pour K réseaux intégrés ensemble.
+    def acc(self, t, pos, vel=None):
+        if not self.small_angle:
+            a = np.sin(pos)
+        else:
+            a = np.array(pos, dtype=self.K.dtype)
+        a *= -self.w02
+        a -= self.K @ pos
+        return a
+
+    # Cette fonction correspond au G du polycopié. Le vecteur A contient d'abord
+    # les N angles puis les N vitesses angulaires.
+    def derA(self, t, A):
+        theta, omega = np.split(np.asarray(A), 2)
+        return np.concatenate((omega, self.acc(t, theta)))
+
+    # Matrice jacobienne (creuse) de derA, utilisée par les intégrateurs implicites
+    def jac(self, t, A):
+        theta = np.asarray(A)[:self.N]
+        if not self.small_angle:
+            d = -self.w02 * np.cos(theta)
+        else:
+            d = np.full(self.N, -self.w02)
+        J21 = sp.diags(d) - self.K
+        return sp.bmat([[None, sp.identity(self.N)], [J21, None]], format="csr")
+
+    # Matrice (dense) M du système linéaire dA/dt = M A dans l'approximation des petits angles
+    def matrice_lineaire(self):
+        msg = "Le réseau n'est linéaire que dans l'approximation des petits angles"
+        assert self.small_angle, msg
+        J21 = -self.w02 * np.eye(self.N) - self.K.toarray()
+        return np.block([[np.zeros((self.N, self.N)), np.eye(self.N)], [J21, np.zeros((self.N, self.N))]])
+
+    def CI(self):
+        return np.concatenate((self.theta0, self.omega0))
+
+    # Energie mécanique totale par unité de masse (J/kg), comme Pendule.Em.
+    # A est de forme (2N,) ou (2N, K).
+    def Em(self, A):
+        A = np.asarray(A)
+        theta, omega = A[:self.N], A[self.N:]
+        if self.small_angle:
+            Ep = 0.5 * self.w02 * np.sum(theta**2, axis=0)
+        else:
+            Ep = self.w02 * np.sum(1 - np.cos(theta), axis=0)
+        Ec = 0.5 * np.sum(omega**2, axis=0)
+        E_couplage = 0.5 * np.sum(theta * (self.K @ theta), axis=0)
+        return self.L**2 * (Ec + Ep + E_couplage)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code calcule les sensibilités de la trajectoire d'un pendule par rapport à ses paramètres
+(L, g, gamma, theta0, omega0) en intégrant les équations variationnelles avec l'état :
+    dS/dt = J(t, A) S + dG/dp,    S(0) = dA0/dp
+où J est la jacobienne du modèle (méthode jac) et dG/dp ses dérivées par rapport
+aux paramètres (méthode derA_parametres).
+Le modèle augmenté est un modèle comme les autres (méthodes derA, acc, CI) : n'importe quel
+solveur l'intègre en une seule passe, les étages étant communs à l'état et aux sensibilités.
+Pour un schéma de Runge-Kutta à pas fixe, les sensibilités obtenues sont exactement
+les dérivées de la solution discrète : elles ne sont pas bruitées comme des différences finies.
+L'état augmenté est rangé comme [theta, S_theta (p valeurs), omega, S_omega (p valeurs)]
+(positions puis vitesses, ce qui convient aussi aux intégrateurs mécaniques).
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+
+"""
+CLASSES
+"""
+class ModeleSensibilites:
+    def __init__(self, modele, parametres=("L", "g", "theta0", "omega0")):
+        self.modele = modele
+        self.parametres = tuple(parametres)
+        self.p = len(self.parametres)
+
+    def CI(self):
+        Z = np.column_stack((self.modele.CI(), self.modele.CI_parametres(self.parametres)))
+        return Z.ravel().astype(self.modele.CI().dtype)
+
+    # Y est de forme (2 (1 + p),) ou (2 (1 + p), K) pour un bloc d'états
+    def derA(self, t, Y):
+        Y = np.asarray(Y)
+        Z = Y.reshape((2, 1 + self.p) + Y.shape[1:])
+        A, S = Z[:, 0], Z[:, 1:]
+        dZ = np.empty_like(Z)
+        dZ[:, 0] = self.modele.derA(t, A)
+        J = self.modele.jac(t, A)
+        dZ[:, 1:] = np.einsum("ij...,jp...->ip...", J, S) + self.modele.derA_parametres(t, A, self.parametres)
+        return dZ.reshape(Y.shape)
+
+    @property
+    def acc_depend_vitesse(self):
+        return getattr(self.modele, "acc_depend_vitesse", True)
+
+    # Accélération augmentée pour les intégrateurs mécaniques : pos = [theta, S_theta], vel = [omega, S_omega]
+    def acc(self, t, pos, vel=None):
+        theta = pos[0]
+        omega = vel[0] if vel is not None else 0.0
+        A = np.array([theta, omega])
+        J = self.modele.jac(t, A)
+        a = np.empty(1 + self.p, dtype=np.asarray(pos).dtype)
+        a[0] = self.modele.acc(t, pos[:1], None if vel is None else vel[:1])[0]
+        a[1:] = J[1, 0] * pos[1:] + self.modele.derA_parametres(t, A, self.parametres)[1]
+        # Comme Pendule.acc, le frottement n'est pris en compte que si la vitesse est fournie
+        if vel is not None:
+            a[1:] += J[1, 1] * vel[1:]
+        return a
+
+"""
+FONCTIONS
+"""
+# Sépare une trajectoire du modèle augmenté en (A, S) : A de forme (N, 2), S de forme (N, 2, p)
+# (S[n, i, j] : dérivée de la composante i de l'état à l'instant n par rapport au paramètre j)
+def separer(u, p):
+    u = np.asarray(u)
+    if u.ndim == 3:
+        # Intégrateurs mécaniques : (N, 1 + p, 2) positions et vitesses empilées sur le dernier axe
+        Z = np.swapaxes(u, 1, 2)
+    else:
+        Z = u.reshape(u.shape[0], 2, 1 + p)
+    return Z[:, :, 0], Z[:, :, 1:]
+
+# Trajectoire et sensibilités en une passe : solveur est une classe de solveur (RungeKutta4,
+# MecaVelocityVerlet, GaussLegendre2, ...), options ses arguments de construction
+def sensibilites(solveur, modele, temps, dt, parametres=("L", "g", "theta0", "omega0"), **options):
+    augmente = ModeleSensibilites(modele, parametres)
+    u = solveur(augmente, **options).solve(augmente.CI(), temps, dt)
+    return separer(u, augmente.p)
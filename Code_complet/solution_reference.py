@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code calcule les solutions de référence (haute précision) avec les intégrateurs de scipy.
+La jacobienne analytique du pendule est transmise à odeint (Dfun) ou à solve_ivp (jac),
+et le second membre est évalué sur des blocs d'états (2, K) (vectorized=True),
+ce qui évite les jacobiennes par différences finies et réduit fortement le temps de calcul.
+Un lot de pendules peut aussi être intégré en un seul appel : la jacobienne est alors
+tridiagonale par blocs et transmise sous forme de bande.
+reference_taylor intègre le pendule par séries de Taylor d'ordre élevé (20 à 30) : les coefficients
+de sin(theta) et cos(theta) sont obtenus par les récurrences de la différentiation automatique,
+l'ordre et le pas sont choisis à chaque pas à partir des derniers coefficients (rayon de convergence
+estimé), et les instants demandés sont évalués par les polynômes de Taylor des pas (sortie dense).
+Sa précision est proche de celle de la machine (éventuellement en précision étendue, np.longdouble),
+ce qu'odeint n'atteint pas ; écrite en Python, elle est plus lente qu'odeint pour un seul pendule.
+references_lot_taylor applique les mêmes récurrences à un lot de pendules (tableaux de taille K, pas commun) :
+c'est la référence rapide, plus rapide que references_lot à partir de quelques centaines de pendules.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+import operator
+# import du module integrate de la bibliothèque scipy qui dispose d'intégrateurs de référence
+from scipy.integrate import odeint, solve_ivp
+
+# Facteur de sécurité sur le pas de la méthode de Taylor (élevé à la puissance 1 / (ordre - 1))
+SECURITE_TAYLOR = np.exp(-0.7)
+
+"""
+FONCTIONS
+"""
+# Solution de référence d'un pendule calculée par odeint avec la jacobienne analytique
+def reference_odeint(pendule, temps, rtol=1e-12, atol=1e-12):
+    return odeint(pendule.derA, pendule.CI(), temps, Dfun=pendule.jac, tfirst=True, rtol=rtol, atol=atol)
+
+# Solution de référence d'un pendule calculée par solve_ivp.
+# Le résultat a la même forme que celui d'odeint : (temps.size, 2)
+def reference_solve_ivp(pendule, temps, rtol=1e-12, atol=1e-12, method="LSODA"):
+    sol = solve_ivp(pendule.derA, (temps[0], temps[-1]), pendule.CI(), method=method, t_eval=temps,
+                    jac=pendule.jac, vectorized=True, rtol=rtol, atol=atol)
+    assert sol.success, sol.message
+    return sol.y.T
+
+# Solutions de référence d'une liste de pendules calculées en un seul appel à odeint.
+# L'état est rangé sous la forme [theta_1, omega_1, theta_2, omega_2, ...] pour que
+# la jacobienne soit une matrice bande (une sous-diagonale et une sur-diagonale).
+# Le résultat est de forme (temps.size, K, 2) : A[:, k] est la solution du pendule k.
+def references_lot(pendules, temps, rtol=1e-12, atol=1e-12):
+    K = len(pendules)
+    w02 = np.array([p.g / p.L for p in pendules], dtype=float)
+    gamma = np.array([getattr(p, "gamma", 0) for p in pendules], dtype=float)
+    petits = np.array([p.small_angle for p in pendules])
+    y0 = np.array([p.CI() for p in pendules], dtype=float).ravel()
+
+    def derA_lot(t, y):
+        theta, omega = y.reshape(K, 2).T
+        dy = np.empty_like(y)
+        dy[0::2] = omega
+        dy[1::2] = -w02 * np.where(petits, theta, np.sin(theta)) - gamma * omega
+        return dy
+
+    # Stockage en bande attendu par odeint : jac[i - j + mu, j] = dG_i / dA_j, avec mu = ml = 1
+    def jac_lot(t, y):
+        theta = y[0::2]
+        jac = np.zeros((3, 2 * K))
+        jac[0, 1::2] = 1.0
+        jac[1, 1::2] = -gamma
+        jac[2, 0::2] = -w02 * np.where(petits, 1.0, np.cos(theta))
+        return jac
+
+    A = odeint(derA_lot, y0, temps, Dfun=jac_lot, ml=1, mu=1, tfirst=True, rtol=rtol, atol=atol)
+    return A.reshape(temps.size, K, 2)
+
+# Pas de la méthode de Taylor pour le pendule theta' = omega, omega' = -w02 sin(theta) - gamma omega.
+# Renvoie les coefficients normalisés (x(t0 + h) = somme des x_k h^k) de theta et omega et le pas h.
+# exp(i theta) = cos(theta) + i sin(theta) suit la récurrence de la différentiation automatique
+# E' = i theta' E, soit k E_k = i somme_{j=1..k} j theta_j E_{k-j} : une seule convolution (complexe)
+# par ordre donne à la fois les coefficients de sin(theta) et de cos(theta).
+# Les calculs se font sur des scalaires (flottants Python, ou scalaires numpy en précision étendue) :
+# les récurrences sont séquentielles et de petite taille, numpy n'apporterait que son surcoût.
+# L'ordre est choisi à chaque pas entre ordre_min et ordre_max : les coefficients sont calculés ordre
+# par ordre tant que le coût par unité de temps (n^2 / h_n) diminue, le pas h_n étant estimé par
+# (tol / |x_j|)^(1/j) sur les deux derniers coefficients (rayon de convergence estimé).
+def pas_taylor(theta, omega, w02, gamma, small_angle, tol, ordre_min, ordre_max):
+    tol = tol * max(1, abs(theta), abs(omega))
+    th, om = [theta], [omega]
+    # k theta_k = omega_{k-1} : les termes j theta_j de la convolution sont les coefficients de omega
+    E = [np.cos(theta) + 1j * np.sin(theta)]
+    meilleur, h_meilleur, cout_meilleur = None, None, None
+    m_prec = None
+    for k in range(ordre_max):
+        n = k + 1
+        s_k = th[k] if small_angle else E[k].imag
+        th.append(om[k] / n)
+        om.append((-w02 * s_k - gamma * om[k]) / n)
+        if not small_angle:
+            E.append(1j * sum(map(operator.mul, om[:n], E[k::-1])) / n)
+        if n < ordre_min - 1:
+            continue
+        m = max(abs(th[n]), abs(om[n]))
+        if n >= ordre_min:
+            h = min((tol / m_prec)**(1 / (n - 1)) if m_prec else np.inf, (tol / m)**(1 / n) if m else np.inf)
+            # Facteur de sécurité sur le rayon de convergence estimé
+            h = h * SECURITE_TAYLOR**(1 / (n - 1))
+            cout = n * n / h
+            if cout_meilleur is not None and cout >= cout_meilleur:
+                break
+            meilleur, h_meilleur, cout_meilleur = n, h, cout
+        m_prec = m
+    return th[:meilleur + 1], om[:meilleur + 1], h_meilleur
+
+# Solution de référence d'un pendule par séries de Taylor, de même forme que celle d'odeint : (temps.size, 2).
+# tol : erreur locale visée par pas (relative à l'amplitude de l'état, au moins 1), par défaut l'epsilon
+# machine de dtype ; ordre_min, ordre_max : bornes de l'ordre des séries, choisi à chaque pas ;
+# dtype : précision des calculs et du résultat (np.longdouble pour la précision étendue,
+# les paramètres g et L restant ceux, en double précision, du pendule).
+# Les polynômes de chaque pas sont gardés et évalués à la fin, en une fois pour tous les instants demandés.
+def reference_taylor(pendule, temps, tol=None, ordre_min=20, ordre_max=30, dtype=np.float64):
+    dtype = np.dtype(dtype)
+    msg = "L'ordre des séries de Taylor doit être au moins 2"
+    assert 2 <= ordre_min <= ordre_max, msg
+    # Scalaires utilisés par les récurrences : flottants Python en double précision (plus rapides)
+    scalaire = float if dtype == np.float64 else dtype.type
+    if tol is None:
+        tol = np.finfo(dtype).eps
+    temps = np.asarray(temps, dtype=dtype)
+    if np.any(np.diff(temps) < 0):
+        raise ValueError("Les instants demandés doivent être croissants")
+    w02 = scalaire(pendule.g) / scalaire(pendule.L)
+    gamma = scalaire(pendule.gamma)
+    tol = scalaire(tol)
+    theta, omega = (scalaire(x) for x in np.asarray(pendule.CI(), dtype=float))
+    t, t_fin = scalaire(temps[0]), scalaire(temps[-1])
+    debuts, polynomes = [], []
+    while True:
+        th, om, h = pas_taylor(theta, omega, w02, gamma, pendule.small_angle, tol, ordre_min, ordre_max)
+        dernier = t + h >= t_fin
+        if dernier:
+            h = t_fin - t
+        debuts.append(t)
+        polynomes.append((th, om))
+        if dernier:
+            break
+        # Etat à la fin du pas (schéma de Horner)
+        theta, omega = th[-1], om[-1]
+        for k in range(len(th) - 2, -1, -1):
+            theta = theta * h + th[k]
+            omega = omega * h + om[k]
+        t = t + h
+    # Coefficients de tous les pas, complétés par des zéros jusqu'à l'ordre le plus grand : (pas, 2, ordre + 1)
+    n = max(len(th) for th, om in polynomes)
+    C = np.zeros((len(polynomes), 2, n), dtype=dtype)
+    for p, (th, om) in enumerate(polynomes):
+        C[p, 0, :len(th)] = th
+        C[p, 1, :len(om)] = om
+    debuts = np.array(debuts, dtype=dtype)
+    pas = np.maximum(np.searchsorted(debuts, temps, side="right") - 1, 0)
+    tau = (temps - debuts[pas])[:, None]
+    A = C[pas, :, n - 1]
+    for k in range(n - 2, -1, -1):
+        A = A * tau + C[pas, :, k]
+    return A
+
+# Solutions de référence d'une liste de pendules par séries de Taylor, de même forme que celle de
+# references_lot : (temps.size, K, 2). Mêmes récurrences que pas_taylor, sur des tableaux de taille K
+# (sin et cos par deux convolutions réelles, calculées par un seul appel à einsum) : le surcoût des appels
+# numpy est partagé par tous les pendules. Le pas est commun (le plus petit des pas estimés), l'ordre
+# est choisi à chaque pas comme dans pas_taylor, et les instants demandés compris dans un pas sont évalués
+# dès qu'il est calculé (seul le polynôme du pas courant est gardé).
+# tol, ordre_min, ordre_max, dtype : comme pour reference_taylor.
+def references_lot_taylor(pendules, temps, tol=None, ordre_min=20, ordre_max=30, dtype=np.float64):
+    dtype = np.dtype(dtype)
+    msg = "L'ordre des séries de Taylor doit être au moins 2"
+    assert 2 <= ordre_min <= ordre_max, msg
+    if tol is None:
+        tol = np.finfo(dtype).eps
+    temps = np.asarray(temps, dtype=dtype)
+    if np.any(np.diff(temps) < 0):
+        raise ValueError("Les instants demandés doivent être croissants")
+    K = len(pendules)
+    w02 = np.array([p.g for p in pendules], dtype=dtype) / np.array([p.L for p in pendules], dtype=dtype)
+    gamma = np.array([getattr(p, "gamma", 0) for p in pendules], dtype=dtype)
+    amorti = bool(np.any(gamma))
+    petits = np.array([p.small_angle for p in pendules])
+    # Pulsations au carré séparées selon le modèle (sin(theta) ou theta) : pas de np.where dans la boucle
+    w02_sin, w02_lin = np.where(petits, 0, w02), np.where(petits, w02, 0)
+    lineaires = bool(np.any(petits))
+    etat = np.array([p.CI() for p in pendules], dtype=float).astype(dtype)
+    A = np.empty((temps.size, 2, K), dtype=dtype)
+    # Coefficients de (theta, omega) et de (sin(theta), cos(theta)) de tous les pendules, ordre par ordre
+    X = np.empty((ordre_max + 1, 2, K), dtype=dtype)
+    SC = np.empty((2, ordre_max + 1, K), dtype=dtype)
+    signe = np.array([1, -1], dtype=dtype)[:, None]
+    x = etat.T.copy()
+    t, t_fin = temps[0], temps[-1]
+    i = 0
+    while True:
+        tol_pas = tol * np.maximum(1, np.max(np.abs(x), axis=0))
+        X[0] = x
+        SC[0, 0], SC[1, 0] = np.sin(x[0]), np.cos(x[0])
+        meilleur, h_meilleur, cout_meilleur = None, None, None
+        m_prec = None
+        for k in range(ordre_max):
+            n = k + 1
+            th_k, om_k = X[k]
+            X[n, 0] = om_k
+            np.multiply(SC[0, k], w02_sin, out=X[n, 1])
+            if lineaires:
+                X[n, 1] += w02_lin * th_k
+            X[n, 1] *= -1
+            if amorti:
+                X[n, 1] -= gamma * om_k
+            X[n] /= n
+            # n S_n = somme_{j=0..k} omega_j C_{k-j}, n C_n = -somme_{j=0..k} omega_j S_{k-j}
+            SC[:, n] = np.einsum("jk,ajk->ak", X[:n, 1], SC[::-1, k::-1]) * (signe / n)
+            if n < ordre_min - 1:
+                continue
+            m = np.max(np.abs(X[n]), axis=0)
+            if n >= ordre_min:
+                # Pas le plus petit des pendules (rayon de convergence estimé, avec le facteur de sécurité)
+                with np.errstate(divide="ignore"):
+                    h = np.min(np.minimum((tol_pas / m_prec)**(1 / (n - 1)), (tol_pas / m)**(1 / n)))
+                h = h * SECURITE_TAYLOR**(1 / (n - 1))
+                cout = n * n / h
+                if cout_meilleur is not None and cout >= cout_meilleur:
+                    break
+                meilleur, h_meilleur, cout_meilleur = n, h, cout
+            m_prec = m
+        h = h_meilleur
+        dernier = t + h >= t_fin
+        if dernier:
+            h = t_fin - t
+        # Instants demandés compris dans le pas, évalués par le schéma de Horner
+        j = temps.size if dernier else np.searchsorted(temps, t + h, side="left")
+        if j > i:
+            tau = (temps[i:j] - t)[:, None, None]
+            B = np.broadcast_to(X[meilleur], (j - i, 2, K)).copy()
+            for k in range(meilleur - 1, -1, -1):
+                B *= tau
+                B += X[k]
+            A[i:j] = B
+            i = j
+        if dernier:
+            return A.transpose(0, 2, 1)
+        # Etat à la fin du pas
+        x = X[meilleur].copy()
+        for k in range(meilleur - 1, -1, -1):
+            x *= h
+            x += X[k]
+        t = t + h
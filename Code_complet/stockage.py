@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code propose un stockage des résultats de calcul sur disque, qui remplace les copies
+à la main de la console vers Données.txt.
+Un stockage est un dossier qui contient une série d'exécutions (une par intégrateur et pas de temps,
+par exemple). Chaque exécution contient :
+- meta.json : les métadonnées (intégrateur, dt, paramètres du pendule, temps de calcul, ...) ;
+- un sous-dossier par tableau (trajectoire, erreur, énergie, ...) découpé en blocs de lignes,
+  chaque bloc étant un fichier .npz compressé, décrit par un fichier tableau.json (forme, type, taille des blocs).
+La lecture est paresseuse : t[a:b] ne charge que les blocs qui recouvrent les lignes a à b,
+si bien que l'on peut interroger de grandes études sans tout recharger.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+import json
+import os
+
+# Nombre de lignes par bloc par défaut (environ 1 Mo pour une trajectoire (N, 2) en float64)
+LIGNES_PAR_BLOC = 65536
+
+"""
+FONCTIONS
+"""
+# Convertit les types numpy en types Python pour pouvoir les écrire en JSON
+def convertir_json(valeur):
+    if isinstance(valeur, dict):
+        return {str(k): convertir_json(v) for k, v in valeur.items()}
+    if isinstance(valeur, (list, tuple)):
+        return [convertir_json(v) for v in valeur]
+    if isinstance(valeur, np.ndarray):
+        return valeur.tolist()
+    if isinstance(valeur, np.generic):
+        return valeur.item()
+    if isinstance(valeur, type):
+        return valeur.__name__
+    return valeur
+
+# Métadonnées d'un modèle : ses paramètres scalaires (L, g, theta0, omega0, small_angle, ...)
+def parametres_modele(modele):
+    params = {"modele": type(modele).__name__}
+    for cle, valeur in vars(modele).items():
+        if not cle.startswith("_") and (np.isscalar(valeur) or isinstance(valeur, bool)):
+            params[cle] = convertir_json(valeur)
+    return params
+
+"""
+CLASSES
+"""
+class Tableau:
+    # Tableau stocké par blocs de lignes. S'utilise comme un tableau numpy en lecture :
+    # len(t), t.shape, t.dtype, t[i], t[a:b], t[a:b, 0], t[indices croissants]
+    def __init__(self, dossier):
+        self.dossier = dossier
+        with open(os.path.join(dossier, "tableau.json"), encoding="utf-8") as f:
+            desc = json.load(f)
+        self.shape = tuple(desc["shape"])
+        self.dtype = np.dtype(desc["dtype"])
+        self.lignes_par_bloc = desc["lignes_par_bloc"]
+        # On garde en mémoire le dernier bloc lu : les lectures sont souvent séquentielles
+        self._bloc_num = None
+        self._bloc = None
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def bloc(self, k):
+        if k != self._bloc_num:
+            with np.load(os.path.join(self.dossier, "bloc_%06d.npz" % k)) as f:
+                self._bloc = f["data"]
+            self._bloc_num = k
+        return self._bloc
+
+    # Lecture des lignes d'indices a à b (b exclu) en ne chargeant que les blocs nécessaires
+    def lignes(self, a, b):
+        n = self.lignes_par_bloc
+        if b <= a:
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)
+        morceaux = []
+        for k in range(a // n, (b - 1) // n + 1):
+            bloc = self.bloc(k)
+            morceaux.append(bloc[max(a - k * n, 0):min(b - k * n, n)])
+        if len(morceaux) == 1:
+            return morceaux[0]
+        return np.concatenate(morceaux)
+
+    def __getitem__(self, idx):
+        if not isinstance(idx, tuple):
+            idx = (idx,)
+        premier, reste = idx[0], idx[1:]
+        if isinstance(premier, slice):
+            a, b, pas = premier.indices(self.shape[0])
+            if pas > 0:
+                resultat = self.lignes(a, b)[::pas]
+            else:
+                resultat = self.lignes(b + 1, a + 1)[::-1][::-pas]
+        elif np.isscalar(premier):
+            i = int(premier)
+            if i < 0:
+                i += self.shape[0]
+            resultat = self.bloc(i // self.lignes_par_bloc)[i % self.lignes_par_bloc]
+        else:
+            # Tableau d'indices : on regroupe les lectures par bloc
+            indices = np.asarray(premier)
+            if indices.dtype == bool:
+                indices = np.flatnonzero(indices)
+            indices = np.where(indices < 0, indices + self.shape[0], indices)
+            resultat = np.empty((indices.size,) + self.shape[1:], dtype=self.dtype)
+            num_blocs = indices // self.lignes_par_bloc
+            for k in np.unique(num_blocs):
+                masque = num_blocs == k
+                resultat[masque] = self.bloc(k)[indices[masque] % self.lignes_par_bloc]
+        if not reste:
+            return resultat
+        if np.isscalar(premier):
+            return resultat[reste]
+        return resultat[(slice(None),) + reste]
+
+    def __array__(self, dtype=None, copy=None):
+        tout = self.lignes(0, self.shape[0])
+        return tout if dtype is None else tout.astype(dtype)
+
+class Execution:
+    # Une exécution : des métadonnées et des tableaux nommés
+    def __init__(self, dossier):
+        self.dossier = dossier
+        self.nom = os.path.basename(dossier)
+        chemin_meta = os.path.join(dossier, "meta.json")
+        if os.path.exists(chemin_meta):
+            with open(chemin_meta, encoding="utf-8") as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {}
+
+    def enregistrer_meta(self, **meta):
+        self.meta.update(convertir_json(meta))
+        with open(os.path.join(self.dossier, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2, ensure_ascii=False)
+
+    # Ecrit un tableau complet, découpé en blocs de lignes compressés
+    def ecrire(self, nom, data, lignes_par_bloc=LIGNES_PAR_BLOC):
+        data = np.asarray(data)
+        if data.ndim == 0:
+            data = data.reshape(1)
+        self.creer(nom, data.shape[1:], data.dtype, lignes_par_bloc)
+        self.ajouter(nom, data)
+        return self[nom]
+
+    # Crée un tableau vide que l'on remplit ensuite au fur et à mesure avec ajouter
+    def creer(self, nom, forme_ligne, dtype, lignes_par_bloc=LIGNES_PAR_BLOC):
+        dossier = os.path.join(self.dossier, nom)
+        os.makedirs(dossier, exist_ok=True)
+        for fichier in os.listdir(dossier):
+            os.remove(os.path.join(dossier, fichier))
+        desc = {"shape": [0] + list(forme_ligne), "dtype": np.dtype(dtype).str,
+                "lignes_par_bloc": lignes_par_bloc}
+        with open(os.path.join(dossier, "tableau.json"), "w", encoding="utf-8") as f:
+            json.dump(desc, f)
+
+    # Ajoute des lignes à la fin d'un tableau (le dernier bloc, s'il est incomplet, est réécrit)
+    def ajouter(self, nom, lignes):
+        dossier = os.path.join(self.dossier, nom)
+        with open(os.path.join(dossier, "tableau.json"), encoding="utf-8") as f:
+            desc = json.load(f)
+        n, total = desc["lignes_par_bloc"], desc["shape"][0]
+        lignes = np.asarray(lignes, dtype=desc["dtype"]).reshape((-1,) + tuple(desc["shape"][1:]))
+        k = total // n
+        if total % n:
+            with np.load(os.path.join(dossier, "bloc_%06d.npz" % k)) as f:
+                lignes = np.concatenate((f["data"], lignes))
+        desc["shape"][0] = k * n + lignes.shape[0]
+        for debut in range(0, lignes.shape[0], n):
+            np.savez_compressed(os.path.join(dossier, "bloc_%06d.npz" % (k + debut // n)), data=lignes[debut:debut + n])
+        with open(os.path.join(dossier, "tableau.json"), "w", encoding="utf-8") as f:
+            json.dump(desc, f)
+
+    def tableaux(self):
+        return sorted(nom for nom in os.listdir(self.dossier)
+                      if os.path.exists(os.path.join(self.dossier, nom, "tableau.json")))
+
+    def __getitem__(self, nom):
+        return Tableau(os.path.join(self.dossier, nom))
+
+    def __contains__(self, nom):
+        return nom in self.tableaux()
+
+class Stockage:
+    # Dossier contenant les exécutions d'une ou plusieurs études
+    def __init__(self, dossier):
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+
+    def executions(self):
+        return sorted(nom for nom in os.listdir(self.dossier)
+                      if os.path.isdir(os.path.join(self.dossier, nom)))
+
+    # Crée une exécution. Sans nom, on la numérote à la suite de la plus grande exécution numérotée
+    # (les numéros des exécutions supprimées ne sont pas réutilisés). Le dossier est créé de façon
+    # exclusive : si un autre processus a pris le numéro entre-temps, on passe au suivant.
+    def creer_execution(self, nom=None, **meta):
+        if nom is None:
+            numeros = [int(n[len("execution_"):]) for n in self.executions()
+                       if n.startswith("execution_") and n[len("execution_"):].isdigit()]
+            numero = max(numeros, default=-1) + 1
+            while True:
+                nom = "execution_%05d" % numero
+                dossier = os.path.join(self.dossier, nom)
+                try:
+                    os.mkdir(dossier)
+                    break
+                except FileExistsError:
+                    numero += 1
+        else:
+            dossier = os.path.join(self.dossier, nom)
+            os.makedirs(dossier, exist_ok=True)
+        execution = Execution(dossier)
+        execution.enregistrer_meta(**meta)
+        return execution
+
+    def __getitem__(self, nom):
+        msg = "Exécution inconnue : " + nom
+        assert nom in self.executions(), msg
+        return Execution(os.path.join(self.dossier, nom))
+
+    # Renvoie les exécutions dont les métadonnées valent les critères donnés,
+    # par exemple stockage.chercher(solver="RungeKutta4", small_angle=False)
+    def chercher(self, **criteres):
+        trouvees = []
+        for nom in self.executions():
+            execution = self[nom]
+            if all(execution.meta.get(cle) == valeur for cle, valeur in criteres.items()):
+                trouvees.append(execution)
+        return trouvees
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Y. Vadée Le Brun
+
+DESCRIPTION
+
+Ce code propose un mode temps réel : un fil d'exécution producteur fait avancer un solveur
+au rythme de l'horloge murale (éventuellement accéléré) et publie l'état dans un tampon
+circulaire de taille fixe. Les consommateurs (animation, journal, maquette matérielle)
+lisent le tampon sans jamais bloquer le producteur :
+- il n'y a qu'un seul écrivain, qui remplit une case puis incrémente le compteur d'écriture ;
+- un lecteur copie les cases depuis sa dernière lecture puis relit le compteur, et écarte
+  les cases qui ont pu être réécrites pendant la copie (elles sont comptées comme perdues).
+Chaque case porte l'instant de sa publication (time.perf_counter), ce qui permet de mesurer
+la latence entre la mise à jour de l'état et sa lecture.
+Statistiques relevées :
+- producteur : nombre de périodes en retard (dépassements) et retard maximal ;
+- lecteur : lectures sans nouvelle donnée (sous-alimentation), cases perdues, latence.
+"""
+
+"""
+BIBLIOTHEQUES
+"""
+# import de la bibliothèque numpy (gestion de matrices et routines mathématiques) en lui donnant le surnom np
+import numpy as np
+import threading
+import time
+
+"""
+CLASSES
+"""
+class TamponCirculaire:
+    # capacite : nombre de cases, taille_etat : taille du vecteur d'état publié
+    def __init__(self, capacite, taille_etat, dtype=np.float64):
+        # La case en cours d'écriture n'est jamais lisible : il en faut au moins une autre
+        msg = "Le tampon doit avoir au moins deux cases"
+        assert capacite >= 2, msg
+        self.capacite = capacite
+        self.t = np.zeros(capacite)
+        self.etats = np.zeros((capacite, taille_etat), dtype=dtype)
+        self.horodatages = np.zeros(capacite)
+        # Nombre total de cases écrites depuis le début (seul le producteur le modifie)
+        self.ecrit = 0
+
+    # Réservé au producteur
+    def publier(self, t, etat):
+        i = self.ecrit % self.capacite
+        self.t[i] = t
+        self.etats[i] = etat
+        self.horodatages[i] = time.perf_counter()
+        # La case n'est visible des lecteurs qu'une fois entièrement écrite
+        self.ecrit += 1
+
+class Lecteur:
+    # Un lecteur par consommateur : chacun a sa propre position de lecture et ses statistiques
+    def __init__(self, tampon):
+        self.tampon = tampon
+        self.lu = tampon.ecrit
+        self.nb_lectures = 0
+        self.nb_vides = 0
+        self.nb_perdus = 0
+        self.nb_recus = 0
+        self.latence_max = 0.0
+        self.latence_totale = 0.0
+
+    # Renvoie (t, etats, horodatages) des cases publiées depuis la dernière lecture
+    def lire(self):
+        tampon = self.tampon
+        cap = tampon.capacite
+        self.nb_lectures += 1
+        fin = tampon.ecrit
+        if fin == self.lu:
+            self.nb_vides += 1
+            return tampon.t[:0].copy(), tampon.etats[:0].copy(), tampon.horodatages[:0].copy()
+        # Le producteur peut déjà écrire la case numéro fin, qui écrase fin - capacite
+        debut = max(self.lu, fin - cap + 1)
+        indices = np.arange(debut, fin) % cap
+        t = tampon.t[indices]
+        etats = tampon.etats[indices]
+        horodatages = tampon.horodatages[indices]
+        # Les cases d'indice inférieur ou égal à ecrit - capacite ont pu être réécrites pendant la copie
+        # (la case ecrit est peut-être en cours d'écriture)
+        valide = max(debut, tampon.ecrit - cap + 1)
+        t, etats, horodatages = t[valide - debut:], etats[valide - debut:], horodatages[valide - debut:]
+        self.nb_perdus += valide - self.lu
+        self.lu = fin
+        self.noter_latence(horodatages)
+        return t, etats, horodatages
+
+    # Renvoie (t, etat) de la dernière case publiée, ou None si rien de nouveau
+    def dernier(self):
+        tampon = self.tampon
+        self.nb_lectures += 1
+        fin = tampon.ecrit
+        if fin == self.lu:
+            self.nb_vides += 1
+            return None
+        i = (fin - 1) % tampon.capacite
+        t, etat, horodatage = tampon.t[i], tampon.etats[i].copy(), tampon.horodatages[i]
+        # Si le producteur a fait le tour du tampon pendant la copie (ou écrit la case en ce moment),
+        # la case n'est plus cohérente
+        if tampon.ecrit - fin >= tampon.capacite - 1:
+            return self.dernier()
+        # Les cases sautées ne sont pas comptées comme perdues : le lecteur ne veut que la dernière
+        self.lu = fin
+        self.noter_latence(np.array([horodatage]))
+        return t, etat
+
+    def noter_latence(self, horodatages):
+        if horodatages.size == 0:
+            return
+        latences = time.perf_counter() - horodatages
+        self.nb_recus += latences.size
+        self.latence_max = max(self.latence_max, float(latences.max()))
+        self.latence_totale += float(latences.sum())
+
+    def statistiques(self):
+        return {"lectures": self.nb_lectures, "vides": self.nb_vides, "recus": self.nb_recus,
+                "perdus": self.nb_perdus, "latence_max": self.latence_max,
+                "latence_moyenne": self.latence_totale / max(self.nb_recus, 1)}
+
+class ProducteurTempsReel:
+    # solver : instance d'un solveur (ODESolver ou MecaODESolver), u0 : condition initiale,
+    # dt : pas de temps, acceleration : secondes simulées par seconde réelle,
+    # periode : période de publication en secondes réelles (par défaut un pas de temps).
+    # A chaque période, le solveur fait les pas nécessaires pour rattraper l'horloge puis publie l'état.
+    def __init__(self, solver, u0, dt, capacite=4096, acceleration=1.0, periode=None, t0=0.0):
+        self.solver = solver
+        self.dt = float(dt)
+        self.acceleration = acceleration
+        self.periode = self.dt / acceleration if periode is None else periode
+        solver.demarrer(u0, t0, self.dt)
+        self.t0 = t0
+        self.nb_pas = 0
+        etat = np.atleast_1d(solver.etat_courant())
+        self.tampon = TamponCirculaire(capacite, etat.size, etat.dtype)
+        self.tampon.publier(t0, etat)
+        self.nb_periodes = 0
+        self.nb_retards = 0
+        self.retard_max = 0.0
+        self._arret = threading.Event()
+        self._fil = None
+
+    def lecteur(self):
+        return Lecteur(self.tampon)
+
+    def demarrer(self):
+        self._arret.clear()
+        self._fil = threading.Thread(target=self.boucle, daemon=True)
+        self._fil.start()
+        return self
+
+    def arreter(self):
+        self._arret.set()
+        if self._fil is not None:
+            self._fil.join()
+
+    def __enter__(self):
+        return self.demarrer()
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+    def boucle(self):
+        solver, dt = self.solver, self.dt
+        debut = time.perf_counter()
+        echeance = debut + self.periode
+        while not self._arret.is_set():
+            # Instant simulé à atteindre pour cette période
+            cible = (echeance - debut) * self.acceleration
+            while (self.nb_pas + 1) * dt <= cible * (1 + 1e-12):
+                solver.advance(dt)
+                self.nb_pas += 1
+                solver.t = self.t0 + self.nb_pas * dt
+            self.tampon.publier(solver.t, solver.etat_courant())
+            self.nb_periodes += 1
+            maintenant = time.perf_counter()
+            retard = maintenant - echeance
+            if retard > 0:
+                # Dépassement : l'horloge simulée est recalée pour que la latence reste bornée
+                # (le temps perdu n'est pas rattrapé)
+                self.nb_retards += 1
+                self.retard_max = max(self.retard_max, retard)
+                debut += retard
+                echeance = maintenant
+            else:
+                self._arret.wait(-retard)
+            echeance += self.periode
+
+    def statistiques(self):
+        return {"periodes": self.nb_periodes, "pas": self.nb_pas, "retards": self.nb_retards,
+                "retard_max": self.retard_max, "t": float(self.solver.t)}
+
+"""
+FONCTIONS
+"""
+# Consommateur journal : écrit les états publiés dans un fichier texte (t, état) toutes les
+# periode secondes, jusqu'à ce que l'événement arret soit positionné
+def journaliser(lecteur, fichier, arret, periode=0.1):
+    with open(fichier, "w", encoding="utf-8") as f:
+        while True:
+            fini = arret.wait(periode)
+            t, etats, _ = lecteur.lire()
+            if t.size:
+                np.savetxt(f, np.column_stack((t, etats)))
+                f.flush()
+            if fini:
+                break
+    return lecteur.statistiques()
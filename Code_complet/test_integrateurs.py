@@ -27,6 +27,9 @@ BIBLIOTHEQUES PERSONNELLES
 from integrateur_complet import *
 from integrateur_meca import *
 from pendule_plan import Pendule
+from solution_reference import reference_odeint
+# fonctions de tracé avec sous-échantillonnage des longues trajectoires
+from affichage import plot_A, plot_erreur, plot_em, plot_reduit
 
 """
 FONCTIONS PERSONNELLES
@@ -79,40 +82,6 @@ def calculs_pendule(solver_list, pendule, A_ref, temps):
         item["erreur"] = erreur
         item["em"] = em
 
-def plot_A(solver_list):
-    for item in solver_list:
-        if item["solver_class"] == "Odeint": solver_name = "Odeint"
-        else: solver_name = item["solver_class"].__name__
-        plt.plot(temps, item["A"][:,0], item["color"], lw=1.0, label=solver_name)
-    plt.legend(loc='lower right')
-    plt.title("Angle de la balle au cours du temps")
-    plt.xlabel("Temps (s)")
-    plt.ylabel("Angle (rad)")
-    plt.grid(True)
-
-def plot_erreur(solver_list):
-    for item in solver_list:
-        if item["solver_class"] == "Odeint": solver_name = "Odeint"
-        else: solver_name = item["solver_class"].__name__
-        plt.plot(temps, item["erreur"], item["color"], lw=1.0, label=solver_name)
-    plt.legend(loc='lower right')
-    plt.title("Erreur au cours du temps")
-    plt.xlabel("Temps (s)")
-    plt.ylabel("Erreur angulaire (rad)")
-    plt.grid(True)
-
-def plot_em(solver_list):
-    for item in solver_list:
-        if item["solver_class"] == "Odeint": solver_name = "Odeint"
-        else: solver_name = item["solver_class"].__name__
-        plt.plot(temps, item["em"], item["color"], lw=1.0, label=solver_name)
-    plt.legend(loc='lower right')
-    plt.title("Energie mécanique au cours du temps")
-    plt.xlabel("Temps (s)")
-    plt.ylabel("Energie mécanique (J/kg)")
-    plt.grid(True)
-
-
 """
 CODE PRINCIPAL
 """
@@ -160,24 +129,24 @@ calculs_pendule(solver_list, pendule_approx, A_math, temps)
 
 """Figure pour l'angle en fonction du temps"""
 plt.figure("Theta approx")
-plt.plot(temps, A_math[:,0], "-k", lw=1.0, label="résolution analytique")
-plot_A(solver_list)
+plot_reduit(temps, A_math[:,0], "-k", lw=1.0, label="résolution analytique")
+plot_A(solver_list, temps)
 
 """Figure pour l'erreur en fonction du temps"""
 plt.figure("Erreur approx")
-plot_erreur(solver_list)
+plot_erreur(solver_list, temps)
 
 """Figure pour l'énergie mécanique en fonction du temps"""
 plt.figure("Energie approx")
-plt.plot(temps, em_math, "-k", lw=1.0, label="résolution analytique")
-plot_em(solver_list)
+plot_reduit(temps, em_math, "-k", lw=1.0, label="résolution analytique")
+plot_em(solver_list, temps)
 
 """ETUDE EN DEHORS DES PETITS ANGLES"""
 """Calculs"""
 # Comme la solution exacte n'est pas disponible, on calcule une solution de référence
 # avec odeint en lui demandant une grande précision
 start = time.perf_counter()
-A_ref = odeint(pendule_exact.derA, pendule_exact.CI(), temps, tfirst = True, rtol = 1e-12, atol = 1e-12)
+A_ref = reference_odeint(pendule_exact, temps)
 end = time.perf_counter()
 elapsed = (end - start) * 1000
 print("Le calcul de la solution de référence a duré", elapsed,"ms")
@@ -187,16 +156,16 @@ calculs_pendule(solver_list, pendule_exact, A_ref, temps)
 
 """Figure pour l'angle en fonction du temps"""
 plt.figure("Theta exact")
-plt.plot(temps, A_ref[:,0], "-k", lw=1.0, label="résolution précise")
-plot_A(solver_list)
+plot_reduit(temps, A_ref[:,0], "-k", lw=1.0, label="résolution précise")
+plot_A(solver_list, temps)
 
 """Figure pour l'erreur en fonction du temps"""
 plt.figure("Erreur exact")
-plot_erreur(solver_list)
+plot_erreur(solver_list, temps)
 
 """Figure pour l'énergie mécanique en fonction du temps"""
 plt.figure("Energie exact")
-plt.plot(temps, em_ref, "-k", lw=1.0, label="résolution précise")
-plot_em(solver_list)
+plot_reduit(temps, em_ref, "-k", lw=1.0, label="résolution précise")
+plot_em(solver_list, temps)
 
 plt.show()
\ No newline at end of file
@@ -27,6 +27,7 @@ BIBLIOTHEQUES PERSONELLES
 from integrateur_complet import *
 from integrateur_meca import *
 from pendule_plan import Pendule
+from solution_reference import reference_odeint
 
 """
 CODE PRINCIPAL
@@ -51,12 +52,14 @@ temps = np.linspace(0, t_max, N)
 # On n'utilise pas l'approximation des petits angles de façon a affronter le problème réel
 pendule = Pendule(L = R, theta0 = th_0, omega0 = w_0, small_angle = True)
 
-# Création des listes de temps à tester pour chaque intégrateur
-#dt_list_euler = (1e-3, 3e-4, 1e-4, 3e-5, 1e-5, 3e-6, 1e-6, 3e-7, 1e-7, 3e-8, 1e-8)
-#dt_list_midpoint = (0.1, 6e-2, 2e-2, 1e-2, 6e-3, 2e-3, 1e-3, 3e-4, 1e-4, 3e-5, 1e-5, 3e-6, 1e-6, 3e-7, 1e-7, 3e-8)
-#dt_list_RK4 = (0.2, 0.1, 6e-2, 2e-2, 1e-2, 6e-3, 2e-3, 1e-3, 6e-4, 2e-4, 1e-4, 6e-5, 2e-5, 1e-5, 6e-6, 2e-6)
+# Limites de chaque calcul : budget de temps (s) et plafond de l'erreur (rad).
+# Un calcul qui les dépasse est arrêté, et les pas plus petits qu'un pas arrêté par le budget sont sautés :
+# les listes de pas peuvent aller jusqu'aux très petits pas sans que l'étude dure des heures.
+budget = 30
+plafond = 1.0
 
-dt_list_euler = (2e-3, 1e-3, 3e-4, 1e-4, 3e-5, 1e-5, 3e-6, 1e-6, 3e-7, 1e-7)
+# Création des listes de temps à tester pour chaque intégrateur
+dt_list_euler = (2e-3, 1e-3, 3e-4, 1e-4, 3e-5, 1e-5, 3e-6, 1e-6, 3e-7, 1e-7, 3e-8, 1e-8)
 dt_list_midpoint = (6e-2, 2e-2, 1e-2, 6e-3, 2e-3, 1e-3, 3e-4, 1e-4, 3e-5, 1e-5, 3e-6, 1e-6, 3e-7)
 dt_list_verlet = (0.1, 6e-2, 2e-2, 1e-2, 6e-3, 2e-3, 1e-3, 3e-4, 1e-4, 3e-5, 1e-5, 3e-6, 1e-6, 3e-7)
 dt_list_RK4 = (0.2, 0.1, 6e-2, 2e-2, 1e-2, 6e-3, 2e-3, 1e-3, 6e-4, 2e-4, 1e-4, 6e-5, 2e-5, 1e-5, 6e-6, 2e-6)
@@ -74,7 +77,7 @@ start = time.perf_counter()
 if pendule.small_angle:
     A_ref = pendule.A_math(temps)
 else :
-    A_ref = odeint(pendule.derA, pendule.CI(), temps, tfirst = True, rtol = 1e-12, atol = 1e-12)
+    A_ref = reference_odeint(pendule, temps)
 end = time.perf_counter()
 elapsed = (end - start) * 1000
 print("Le calcul de la solution de référence a duré", elapsed,"ms")
@@ -85,7 +88,7 @@ for item in solver_list:
     dt_list = item["dt_list"]
     item["solver_class_name"] = solver_class.__name__
     solver = solver_class(pendule)
-    time_list, error_list = solver.return_error(temps, dt_list, A_ref)
+    time_list, error_list = solver.return_error(temps, dt_list, A_ref, budget, plafond)
     item["time_list"] = time_list
     item["error_list"] = error_list
 